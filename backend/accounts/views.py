@@ -9,7 +9,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from .serializers import RegisterSerializer, MeSerializer, AddCoinSerializer
-from wallet.models import Wallet
+from wallet.ledger import get_wallet
 
 User = get_user_model()
 
@@ -118,7 +118,7 @@ class MeView(APIView):
     def get(self, request):
         user = request.user
         # Ensure wallet exists
-        wallet, _ = Wallet.objects.get_or_create(user=user, defaults={"balance": 1000})
+        wallet = get_wallet(user.id)
 
         data = MeSerializer(user).data
         data["role"] = getattr(user, "role", "player")
@@ -168,7 +168,7 @@ class UserDetailView(APIView):
         except User.DoesNotExist:
             return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        wallet, _ = Wallet.objects.get_or_create(user=user, defaults={"balance": 1000})
+        wallet = get_wallet(user.id)
         data = MeSerializer(user).data
         data["role"] = getattr(user, "role", "player")
         data["balance"] = wallet.balance
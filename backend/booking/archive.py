@@ -0,0 +1,78 @@
+# booking/archive.py
+# Month-by-month archival of past slots. Slots that were never booked are
+# moved out of booking_slot (into SlotArchive, or a gzipped JSON-lines
+# export), so the hot table only grows with the booking horizon and the
+# bookings themselves. Booked slots stay, so booking history is untouched.
+#
+# DayAvailability rows before availability.archive_cutoff() are frozen:
+# refreshes skip them, so their totals keep counting the moved-out slots.
+import gzip
+import json
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .availability import month_start
+from .models import Slot, SlotArchive
+from .signals import notify_slot_status_changed
+
+ARCHIVE_FIELDS = (
+    "id", "court_id", "service_date", "start_at", "end_at", "price_coins", "status", "status_updated_at",
+)
+
+
+def archivable_slots(first_day, next_month):
+    """Never-booked slots of one month."""
+    return Slot.objects.filter(service_date__gte=first_day, service_date__lt=next_month, booked_by__isnull=True)
+
+
+def archive_batch(slot_ids, export=None) -> int:
+    """
+    Move these slots out of Slot in one transaction: into SlotArchive, or,
+    with `export` (a writable text file), as JSON lines instead. Slots booked
+    since they were picked are skipped. Returns the number moved.
+    """
+    with transaction.atomic():
+        rows = list(
+            Slot.objects
+            .select_for_update(of=("self",))
+            .filter(id__in=slot_ids, booked_by__isnull=True)
+            .values(*ARCHIVE_FIELDS, "court__club_id")
+        )
+        if not rows:
+            return 0
+
+        days = {(r.pop("court__club_id"), r["service_date"]) for r in rows}
+        if export is None:
+            now = timezone.now()
+            SlotArchive.objects.bulk_create([SlotArchive(archived_at=now, **r) for r in rows], ignore_conflicts=True)
+        else:
+            export.writelines(json.dumps(r, cls=DjangoJSONEncoder) + "\n" for r in rows)
+
+        # SlotStatus rows go with them (cascade); transitions keep their slot_id
+        Slot.objects.filter(id__in=[r["id"] for r in rows]).delete()
+        notify_slot_status_changed(days=days)
+        return len(rows)
+
+
+def archive_month(first_day, batch_size=5000, export_dir=None) -> int:
+    """Archive every never-booked slot of the month starting at `first_day`."""
+    next_month = month_start(first_day, -1)
+    pending = archivable_slots(first_day, next_month).order_by("id").values_list("id", flat=True)
+
+    export = None
+    if export_dir:
+        # Appending keeps a re-run after a crash from losing earlier batches
+        path = Path(export_dir) / f"slots-{first_day:%Y-%m}.jsonl.gz"
+        export = gzip.open(path, "at", encoding="utf-8")
+
+    moved = 0
+    try:
+        while ids := list(pending[:batch_size]):
+            moved += archive_batch(ids, export)
+    finally:
+        if export is not None:
+            export.close()
+    return moved
@@ -0,0 +1,115 @@
+# booking/availability.py
+from collections import defaultdict
+from datetime import date
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Slot, DayAvailability
+
+# Matches the partial index slot_available_idx
+AVAILABLE_Q = Q(status="available")
+
+
+def month_start(d: date, months_back: int = 0) -> date:
+    index = d.year * 12 + d.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def archive_cutoff(keep_months=None) -> date:
+    """
+    Slots dated before this day may be moved out by booking.archive; the
+    rollup rows of those days are left as they were when that happened.
+    """
+    if keep_months is None:
+        keep_months = settings.SLOT_ARCHIVE_KEEP_MONTHS
+    return month_start(timezone.localdate(), keep_months)
+
+
+def days_for_slots(slot_ids) -> set:
+    """Return the distinct (club_id, service_date) pairs touched by these slots."""
+    if not slot_ids:
+        return set()
+    return set(
+        Slot.objects
+        .filter(id__in=list(slot_ids))
+        .values_list("court__club_id", "service_date")
+        .distinct()
+    )
+
+
+def refresh_day_availability(days) -> int:
+    """
+    Recompute DayAvailability rows for the given (club_id, service_date) pairs.
+
+    Must run inside the transaction that changed the slots. Rows are locked
+    (in date order) before counting, so two concurrent writers on the same
+    day serialize and the second one counts the first one's committed state.
+    """
+    cutoff = archive_cutoff()
+    by_club = defaultdict(set)
+    for club_id, d in days:
+        if d >= cutoff:
+            by_club[club_id].add(d)
+
+    refreshed = 0
+    for club_id in sorted(by_club):
+        dates = sorted(by_club[club_id])
+
+        DayAvailability.objects.bulk_create(
+            [DayAvailability(club_id=club_id, service_date=d) for d in dates],
+            ignore_conflicts=True,
+        )
+        rows = {
+            r.service_date: r
+            for r in DayAvailability.objects
+            .select_for_update()
+            .filter(club_id=club_id, service_date__in=dates)
+            .order_by("service_date")
+        }
+
+        counts = (
+            Slot.objects
+            .filter(court__club_id=club_id, service_date__in=dates)
+            .values("service_date", "court_id")
+            .annotate(total=Count("id"), available=Count("id", filter=AVAILABLE_Q))
+            .order_by()
+        )
+
+        now = timezone.now()
+        for row in rows.values():
+            row.total, row.available, row.court_counts = 0, 0, {}
+            row.updated_at = now
+
+        for c in counts:
+            row = rows[c["service_date"]]
+            row.total += c["total"]
+            row.available += c["available"]
+            row.court_counts[str(c["court_id"])] = [c["total"], c["available"]]
+
+        DayAvailability.objects.bulk_update(
+            rows.values(), ["total", "available", "court_counts", "updated_at"]
+        )
+        refreshed += len(rows)
+
+    return refreshed
+
+
+def rebuild_day_availability(club_id=None, start=None, end=None) -> int:
+    """Rebuild the rollup from scratch for a club and/or date range."""
+    qs = Slot.objects.all()
+    stale = DayAvailability.objects.all()
+    if club_id:
+        qs = qs.filter(court__club_id=club_id)
+        stale = stale.filter(club_id=club_id)
+    if start:
+        qs = qs.filter(service_date__gte=start)
+        stale = stale.filter(service_date__gte=start)
+    if end:
+        qs = qs.filter(service_date__lte=end)
+        stale = stale.filter(service_date__lte=end)
+
+    days = set(qs.values_list("court__club_id", "service_date").distinct())
+    days |= set(stale.values_list("club_id", "service_date"))
+    return refresh_day_availability(days)
@@ -0,0 +1,196 @@
+# booking/live.py
+# Live slot status fan-out for the SSE stream (/api/slots/stream/).
+#
+# Every SlotStatus write ends in notify_slot_status_changed(); after commit
+# the changed rows are encoded once per club and handed to the in-process
+# broker, which copies the bytes into each subscriber's queue.
+#
+# On Postgres the events travel through NOTIFY instead, and each serving
+# process runs one LISTEN thread feeding its broker, so transitions written
+# by other workers or by the scheduler (expire_slots) reach every stream.
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections
+
+from .models import Slot
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = "courtly_slot_events"
+PG_PAYLOAD_SLOTS = 100   # NOTIFY payloads are capped at 8000 bytes
+MAX_EVENT_SLOTS = 1000   # bigger batches (expire_slots, horizon moves) become "resync"
+
+
+def sse_message(event, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+RESYNC = sse_message("resync", {})
+
+
+class Subscription:
+    """One stream's bounded queue, bound to the event loop that reads it."""
+
+    def __init__(self, club_id, loop, maxsize):
+        self.club_id = club_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def _push(self, message):
+        # Runs on self.loop. A reader that fell this far behind gets one
+        # "resync" instead of a backlog: it reloads via /api/slots/changes/.
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class SlotEventBroker:
+    """Per-club subscriber registry; `publish()` is safe from any thread."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, club_id) -> Subscription:
+        """Call from the event loop that will read the subscription."""
+        sub = Subscription(club_id, asyncio.get_running_loop(), settings.SLOT_STREAM_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[club_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.club_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.club_id]
+
+    def has_subscribers(self, club_id=None) -> bool:
+        if club_id is None:
+            return bool(self._subscribers)
+        return club_id in self._subscribers
+
+    def publish(self, club_id, message):
+        with self._lock:
+            subs = list(self._subscribers.get(club_id, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._push, message)
+            except RuntimeError:  # loop already closed; the stream is going away
+                self.unsubscribe(sub)
+
+    def publish_all(self, message):
+        with self._lock:
+            club_ids = list(self._subscribers)
+        for club_id in club_ids:
+            self.publish(club_id, message)
+
+
+broker = SlotEventBroker()
+
+
+def events_backend() -> str:
+    """"postgres" (NOTIFY/LISTEN across processes) or "local" (this process only)."""
+    return settings.SLOT_EVENTS_BACKEND or ("postgres" if connection.vendor == "postgresql" else "local")
+
+
+# ── publishing (writer side, after commit) ─────────────────────────────
+def publish_slot_changes(slot_ids, days):
+    """Encode the current status of `slot_ids` per club and fan it out."""
+    local = events_backend() == "local"
+    clubs = {club_id for club_id, _ in days}
+    if local and not any(broker.has_subscribers(c) for c in clubs):
+        return
+
+    events = defaultdict(list)
+    if slot_ids and len(slot_ids) <= MAX_EVENT_SLOTS:
+        rows = (
+            Slot.objects
+            .filter(id__in=slot_ids)
+            .values_list("id", "status", "court_id", "court__club_id", "service_date")
+        )
+        for slot_id, status, court_id, club_id, service_date in rows:
+            events[club_id].append({
+                "id": slot_id,
+                "slot_status": status,
+                "court": court_id,
+                "service_date": service_date.isoformat(),
+            })
+    # Slots created or deleted, or too many to list: clients reload the grid
+    resync = clubs - set(events)
+
+    if local:
+        for club_id, slots in events.items():
+            broker.publish(club_id, sse_message("slots", {"club": club_id, "slots": slots}))
+        for club_id in resync:
+            broker.publish(club_id, RESYNC)
+        return
+
+    payloads = [
+        json.dumps({"club": club_id, "slots": slots[i:i + PG_PAYLOAD_SLOTS]}, separators=(",", ":"))
+        for club_id, slots in events.items()
+        for i in range(0, len(slots), PG_PAYLOAD_SLOTS)
+    ]
+    payloads += [json.dumps({"club": club_id, "resync": True}) for club_id in resync]
+    with connection.cursor() as cursor:
+        for payload in payloads:
+            cursor.execute("SELECT pg_notify(%s, %s)", [PG_CHANNEL, payload])
+
+
+# ── listening (serving side, Postgres only) ────────────────────────────
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener():
+    """Start this process's LISTEN thread once, when the first stream opens."""
+    global _listener
+    if events_backend() != "postgres" or _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen_forever, name="slot-event-listener", daemon=True)
+            _listener.start()
+
+
+def _listen_forever():
+    while True:
+        try:
+            _listen()
+        except Exception:
+            logger.exception("Slot event listener lost its connection; reconnecting")
+        finally:
+            connections["default"].close()
+        # Events may have been missed while disconnected
+        broker.publish_all(RESYNC)
+        time.sleep(1)
+
+
+def _listen():
+    conn = connections["default"]
+    conn.ensure_connection()
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {PG_CHANNEL}")
+    raw = conn.connection
+    while True:
+        if select.select([raw], [], [], 60) == ([], [], []):
+            continue
+        raw.poll()
+        while raw.notifies:
+            data = json.loads(raw.notifies.pop(0).payload)
+            club_id = data.pop("club")
+            if data.get("resync"):
+                broker.publish(club_id, RESYNC)
+            else:
+                broker.publish(club_id, sse_message("slots", {"club": club_id, "slots": data["slots"]}))
@@ -0,0 +1,56 @@
+from time import monotonic
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+
+from booking.archive import archive_month
+from booking.availability import archive_cutoff, month_start
+from booking.models import Slot
+
+
+class Command(BaseCommand):
+    help = (
+        "Move never-booked slots of past months out of booking_slot, into the "
+        "SlotArchive table or gzipped JSON-lines files. Booked slots stay."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months", type=int, default=settings.SLOT_ARCHIVE_KEEP_MONTHS,
+            help="Full months before the current one to keep hot (default SLOT_ARCHIVE_KEEP_MONTHS)",
+        )
+        parser.add_argument(
+            "--export-dir",
+            help="Write slots-YYYY-MM.jsonl.gz files here instead of the SlotArchive table",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Slots moved per transaction (default 5000)")
+
+    def handle(self, *args, **options):
+        started = monotonic()
+        if options["keep_months"] < settings.SLOT_ARCHIVE_KEEP_MONTHS:
+            # Rollup rows are only frozen before the configured cutoff
+            raise CommandError(
+                f"--keep-months must be at least SLOT_ARCHIVE_KEEP_MONTHS ({settings.SLOT_ARCHIVE_KEEP_MONTHS})"
+            )
+
+        cutoff = archive_cutoff(options["keep_months"])
+        oldest = (
+            Slot.objects.filter(service_date__lt=cutoff, booked_by__isnull=True)
+            .aggregate(d=Min("service_date"))["d"]
+        )
+
+        counts = {}
+        month = month_start(oldest) if oldest else cutoff
+        while month < cutoff:
+            moved = archive_month(month, max(1, options["batch_size"]), options["export_dir"])
+            if moved:
+                counts[f"{month:%Y-%m}"] = moved
+            month = month_start(month, -1)
+
+        target = options["export_dir"] or "SlotArchive"
+        months = ", ".join(f"{m}: {n}" for m, n in counts.items()) or "nothing to move"
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {sum(counts.values())} slots before {cutoff} to {target} ({months}) "
+            f"[{monotonic() - started:.2f}s]"
+        ))
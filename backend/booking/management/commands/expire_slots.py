@@ -1,92 +1,121 @@
+from datetime import timedelta
+from time import monotonic
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, OuterRef, Q, Subquery
 from django.utils import timezone
-from booking.models import Slot, SlotStatus, BookingSlot
 
+from booking.models import Booking, BookingSlot, JobWatermark, SlotStatus
+from booking.signals import notify_slot_status_changed
+from booking.transitions import ENDED, EXPIRED, NOSHOW, booking_sources, move_slots, slot_sources
 
-class Command(BaseCommand):
-    help = "Auto-update slot and booking statuses based on Courtly spec"
+# JobWatermark row: slots that ended, or changed status, before this
+# instant were handled by an earlier run.
+WATERMARK_NAME = "expire_slots"
+
+# Slot statuses set once end_at has passed (sources: booking.transitions "expire")
+SLOT_TARGETS = (EXPIRED, NOSHOW, ENDED)
+
+# Booking follows its LAST slot: (last slot status, new booking status)
+BOOKING_TARGETS = (
+    (NOSHOW, "noshow"),
+    (ENDED, "endgame"),
+)
 
-    def handle(self, *args, **kwargs):
+
+class Command(BaseCommand):
+    help = (
+        "Auto-update slot and booking statuses based on Courtly spec. "
+        "Only slots that ended, or changed status, since the previous run are scanned."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--overlap", type=int, default=60,
+            help="Minutes to re-scan before the saved watermark (default 60)",
+        )
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Ignore the watermark and scan every slot that has ended",
+        )
+
+    def handle(self, *args, **options):
+        started = monotonic()
         now = timezone.now()
-        updated = 0
-
-        slots = Slot.objects.select_related("slot_status").all()
-
-        for slot in slots:
-            st = slot.slot_status
-            start = timezone.localtime(slot.start_at)
-            end = timezone.localtime(slot.end_at)
-
-            # ----------------------------------------------------------------------
-            # 1) AVAILABLE → EXPIRED
-            # ----------------------------------------------------------------------
-            if st.status == "available" and end < now:
-                st.status = "expired"
-                st.save(update_fields=["status", "updated_at"])
-                updated += 1
-                continue
-
-            # ----------------------------------------------------------------------
-            # 2) UPCOMING / BOOKED / WALKIN → NOSHOW
-            # (Slot only becomes noshow AFTER end time)
-            #
-            # Booking noshow only when this is the LAST slot.
-            # ----------------------------------------------------------------------
-            if st.status in ["upcoming", "booked", "walkin"]:
-
-                # Not yet start → skip
-                if start > now:
-                    continue
-
-                # Passed start but not end → still waiting for check-in
-                if start <= now < end:
-                    continue
-
-                # End time passed → NOSHOW
-                if end < now:
-                    st.status = "noshow"
-                    st.save(update_fields=["status", "updated_at"])
-
-                    # update booking ONLY if this is last slot
-                    bs = BookingSlot.objects.filter(slot=slot).select_related("booking").first()
-                    if bs:
-                        last_slot = (
-                            BookingSlot.objects.filter(booking=bs.booking)
-                            .select_related("slot")
-                            .order_by("-slot__end_at")
-                            .first()
-                        )
-                        if last_slot and last_slot.slot.id == slot.id:
-                            if bs.booking.status in ["upcoming", "booked", "walkin"]:
-                                bs.booking.status = "noshow"
-                                bs.booking.save(update_fields=["status"])
-
-                    updated += 1
-                    continue
-
-            # ----------------------------------------------------------------------
-            # 3) PLAYING → ENDED
-            # (Slot must first become playing when manager checks in)
-            #
-            # Booking → ENDGAME only when the last slot ends.
-            # ----------------------------------------------------------------------
-            if st.status == "playing" and end < now:
-                st.status = "ended"
-                st.save(update_fields=["status", "updated_at"])
-
-                bs = BookingSlot.objects.filter(slot=slot).select_related("booking").first()
-                if bs:
-                    last_slot = (
-                        BookingSlot.objects.filter(booking=bs.booking)
-                        .select_related("slot")
-                        .order_by("-slot__end_at")
-                        .first()
-                    )
-                    if last_slot and last_slot.slot.id == slot.id:
-                        bs.booking.status = "endgame"
-                        bs.booking.save(update_fields=["status"])
-
-                updated += 1
-                continue
-
-        self.stdout.write(self.style.SUCCESS(f"Updated {updated} slot statuses"))
+
+        since = None
+        watermark = None if options["full"] else (
+            JobWatermark.objects.filter(name=WATERMARK_NAME).values_list("value", flat=True).first()
+        )
+        if watermark:
+            since = watermark - timedelta(minutes=options["overlap"])
+
+        with transaction.atomic():
+            changed_ids, slot_counts = self.expire_slots(now, since)
+            booking_counts = self.promote_bookings(now, since)
+            notify_slot_status_changed(changed_ids)
+            # Advances only if this run commits
+            if not JobWatermark.objects.filter(name=WATERMARK_NAME).update(value=now):
+                JobWatermark.objects.create(name=WATERMARK_NAME, value=now)
+
+        window = f"since {timezone.localtime(since):%Y-%m-%d %H:%M}" if since else "full scan"
+        slots = ", ".join(f"{n} → {status}" for status, n in slot_counts.items())
+        bookings = ", ".join(f"{n} → {status}" for status, n in booking_counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {len(changed_ids)} slot statuses ({slots}); "
+            f"bookings: {bookings} [{window}, {monotonic() - started:.2f}s]"
+        ))
+
+    def due(self, queryset, end_field, changed_field, now, since):
+        """
+        Restrict `queryset` to rows that ended before `now` and, after a
+        previous run, either ended or changed status since `since`: a past
+        slot moved back by hand becomes due again although its end_at window
+        has long gone by.
+        """
+        queryset = queryset.filter(**{f"{end_field}__lt": now})
+        if since:
+            queryset = queryset.filter(Q(**{f"{end_field}__gte": since}) | Q(**{f"{changed_field}__gte": since}))
+        return queryset
+
+    def expire_slots(self, now, since):
+        """One locked SELECT + one UPDATE per transition, whatever the slot count."""
+        changed_ids, counts = [], {}
+        for to_status in SLOT_TARGETS:
+            current = dict(
+                self.due(
+                    SlotStatus.objects.filter(status__in=slot_sources("expire", to_status)),
+                    "slot__end_at", "slot__status_updated_at", now, since,
+                )
+                .select_for_update(of=("self",))
+                .values_list("slot_id", "status")
+            )
+            ids = move_slots("expire", current, to_status, at=now)
+            counts[to_status] = len(ids)
+            changed_ids += ids
+        return changed_ids, counts
+
+    def promote_bookings(self, now, since):
+        """
+        Bookings whose last slot has ended follow that slot's final status.
+        One aggregate query per transition picks them out.
+        """
+        last_slot = BookingSlot.objects.filter(booking_id=OuterRef("pk")).order_by("-slot__end_at")
+        bookings = Booking.objects.annotate(
+            last_end=Max("booking_slots__slot__end_at"),
+            last_changed=Max("booking_slots__slot__status_updated_at"),
+            last_status=Subquery(last_slot.values("slot__status")[:1]),
+        )
+
+        counts = {}
+        for slot_status, to_status in BOOKING_TARGETS:
+            qs = (
+                self.due(bookings, "last_end", "last_changed", now, since)
+                .filter(last_status=slot_status, status__in=booking_sources("expire", to_status))
+            )
+            ids = list(qs.values_list("id", flat=True))
+            if ids:
+                Booking.objects.filter(id__in=ids).update(status=to_status)
+            counts[to_status] = len(ids)
+        return counts
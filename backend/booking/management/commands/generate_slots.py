@@ -1,8 +1,20 @@
+from datetime import datetime, timedelta, time
+from itertools import islice
+from time import monotonic
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
 from booking.models import Court, Slot, SlotStatus
+from booking.signals import notify_slot_status_changed
 from core.models import Club
-from datetime import datetime, timedelta, time
-from django.utils import timezone
+
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
 
 
 class Command(BaseCommand):
@@ -12,11 +24,16 @@ class Command(BaseCommand):
         parser.add_argument("--club", type=int, required=True, help="Club ID")
         parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD)")
         parser.add_argument("--end", type=str, required=True, help="End date (YYYY-MM-DD)")
+        parser.add_argument(
+            "--batch-size", type=int, default=2000,
+            help="Rows per bulk INSERT for Slot and SlotStatus (default 2000)",
+        )
 
     def handle(self, *args, **options):
         club_id = options["club"]
         start_date = datetime.strptime(options["start"], "%Y-%m-%d").date()
         end_date = datetime.strptime(options["end"], "%Y-%m-%d").date()
+        batch_size = max(1, options["batch_size"])
 
         # ✅ ตรวจสอบ club
         try:
@@ -30,44 +47,57 @@ class Command(BaseCommand):
         close_time = time(22, 0)
 
         # ✅ ดึง court ทั้งหมดใน club (ใช้ club_id เพื่อป้องกัน instance mismatch)
-        courts = Court.objects.filter(club_id=club.id).order_by("id")
-        if not courts.exists():
+        court_ids = list(Court.objects.filter(club_id=club.id).order_by("id").values_list("id", flat=True))
+        if not court_ids:
             self.stderr.write(self.style.ERROR(f"❌ No courts found for club {club.name}"))
             return
 
         tz = timezone.get_current_timezone()  # จะเป็น Asia/Bangkok
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+        def build_slots():
+            for court_id in court_ids:
+                for d in days:
+                    current = timezone.make_aware(datetime.combine(d, open_time), tz)
+                    end_dt = timezone.make_aware(datetime.combine(d, close_time), tz)
+                    while current < end_dt:
+                        yield Slot(
+                            court_id=court_id,
+                            service_date=d,
+                            start_at=current,
+                            end_at=current + timedelta(minutes=30),
+                            dow=d.weekday(),
+                            price_coins=100,
+                        )
+                        current += timedelta(minutes=30)
+
+        self.stdout.write(self.style.WARNING(
+            f"🧩 Starting slot generation for {club.name} ({len(court_ids)} courts, {len(days)} days)..."
+        ))
+        started = monotonic()
         created = 0
 
-        self.stdout.write(self.style.WARNING(f"🧩 Starting slot generation for {club.name} ({courts.count()} courts)..."))
-
-        # ✅ loop court ทั้งหมด
-        for court in courts:
-            self.stdout.write(f"➡️ Generating slots for {court.name} (id={court.id})")
-            d = start_date
-            while d <= end_date:
-                # ✅ สร้าง datetime timezone-aware
-                start_dt = timezone.make_aware(datetime.combine(d, open_time), tz)
-                end_dt = timezone.make_aware(datetime.combine(d, close_time), tz)
-
-                # 🧹 ลบ slot เดิมในวันนั้นก่อน (ป้องกันซ้ำหรือ timezone mismatch)
-                Slot.objects.filter(court=court, service_date=d).delete()
-
-                # ✅ วนสร้าง slot ทุก 30 นาที
-                current_time = start_dt
-                while current_time < end_dt:
-                    slot = Slot.objects.create(
-                        court=court,
-                        service_date=d,
-                        start_at=current_time,
-                        end_at=current_time + timedelta(minutes=30),
-                        price_coins=100,
-                    )
-                    SlotStatus.objects.create(slot=slot, status="available")
-                    created += 1
-                    current_time += timedelta(minutes=30)
-
-                d += timedelta(days=1)
+        with transaction.atomic():
+            # 🧹 ลบ slot เดิมในช่วงวันที่ก่อน (ป้องกันซ้ำหรือ timezone mismatch) — one DELETE
+            deleted, _ = Slot.objects.filter(
+                court_id__in=court_ids, service_date__gte=start_date, service_date__lte=end_date
+            ).delete()
+
+            # ✅ bulk insert ทีละ batch: Slot แล้วตามด้วย SlotStatus
+            for chunk in chunked(build_slots(), batch_size):
+                Slot.objects.bulk_create(chunk)
+                SlotStatus.objects.bulk_create(
+                    [SlotStatus(slot_id=s.id, status="available") for s in chunk]
+                )
+                created += len(chunk)
+
+            # 📊 อัปเดต DayAvailability ของวันที่สร้างใหม่
+            notify_slot_status_changed(days={(club.id, d) for d in days})
 
+        elapsed = monotonic() - started
+        rate = created / elapsed if elapsed else created
         self.stdout.write(self.style.SUCCESS(
-            f"✅ Created {created} slots for club {club.name} (Asia/Bangkok timezone)"
+            f"✅ Created {created} slots for club {club.name} (Asia/Bangkok timezone) "
+            f"in {elapsed:.2f}s — {rate:,.0f} slots/s, batch size {batch_size}, "
+            f"{deleted} old rows removed"
         ))
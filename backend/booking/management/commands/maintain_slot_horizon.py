@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta, time
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from booking.models import Court, Slot, SlotStatus
+from booking.signals import notify_slot_status_changed
+from booking.transitions import MAINTENANCE, move_slots
+from core.models import Club
+from ops.models import BusinessHour, Closure, MaintenanceBlock
+
+# Used for clubs that have no BusinessHour rows yet (same as generate_slots)
+DEFAULT_HOURS = (time(10, 0), time(22, 0))
+SLOT_LENGTH = timedelta(minutes=30)
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert missing 30-min slots up to N days ahead, following ops.BusinessHour, "
+        "skipping ops.Closure dates and marking ops.MaintenanceBlock ranges as maintenance. "
+        "Existing slots and their statuses are never deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Horizon in days from today (default 30)")
+        parser.add_argument("--club", type=int, help="Club ID (default: all clubs)")
+        parser.add_argument("--price", type=int, default=100, help="price_coins for new slots (default 100)")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk INSERT (default 2000)")
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Re-scan the whole horizon instead of only the days after each court's last slot",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        horizon_end = today + timedelta(days=options["days"])
+
+        clubs = Club.objects.order_by("id")
+        if options["club"]:
+            clubs = clubs.filter(id=options["club"])
+
+        for club in clubs:
+            started = monotonic()
+            with transaction.atomic():
+                created, maintenance, days = self.maintain_club(club, today, horizon_end, options)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {club.name}: {created} slots added over {days} days, "
+                f"{maintenance} set to maintenance ({monotonic() - started:.2f}s)"
+            ))
+
+    def maintain_club(self, club, today, horizon_end, options):
+        court_ids = list(Court.objects.filter(club_id=club.id).order_by("id").values_list("id", flat=True))
+        if not court_ids:
+            return 0, 0, 0
+
+        # Only days after each court's last generated slot are new work
+        court_start = {court_id: today for court_id in court_ids}
+        if not options["full"]:
+            last_days = (
+                Slot.objects
+                .filter(court_id__in=court_ids, service_date__gte=today)
+                .values("court_id")
+                .annotate(last=Max("service_date"))
+                .values_list("court_id", "last")
+            )
+            for court_id, last in last_days:
+                court_start[court_id] = last + timedelta(days=1)
+
+        first_new_day = min(court_start.values())
+        if first_new_day > horizon_end:
+            return 0, self.apply_maintenance(court_ids, today, horizon_end), 0
+
+        hours = {
+            bh.dow: (bh.open_time, bh.close_time)
+            for bh in BusinessHour.objects.filter(club_id=club.id)
+        } or {dow: DEFAULT_HOURS for dow in range(7)}
+        closed = set(
+            Closure.objects
+            .filter(club_id=club.id, date__gte=first_new_day, date__lte=horizon_end)
+            .values_list("date", flat=True)
+        )
+
+        tz = timezone.get_current_timezone()
+        new_slots = []
+        for court_id, start in court_start.items():
+            d = start
+            while d <= horizon_end:
+                if d not in closed and d.weekday() in hours:
+                    open_time, close_time = hours[d.weekday()]
+                    current = timezone.make_aware(datetime.combine(d, open_time), tz)
+                    close_dt = timezone.make_aware(datetime.combine(d, close_time), tz)
+                    if close_dt <= current:  # closes after midnight
+                        close_dt += timedelta(days=1)
+                    while current + SLOT_LENGTH <= close_dt:
+                        new_slots.append(Slot(
+                            court_id=court_id,
+                            service_date=d,
+                            start_at=current,
+                            end_at=current + SLOT_LENGTH,
+                            dow=d.weekday(),
+                            price_coins=options["price"],
+                        ))
+                        current += SLOT_LENGTH
+                d += timedelta(days=1)
+
+        # Upsert on the (court, start_at) unique key: existing rows are left alone
+        Slot.objects.bulk_create(new_slots, batch_size=options["batch_size"], ignore_conflicts=True)
+
+        blocks = self.maintenance_blocks(court_ids, first_new_day, horizon_end)
+        missing = (
+            Slot.objects
+            .filter(
+                court_id__in=court_ids,
+                service_date__gte=first_new_day,
+                service_date__lte=horizon_end,
+                slot_status__isnull=True,
+            )
+            .values_list("id", "court_id", "start_at", "end_at", "service_date")
+        )
+        statuses, days = [], set()
+        for slot_id, court_id, start_at, end_at, service_date in missing:
+            blocked = any(
+                b.court_id == court_id and b.start_at < end_at and b.end_at > start_at
+                for b in blocks
+            )
+            statuses.append(SlotStatus(slot_id=slot_id, status="maintenance" if blocked else "available"))
+            days.add((club.id, service_date))
+        SlotStatus.objects.bulk_create(statuses, batch_size=options["batch_size"])
+
+        maintenance = self.apply_maintenance(court_ids, today, horizon_end)
+        notify_slot_status_changed(days=days)
+        return len(statuses), maintenance, len(days)
+
+    def maintenance_blocks(self, court_ids, first_day, last_day):
+        tz = timezone.get_current_timezone()
+        window_start = timezone.make_aware(datetime.combine(first_day, time.min), tz)
+        window_end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), time.min), tz)
+        return list(MaintenanceBlock.objects.filter(
+            court_id__in=court_ids, start_at__lt=window_end, end_at__gt=window_start,
+        ))
+
+    def apply_maintenance(self, court_ids, first_day, last_day):
+        """Flip still-available slots that overlap a MaintenanceBlock (one UPDATE per block)."""
+        changed = []
+        for b in self.maintenance_blocks(court_ids, first_day, last_day):
+            current = dict(
+                SlotStatus.objects
+                .filter(
+                    slot__court_id=b.court_id,
+                    slot__start_at__lt=b.end_at,
+                    slot__end_at__gt=b.start_at,
+                    status="available",
+                )
+                .select_for_update(of=("self",))
+                .values_list("slot_id", "status")
+            )
+            changed += move_slots("maintenance", current, MAINTENANCE)
+        notify_slot_status_changed(changed)
+        return len(changed)
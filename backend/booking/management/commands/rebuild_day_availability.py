@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from booking.availability import rebuild_day_availability
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DayAvailability rollup used by /api/available-slots/"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--club", type=int, help="Club ID (default: all clubs)")
+        parser.add_argument("--start", type=str, help="Start date (YYYY-MM-DD)")
+        parser.add_argument("--end", type=str, help="End date (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        start = datetime.strptime(options["start"], "%Y-%m-%d").date() if options["start"] else None
+        end = datetime.strptime(options["end"], "%Y-%m-%d").date() if options["end"] else None
+
+        with transaction.atomic():
+            rows = rebuild_day_availability(club_id=options["club"], start=start, end=end)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} day availability rows"))
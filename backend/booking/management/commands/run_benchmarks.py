@@ -0,0 +1,466 @@
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import threading
+import time as clock
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from io import BytesIO, StringIO
+from time import perf_counter
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from booking.availability import rebuild_day_availability
+from booking.models import Booking, BookingSlot, Slot, SlotStatus
+from core.models import Club, Court
+from ops.audit import flush_audit_log
+from wallet.models import CoinLedger, Wallet
+
+COURTS_PER_CLUB = 6
+OPEN, CLOSE = time(10, 0), time(22, 0)  # 24 half-hour slots per court-day
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a realistic dataset into a throwaway test database and time the calendar, "
+        "booking and wallet hot paths. Prints (or writes) JSON with p50/p95 latency, "
+        "query counts and peak Python memory per scenario so runs can be compared."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clubs", type=int, default=4, help="Clubs to seed (6 courts each, default 4)")
+        parser.add_argument("--days", type=int, default=365, help="Days of slots, half past / half ahead (default 365)")
+        parser.add_argument("--bookings", type=int, default=150000, help="Bookings to seed (default 150000)")
+        parser.add_argument("--users", type=int, default=2000, help="Players to seed (default 2000)")
+        parser.add_argument("--iterations", type=int, default=30, help="Timed runs per scenario (default 30)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the dataset (default 42)")
+        parser.add_argument("--output", type=str, help="Write JSON here instead of stdout")
+        parser.add_argument("--clients", type=int, default=64,
+                            help="Concurrent clients in the sync-vs-async section (default 64)")
+        parser.add_argument("--rounds", type=int, default=5, help="Requests per client there (default 5)")
+        parser.add_argument("--worker-threads", type=int, default=4,
+                            help="Threads of the WSGI worker being compared (default 4, gunicorn gthread)")
+        parser.add_argument("--db-latency-ms", type=float, default=2.0,
+                            help="Round trip added to every query in that section, as to a remote Postgres (default 2)")
+        parser.add_argument(
+            "--keepdb", action="store_true",
+            help="Keep the benchmark database between runs and skip seeding when it is already filled",
+        )
+
+    def handle(self, *args, **options):
+        runner = DiscoverRunner(verbosity=0, keepdb=options["keepdb"], interactive=False)
+        runner.setup_test_environment()  # ALLOWED_HOSTS for the in-process client, locmem email
+        old_config = runner.setup_databases()
+        try:
+            if not Slot.objects.exists():
+                started = perf_counter()
+                self.seed(options)
+                self.stderr.write(f"Seeded dataset in {perf_counter() - started:.1f}s")
+            report = self.run_scenarios(options)
+            report["concurrency"] = self.run_concurrency(options)
+            flush_audit_log()  # before the database goes away
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(text + "\n")
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(text)
+
+    # ── dataset ────────────────────────────────────────────────────────
+    def seed(self, options):
+        rng = random.Random(options["seed"])
+        tz = timezone.get_current_timezone()
+        today = timezone.localdate()
+        first_day = today - timedelta(days=options["days"] // 2)
+        User = get_user_model()
+
+        User.objects.create_user(username="bench-manager", email="bench-manager@example.com",
+                                 password="bench", role="manager")
+        User.objects.bulk_create(
+            [User(username=f"bench{i}", email=f"bench{i}@example.com", password="!") for i in range(options["users"])],
+            batch_size=2000,
+        )
+        user_ids = list(User.objects.filter(username__startswith="bench", role="player").values_list("id", flat=True))
+
+        for c in range(options["clubs"]):
+            club = Club.objects.create(name=f"Bench Club {c + 1}")
+            Court.objects.bulk_create([Court(club=club, name=f"Court {i + 1}") for i in range(COURTS_PER_CLUB)])
+
+        slots = []
+        for court_id in Court.objects.order_by("id").values_list("id", flat=True):
+            for d in range(options["days"]):
+                day = first_day + timedelta(days=d)
+                current = timezone.make_aware(datetime.combine(day, OPEN), tz)
+                close_dt = timezone.make_aware(datetime.combine(day, CLOSE), tz)
+                while current < close_dt:
+                    slots.append(Slot(
+                        court_id=court_id, service_date=day, start_at=current,
+                        end_at=current + timedelta(minutes=30), dow=day.weekday(), price_coins=100,
+                    ))
+                    current += timedelta(minutes=30)
+        Slot.objects.bulk_create(slots, batch_size=5000)
+        del slots
+
+        rows = list(Slot.objects.order_by("id").values_list("id", "court_id", "court__club_id", "service_date", "end_at"))
+        booked_count = min(options["bookings"], int(len(rows) * 0.7))
+        booked = rng.sample(range(len(rows)), booked_count)
+        now = timezone.now()
+
+        statuses = {}
+        bookings, links, ledger = [], [], []
+        for n, idx in enumerate(booked):
+            slot_id, court_id, club_id, service_date, end_at = rows[idx]
+            past = end_at < now
+            slot_status = rng.choice(("ended", "ended", "noshow")) if past else "booked"
+            statuses[slot_id] = slot_status
+            bookings.append(Booking(
+                booking_no=f"BK-S{n:08d}", user_id=rng.choice(user_ids), club_id=club_id, court_id=court_id,
+                status={"ended": "endgame", "noshow": "noshow", "booked": "upcoming"}[slot_status],
+                total_cost=100, booking_date=service_date, booking_method="Courtly Website",
+            ))
+        Booking.objects.bulk_create(bookings, batch_size=5000)
+
+        booking_ids = dict(Booking.objects.filter(booking_no__startswith="BK-S").values_list("booking_no", "id"))
+        balances = {uid: 0 for uid in user_ids}
+        for uid in user_ids:
+            balances[uid] += 50000
+            ledger.append(CoinLedger(user_id=uid, type="topup", amount=50000, balance_after=balances[uid]))
+        for n, (idx, b) in enumerate(zip(booked, bookings)):
+            links.append(BookingSlot(booking_id=booking_ids[b.booking_no], slot_id=rows[idx][0]))
+            balances[b.user_id] -= 100
+            ledger.append(CoinLedger(
+                user_id=b.user_id, type="capture", amount=-100,
+                ref_booking_id=booking_ids[b.booking_no], balance_after=balances[b.user_id],
+            ))
+        BookingSlot.objects.bulk_create(links, batch_size=5000)
+        CoinLedger.objects.bulk_create(ledger, batch_size=5000)
+        Wallet.objects.bulk_create([Wallet(user_id=uid, balance=bal) for uid, bal in balances.items()], batch_size=5000)
+
+        SlotStatus.objects.bulk_create(
+            [
+                SlotStatus(slot_id=slot_id, status=statuses.get(slot_id) or ("expired" if end_at < now else "available"))
+                for slot_id, _, _, _, end_at in rows
+            ],
+            batch_size=5000,
+        )
+        rebuild_day_availability()
+
+    # ── scenarios ──────────────────────────────────────────────────────
+    def measure(self, name, call, iterations, setup=None):
+        """Time `call()` `iterations` times, count queries, then record peak memory on one extra run."""
+        timings, queries = [], []
+        for _ in range(iterations):
+            if setup:
+                setup()
+            with CaptureQueriesContext(connection) as ctx:
+                started = perf_counter()
+                call()
+                timings.append((perf_counter() - started) * 1000)
+            queries.append(len(ctx))
+
+        if setup:
+            setup()
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        result = {
+            "iterations": iterations,
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            "mean_ms": round(statistics.fmean(timings), 2),
+            "queries": max(queries),
+            "peak_kb": round(peak / 1024, 1),
+        }
+        self.stderr.write(f"  {name:<32} p50={result['p50_ms']:>8}ms p95={result['p95_ms']:>8}ms q={result['queries']}")
+        return result
+
+    def expect(self, client_call, status_code):
+        def call():
+            res = client_call()
+            if res.status_code != status_code:
+                raise AssertionError(f"expected {status_code}, got {res.status_code}: {getattr(res, 'data', res)}")
+            return res
+        return call
+
+    def run_scenarios(self, options):
+        n = options["iterations"]
+        User = get_user_model()
+        club = Club.objects.order_by("id").first()
+        month = (timezone.localdate().replace(day=1) + timedelta(days=32)).strftime("%Y-%m")
+        manager = User.objects.get(username="bench-manager")
+        player = User.objects.filter(role="player", username__startswith="bench").order_by("id").first()
+
+        public, player_client, manager_client = APIClient(), APIClient(), APIClient()
+        player_client.force_authenticate(player)
+        manager_client.force_authenticate(manager)
+
+        # Free slot pairs at least two days ahead, so each booking can be cancelled again
+        free = list(
+            Slot.objects.filter(
+                court__club=club, status="available",
+                start_at__gte=timezone.now() + timedelta(days=2),
+            ).order_by("court_id", "start_at").values_list("id", flat=True)[: 2 * (n + 1)]
+        )
+        pairs = iter([free[i:i + 2] for i in range(0, len(free), 2)])
+        created = []
+
+        def book():
+            res = player_client.post("/api/booking/", {"club": club.id, "slots": next(pairs)}, format="json")
+            created.append(res.data["booking_id"])
+            return res
+
+        def cancel_next():
+            return player_client.post(f"/api/booking/{created.pop(0)}/cancel/")
+
+        results = {}
+        self.stderr.write("Running scenarios:")
+        month_qs = f"?club={club.id}&month={month}"
+        results["available_slots_month.cold"] = self.measure(
+            "available_slots_month (cold)",
+            self.expect(lambda: public.get(f"/api/available-slots/{month_qs}"), 200), n, setup=cache.clear,
+        )
+        results["available_slots_month.warm"] = self.measure(
+            "available_slots_month (warm)", self.expect(lambda: public.get(f"/api/available-slots/{month_qs}"), 200), n,
+        )
+        results["slot_month_view.cold"] = self.measure(
+            "slot_month_view (cold)",
+            self.expect(lambda: public.get(f"/api/month-view/{month_qs}"), 200), n, setup=cache.clear,
+        )
+        results["slot_month_view.warm"] = self.measure(
+            "slot_month_view (warm)", self.expect(lambda: public.get(f"/api/month-view/{month_qs}"), 200), n,
+        )
+        results["booking_create"] = self.measure("booking_create", self.expect(book, 201), n)
+        results["booking_cancel"] = self.measure("booking_cancel", self.expect(cancel_next, 200), n)
+        results["bookings_all.first_page"] = self.measure(
+            "bookings_all (first page)", self.expect(lambda: manager_client.get("/api/bookings/"), 200), n,
+        )
+        results["bookings_all.filtered"] = self.measure(
+            "bookings_all (status filter)",
+            self.expect(lambda: manager_client.get("/api/bookings/?status=noshow"), 200), n,
+        )
+        results["wallet_balance"] = self.measure(
+            "wallet_balance", self.expect(lambda: player_client.get("/api/wallet/balance/"), 200), n,
+        )
+        results["expire_slots.full"] = self.measure(
+            "expire_slots (full scan)", lambda: call_command("expire_slots", full=True, stdout=StringIO()),
+            max(3, n // 10),
+        )
+        results["expire_slots.incremental"] = self.measure(
+            "expire_slots (incremental)", lambda: call_command("expire_slots", stdout=StringIO()), n,
+        )
+
+        return {
+            "meta": {
+                "timestamp": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "options": {k: options[k] for k in ("clubs", "days", "bookings", "users", "iterations", "seed")},
+                "dataset": {
+                    "clubs": Club.objects.count(),
+                    "courts": Court.objects.count(),
+                    "slots": Slot.objects.count(),
+                    "bookings": Booking.objects.count(),
+                    "ledger_entries": CoinLedger.objects.count(),
+                },
+            },
+            "results": results,
+        }
+
+    # ── sync vs async views, per worker ────────────────────────────────
+    def run_concurrency(self, options):
+        """
+        Same read endpoints through the real deployment handlers: the DRF
+        views behind courtly.wsgi with --worker-threads threads, and the async
+        views behind courtly.asgi on one event loop. `clients` callers each
+        send `rounds` requests back to back; peak_in_flight is how many
+        requests the worker was serving at once.
+        """
+        from courtly.asgi import application as asgi_app
+        from courtly.wsgi import application as wsgi_app
+
+        club = Club.objects.order_by("id").first()
+        month = (timezone.localdate().replace(day=1) + timedelta(days=32)).strftime("%Y-%m")
+        booking = Booking.objects.filter(user__isnull=False).order_by("id").select_related("user").first()
+        slot_ids = list(Slot.objects.filter(court__club=club).order_by("id").values_list("id", flat=True)[:8])
+        auth = ("Authorization", f"Bearer {AccessToken.for_user(booking.user)}")
+        requests = {
+            "available_slots_month": ("GET", "/api/available-slots/", f"club={club.id}&month={month}", b"", ()),
+            "slot_month_view": ("GET", "/api/month-view/", f"club={club.id}&month={month}", b"", ()),
+            "slots_list": ("POST", "/api/slots/slots-list/", "", json.dumps({"slot_list": slot_ids}).encode(), ()),
+            "booking_detail": ("GET", f"/api/booking/{booking.booking_no}/", "", b"", (auth,)),
+        }
+
+        latency = options["db_latency_ms"] / 1000
+
+        def slow_query(execute, sql, params, many, context):
+            clock.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            # Outermost, so request-scoped wrappers (query metrics) still pop their own
+            connection.execute_wrappers.insert(0, slow_query)
+
+        results = {}
+        self.stderr.write(
+            f"Sync vs async ({options['clients']} clients, {options['worker_threads']} WSGI threads, "
+            f"+{options['db_latency_ms']}ms per query):"
+        )
+        # Over-budget warnings (the JWT lookup on booking_detail) would time stderr, not the views
+        metrics_log = logging.getLogger("courtly.query_metrics")
+        metrics_log.disabled = True
+        connection_created.connect(add_latency)
+        try:
+            for name, req in requests.items():
+                wsgi_status = _wsgi_call(wsgi_app, *req)  # warm the month caches, check the route
+                asgi_status = asyncio.run(_asgi_call(asgi_app, *req))
+                if wsgi_status != 200 or asgi_status != 200:
+                    raise AssertionError(f"{name}: sync {wsgi_status}, async {asgi_status}")
+                results[name] = {
+                    "sync": self.load_sync(wsgi_app, req, options),
+                    "async": self.load_async(asgi_app, req, options),
+                }
+                for side in ("sync", "async"):
+                    r = results[name][side]
+                    self.stderr.write(
+                        f"  {name + ' (' + side + ')':<32} {r['rps']:>8} req/s p95={r['p95_ms']:>8}ms "
+                        f"in-flight={r['peak_in_flight']}"
+                    )
+        finally:
+            connection_created.disconnect(add_latency)
+            metrics_log.disabled = False
+        return {
+            "clients": options["clients"],
+            "rounds": options["rounds"],
+            "worker_threads": options["worker_threads"],
+            "db_latency_ms": options["db_latency_ms"],
+            "results": results,
+        }
+
+    @staticmethod
+    def _summary(timings, wall, peak):
+        timings.sort()
+        return {
+            "requests": len(timings),
+            "rps": round(len(timings) / wall, 1),
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            "peak_in_flight": peak,
+        }
+
+    def load_sync(self, app, req, options):
+        workers = threading.BoundedSemaphore(options["worker_threads"])
+        lock = threading.Lock()
+        timings, in_flight, peak = [], 0, 0
+
+        def client():
+            nonlocal in_flight, peak
+            for _ in range(options["rounds"]):
+                started = perf_counter()
+                with workers:  # waits for a free worker thread, like a queued connection
+                    with lock:
+                        in_flight += 1
+                        peak = max(peak, in_flight)
+                    _wsgi_call(app, *req)
+                    with lock:
+                        in_flight -= 1
+                with lock:
+                    timings.append((perf_counter() - started) * 1000)
+
+        started = perf_counter()
+        with ThreadPoolExecutor(options["clients"]) as pool:
+            for future in [pool.submit(client) for _ in range(options["clients"])]:
+                future.result()
+        return self._summary(timings, perf_counter() - started, peak)
+
+    def load_async(self, app, req, options):
+        async def run():
+            timings, in_flight, peak = [], 0, 0
+
+            async def client():
+                nonlocal in_flight, peak
+                for _ in range(options["rounds"]):
+                    started = perf_counter()
+                    in_flight += 1
+                    peak = max(peak, in_flight)
+                    await _asgi_call(app, *req)
+                    in_flight -= 1
+                    timings.append((perf_counter() - started) * 1000)
+
+            started = perf_counter()
+            await asyncio.gather(*(client() for _ in range(options["clients"])))
+            return self._summary(timings, perf_counter() - started, peak)
+
+        return asyncio.run(run())
+
+
+def _wsgi_call(app, method, path, query, body, headers):
+    environ = {
+        "REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": query, "SCRIPT_NAME": "",
+        "SERVER_NAME": "testserver", "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1", "CONTENT_TYPE": "application/json", "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0), "wsgi.url_scheme": "http", "wsgi.input": BytesIO(body), "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True, "wsgi.multiprocess": False, "wsgi.run_once": False,
+    }
+    environ.update({"HTTP_" + k.upper().replace("-", "_"): v for k, v in headers})
+    status = []
+    result = app(environ, lambda s, h, exc_info=None: status.append(int(s.split()[0])))
+    try:
+        b"".join(result)
+    finally:
+        result.close()  # request_finished
+    return status[0]
+
+
+async def _asgi_call(app, method, path, query, body, headers):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [
+            (b"host", b"testserver"), (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *((k.lower().encode(), v.encode()) for k, v in headers),
+        ],
+        "client": ("127.0.0.1", 0), "server": ("testserver", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Future()  # the client never disconnects early
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
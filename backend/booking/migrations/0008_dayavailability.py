@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_day_availability(apps, schema_editor):
+    Slot = apps.get_model("booking", "Slot")
+    DayAvailability = apps.get_model("booking", "DayAvailability")
+
+    counts = (
+        Slot.objects
+        .values("court__club_id", "service_date", "court_id")
+        .annotate(
+            total=Count("id"),
+            available=Count(
+                "id",
+                filter=Q(slot_status__status="available") | Q(slot_status__isnull=True),
+            ),
+        )
+        .order_by()
+    )
+
+    rows = {}
+    for c in counts.iterator(chunk_size=5000):
+        key = (c["court__club_id"], c["service_date"])
+        row = rows.setdefault(key, DayAvailability(
+            club_id=key[0], service_date=key[1], total=0, available=0, court_counts={},
+        ))
+        row.total += c["total"]
+        row.available += c["available"]
+        row.court_counts[str(c["court_id"])] = [c["total"], c["available"]]
+
+    DayAvailability.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_alter_bookingslot_slot_and_more'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DayAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service_date', models.DateField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('available', models.PositiveIntegerField(default=0)),
+                ('court_counts', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_availability', to='core.club')),
+            ],
+            options={
+                'unique_together': {('club', 'service_date')},
+            },
+        ),
+        migrations.RunPython(backfill_day_availability, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0009_booking_list_indexes'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['end_at'], name='slot_end_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slotstatus',
+            index=models.Index(fields=['status', 'slot'], name='slotstatus_status_slot_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_expire_window_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='slotstatus',
+            index=models.Index(fields=['updated_at', 'slot'], name='slotstatus_updated_slot_idx'),
+        ),
+    ]
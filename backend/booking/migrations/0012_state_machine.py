@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Values written before booking.transitions unified the status names
+LEGACY_SLOT_STATUSES = {"checkin": "playing", "endgame": "ended", "no_show": "noshow", "upcoming": "booked"}
+LEGACY_BOOKING_STATUSES = {"no_show": "noshow"}
+
+
+def rename_legacy_statuses(apps, schema_editor):
+    SlotStatus = apps.get_model("booking", "SlotStatus")
+    Booking = apps.get_model("booking", "Booking")
+    for old, new in LEGACY_SLOT_STATUSES.items():
+        SlotStatus.objects.filter(status=old).update(status=new)
+    for old, new in LEGACY_BOOKING_STATUSES.items():
+        Booking.objects.filter(status=old).update(status=new)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_slotstatus_updated_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='status',
+            field=models.CharField(choices=[('pending', 'pending'), ('confirmed', 'confirmed'), ('upcoming', 'upcoming'), ('walkin', 'walkin'), ('checkin', 'checkin'), ('endgame', 'endgame'), ('cancelled', 'cancelled'), ('completed', 'completed'), ('noshow', 'noshow')], default='confirmed', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='slotstatus',
+            name='status',
+            field=models.CharField(choices=[('available', 'Available'), ('booked', 'Booked'), ('walkin', 'Walk-in'), ('playing', 'Playing'), ('ended', 'Ended'), ('expired', 'Expired'), ('noshow', 'No-Show'), ('maintenance', 'Maintenance')], default='available', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='SlotStatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('source', models.CharField(max_length=16)),
+                ('created_at', models.DateTimeField()),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('slot', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_transitions', to='booking.slot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='slottransition_created_idx'), models.Index(fields=['slot', 'created_at'], name='slottransition_slot_idx')],
+            },
+        ),
+        migrations.RunPython(rename_legacy_statuses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0012_state_machine'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slot',
+            name='status',
+            field=models.CharField(choices=[('available', 'Available'), ('booked', 'Booked'), ('walkin', 'Walk-in'), ('playing', 'Playing'), ('ended', 'Ended'), ('expired', 'Expired'), ('noshow', 'No-Show'), ('maintenance', 'Maintenance')], default='available', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='slot',
+            name='status_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+# Slot ids per UPDATE; each chunk commits on its own so the table stays writable
+BACKFILL_CHUNK = 5000
+
+
+def backfill_slot_status(apps, schema_editor):
+    Slot = apps.get_model("booking", "Slot")
+    SlotStatus = apps.get_model("booking", "SlotStatus")
+
+    current = SlotStatus.objects.filter(slot_id=OuterRef("pk"))
+    last_id = Slot.objects.aggregate(m=Max("id"))["m"] or 0
+    for lo in range(0, last_id, BACKFILL_CHUNK):
+        with transaction.atomic():
+            (
+                Slot.objects
+                .filter(id__gt=lo, id__lte=lo + BACKFILL_CHUNK, slot_status__isnull=False)
+                .update(
+                    status=Subquery(current.values("status")[:1]),
+                    status_updated_at=Subquery(current.values("updated_at")[:1]),
+                )
+            )
+
+
+class AddIndexOnline(AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY on Postgres; a plain AddIndex elsewhere (tests)."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # Runs outside one big transaction: the backfill commits per chunk and
+    # the indexes are built without blocking writes
+    atomic = False
+
+    dependencies = [
+        ('booking', '0013_slot_status_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_slot_status, migrations.RunPython.noop),
+        AddIndexOnline(
+            model_name='slot',
+            index=models.Index(condition=models.Q(('status', 'available')), fields=['court', 'service_date'], include=('start_at', 'end_at', 'price_coins'), name='slot_available_idx'),
+        ),
+        AddIndexOnline(
+            model_name='slot',
+            index=models.Index(fields=['status_updated_at', 'id'], name='slot_status_updated_idx'),
+        ),
+    ]
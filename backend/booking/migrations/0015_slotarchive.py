@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0014_backfill_slot_status'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('service_date', models.DateField()),
+                ('start_at', models.DateTimeField()),
+                ('end_at', models.DateTimeField()),
+                ('price_coins', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('available', 'Available'), ('booked', 'Booked'), ('walkin', 'Walk-in'), ('playing', 'Playing'), ('ended', 'Ended'), ('expired', 'Expired'), ('noshow', 'No-Show'), ('maintenance', 'Maintenance')], max_length=20)),
+                ('status_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField()),
+                ('court', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.court')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['service_date', 'court'], name='slotarchive_day_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
+from collections import defaultdict
+
 from django.db import models
 from django.conf import settings
+from django.db.models.functions import Now
 from core.models import Club, Court
 
 
@@ -16,38 +19,227 @@ class Slot(models.Model):
     dow = models.PositiveSmallIntegerField(default=0)  # Day of week (0 = Mon ... 6 = Sun)
     price_coins = models.PositiveIntegerField(default=50)  # Cost per slot in coins
 
+    # Allowed moves between these live in booking.transitions
+    STATUS = (
+        ("available", "Available"),      # Free to book
+        ("booked", "Booked"),            # Reserved by a player
+        ("walkin", "Walk-in"),           # Manually booked by a manager
+        ("playing", "Playing"),          # Checked in, on court
+        ("ended", "Ended"),              # Playtime finished
+        ("expired", "Expired"),          # Time passed but unbooked
+        ("noshow", "No-Show"),           # Booked but player didn’t check-in
+        ("maintenance", "Maintenance"),  # Temporarily unavailable
+    )
+
+    # Copy of SlotStatus.status / updated_at, kept in lockstep by
+    # SlotStatusQuerySet so reads need no join. Writes still go to SlotStatus.
+    status = models.CharField(max_length=20, choices=STATUS, default="available")
+    status_updated_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         unique_together = (("court", "start_at"),)
-        indexes = [models.Index(fields=["court", "service_date"])]
+        indexes = [
+            models.Index(fields=["court", "service_date"]),
+            # expire_slots scans only the window of slots that ended since its last run
+            models.Index(fields=["end_at"], name="slot_end_at_idx"),
+            # Available slots per (court, day): the /available-slots/ listing
+            # is answered from the index alone on Postgres
+            models.Index(
+                fields=["court", "service_date"],
+                include=["start_at", "end_at", "price_coins"],
+                condition=models.Q(status="available"),
+                name="slot_available_idx",
+            ),
+            # (status_updated_at, id) is the seek key of /api/slots/changes/
+            models.Index(fields=["status_updated_at", "id"], name="slot_status_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.court} {self.start_at.isoformat()}"
 
 
+class SlotArchive(models.Model):
+    """
+    Cold storage for past slots that were never booked, moved out of Slot
+    month by month by `manage.py archive_slots` (see booking.archive).
+    Booked slots stay in Slot, so booking history never reads this table.
+    """
+    id = models.BigIntegerField(primary_key=True)  # the id it had in Slot
+    court = models.ForeignKey(Court, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    service_date = models.DateField()
+    start_at = models.DateTimeField()
+    end_at = models.DateTimeField()
+    price_coins = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=Slot.STATUS)
+    status_updated_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=["service_date", "court"], name="slotarchive_day_idx")]
+
+    def __str__(self):
+        return f"Archived slot {self.id} ({self.service_date})"
+
+
 # ────────────────────────────── Slot Status ──────────────────────────────
+class SlotStatusQuerySet(models.QuerySet):
+    """
+    Mirrors every status write onto Slot.status / status_updated_at in the
+    same transaction, so the old table and the new columns stay in lockstep
+    while both exist. Callers lock SlotStatus rows first, as before.
+
+    status_updated_at is the database clock at the mirroring UPDATE, not the
+    caller's `updated_at`: /api/slots/changes/ seeks on it and assumes it is
+    at most SLOT_CHANGES_SETTLE_SECONDS older than the commit, while a caller
+    may take its timestamp long before. bulk_create() and bulk_update() cost
+    one UPDATE per status.
+    """
+
+    def update(self, **kwargs):
+        mirrored = _slot_mirror_fields(kwargs)
+        if mirrored:
+            # Before our own UPDATE, while the filter still matches the rows
+            Slot.objects.filter(pk__in=self.values("slot_id")).update(**mirrored)
+        return super().update(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if kwargs.get("ignore_conflicts"):
+            # Rows that already existed were left alone; callers only use
+            # this to fill in missing "available" rows, which Slot already says
+            return objs
+        _mirror_statuses(objs)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        # A plain QuerySet: Django's bulk_update goes through update() with
+        # CASE WHEN pk=... values, which must not be mirrored onto Slot as is
+        rows = models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, *args, **kwargs)
+        if "status" in fields:
+            _mirror_statuses(objs)
+        elif "updated_at" in fields:
+            Slot.objects.filter(pk__in=[obj.slot_id for obj in objs]).update(
+                **_slot_mirror_fields({"updated_at": None})
+            )
+        return rows
+
+
+def _mirror_statuses(objs):
+    by_status = defaultdict(list)
+    for obj in objs:
+        by_status[obj.status].append(obj.slot_id)
+    for status, slot_ids in by_status.items():
+        Slot.objects.filter(pk__in=slot_ids).update(**_slot_mirror_fields({"status": status}))
+
+
+class StatementNow(Now):
+    """
+    Now() at the statement (STATEMENT_TIMESTAMP() on Postgres). On SQLite it
+    is padded to the six fractional digits Django writes there, so keyset
+    seeks, which compare the stored text, treat equal instants as equal.
+    """
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template="(STRFTIME('%%%%Y-%%%%m-%%%%d %%%%H:%%%%M:%%%%f', 'NOW') || '000')",
+            **extra_context,
+        )
+
+
+def _slot_mirror_fields(values):
+    mirrored = {}
+    if "status" in values:
+        mirrored["status"] = values["status"]
+    if "status" in values or "updated_at" in values:
+        mirrored["status_updated_at"] = StatementNow()
+    return mirrored
+
+
 class SlotStatus(models.Model):
     """
     Tracks the current state of a Slot.
-    Each slot has exactly one status record (1:1 relation).
+    Each slot has exactly one status record (1:1 relation). Reads use the
+    copy on Slot; see SlotStatusQuerySet.
     """
-    STATUS = (
-        ("available", "Available"),      # Free to book
-        ("booked", "Booked"),            # Reserved by a player
-        ("walkin", "Walk-in"),           # Manually booked by a manager
-        ("checkin", "Check-in"),         # Player has arrived
-        ("endgame", "Endgame"),          # Playtime finished
-        ("expired", "Expired"),          # Time passed but unbooked
-        ("no_show", "No-Show"),          # Booked but player didn’t check-in
-        ("maintenance", "Maintenance"),  # Temporarily unavailable
-    )
+    STATUS = Slot.STATUS
 
     slot = models.OneToOneField('booking.Slot', on_delete=models.CASCADE, related_name='slot_status')
     status = models.CharField(max_length=20, choices=STATUS, default="available")
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SlotStatusQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # (status, slot) lets expire_slots pick the due statuses and join on slot.end_at
+            models.Index(fields=["status", "slot"], name="slotstatus_status_slot_idx"),
+            # (updated_at, slot) is the seek key of /api/slots/changes/
+            models.Index(fields=["updated_at", "slot"], name="slotstatus_updated_slot_idx"),
+        ]
+
     def __str__(self):
         return f"Slot {self.slot_id} - {self.status}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        mirrored = _slot_mirror_fields(
+            {f: getattr(self, f) for f in ("status", "updated_at") if update_fields is None or f in update_fields}
+        )
+        if mirrored:
+            Slot.objects.filter(pk=self.slot_id).update(**mirrored)
+
+
+class SlotStatusTransition(models.Model):
+    """
+    Append-only history of SlotStatus changes, one row per slot and move,
+    bulk-inserted by booking.transitions in the writing transaction. Rows
+    outlive their slot (no FK constraint), so reports never need the
+    current-state tables.
+    """
+    slot = models.ForeignKey(
+        "booking.Slot", on_delete=models.DO_NOTHING, db_constraint=False, related_name="status_transitions"
+    )
+    from_status = models.CharField(max_length=20)
+    to_status = models.CharField(max_length=20)
+    source = models.CharField(max_length=16)  # write path: book, cancel, checkin, expire, manager, maintenance
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], name="slottransition_created_idx"),
+            models.Index(fields=["slot", "created_at"], name="slottransition_slot_idx"),
+        ]
+
+    def __str__(self):
+        return f"Slot {self.slot_id} {self.from_status} → {self.to_status}"
+
+
+# ────────────────────────────── Day Availability ──────────────────────────────
+class DayAvailability(models.Model):
+    """
+    Per-day availability rollup for a club (one row per club + service_date).
+    Maintained by booking.availability whenever a SlotStatus changes, so the
+    public calendar can read ~31 rows instead of every slot of the month.
+    """
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="day_availability")
+    service_date = models.DateField()
+    total = models.PositiveIntegerField(default=0)       # All slots of the day
+    available = models.PositiveIntegerField(default=0)   # Slots with status "available"
+    court_counts = models.JSONField(default=dict)        # {"<court_id>": [total, available]}
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (("club", "service_date"),)
+
+    def __str__(self):
+        return f"Club {self.club_id} {self.service_date} {self.available}/{self.total}"
+
 
 # ────────────────────────────── Booking ──────────────────────────────
 class Booking(models.Model):
@@ -58,12 +250,13 @@ class Booking(models.Model):
     STATUS = (
         ("pending", "pending"),        # Created but not confirmed yet
         ("confirmed", "confirmed"),    # Successfully booked
+        ("upcoming", "upcoming"),      # Booked online, not played yet
         ("walkin", "walkin"),          # Manually created by a manager
         ("checkin", "checkin"),        # User or walk-in has started playing
         ("endgame", "endgame"),        # Playtime finished
         ("cancelled", "cancelled"),    # Cancelled before playtime
         ("completed", "completed"),    # Successfully finished booking
-        ("no_show", "no_show"),        # Player did not show up
+        ("noshow", "noshow"),          # Player did not show up
     )
 
     booking_no = models.CharField(max_length=24, unique=True)
@@ -96,6 +289,16 @@ class Booking(models.Model):
     contact_method = models.CharField(max_length=50, null=True, blank=True)
     contact_detail = models.CharField(max_length=255, null=True, blank=True)
 
+    class Meta:
+        # Keyset pagination of the manager list seeks on (created_at, id), optionally per filter
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="booking_created_id_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="booking_status_created_idx"),
+            models.Index(fields=["court", "-created_at", "-id"], name="booking_court_created_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="booking_user_created_idx"),
+            models.Index(fields=["booking_date"], name="booking_date_idx"),
+        ]
+
     def __str__(self):
         return self.booking_no
 
@@ -108,3 +311,16 @@ class BookingSlot(models.Model):
     class Meta:
         unique_together = (("booking", "slot"),)
         indexes = [models.Index(fields=["booking"])]
+
+
+# ────────────────────────────── Job Watermark ──────────────────────────────
+class JobWatermark(models.Model):
+    """
+    How far a periodic command has got (e.g. expire_slots), one row per job.
+    Kept in the database so every process and every cache flush sees the same value.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    value = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
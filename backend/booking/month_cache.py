@@ -0,0 +1,128 @@
+# booking/month_cache.py
+"""
+Versioned cache for the club-month calendar payloads.
+
+Each (club, month) has a version. Cached payloads are keyed by
+(club, month, variant, version), so bumping the version after a SlotStatus
+write makes every old entry unreachable without having to find and delete it.
+
+A bump sets a fresh wall-clock value rather than incrementing: cache.incr()
+is a read-modify-write on the file-based and local-memory backends, so two
+concurrent bumps could both land on the same number.
+
+Versions only work in a cache every process shares. With a per-process
+locmem cache outside DEBUG, payloads are built on every request instead.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.http import parse_etags
+
+VERSION_KEY = "courtly:month-version:{club}:{month}"
+PAYLOAD_KEY = "courtly:month-view:{club}:{month}:{variant}:v{version}"
+
+
+_last_version = 0
+_version_lock = threading.Lock()
+
+
+def _new_version() -> int:
+    # Nanoseconds keep a bump ahead of any evicted value; the floor keeps
+    # back-to-back bumps distinct on clocks coarser than that
+    global _last_version
+    with _version_lock:
+        _last_version = max(time.time_ns(), _last_version + 1)
+        return _last_version
+
+
+def versions_are_shared() -> bool:
+    """False for a per-process locmem cache in production: other processes' bumps would never be seen."""
+    return settings.DEBUG or not isinstance(caches["default"], LocMemCache)
+
+
+def month_version(club_id: int, month: str) -> int:
+    key = VERSION_KEY.format(club=club_id, month=month)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def amonth_version(club_id: int, month: str) -> int:
+    key = VERSION_KEY.format(club=club_id, month=month)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, _new_version(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_month_versions(club_months) -> None:
+    """Invalidate every cached payload of these (club_id, "YYYY-MM") pairs."""
+    version = _new_version()
+    cache.set_many(
+        {VERSION_KEY.format(club=club_id, month=month): version for club_id, month in set(club_months)},
+        timeout=None,
+    )
+
+
+def cached_month_payload(club_id: int, month: str, variant: str, build, version=None):
+    """
+    Return the cached payload for (club, month, variant) or build and store it.
+    The version is read before building, so a write that commits while we
+    build only ever invalidates our entry, never leaves it stale. Pass
+    `version` when the caller already read it (e.g. for the ETag).
+    """
+    if not versions_are_shared():
+        return build()
+    if version is None:
+        version = month_version(club_id, month)
+    key = PAYLOAD_KEY.format(club=club_id, month=month, variant=variant, version=version)
+
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, timeout=settings.MONTH_VIEW_CACHE_TIMEOUT)
+    return payload
+
+
+async def acached_month_payload(club_id: int, month: str, variant: str, abuild, version=None):
+    """cached_month_payload for async views; `abuild` is a coroutine function."""
+    if not versions_are_shared():
+        return await abuild()
+    if version is None:
+        version = await amonth_version(club_id, month)
+    key = PAYLOAD_KEY.format(club=club_id, month=month, variant=variant, version=version)
+
+    payload = await cache.aget(key)
+    if payload is None:
+        payload = await abuild()
+        await cache.aset(key, payload, timeout=settings.MONTH_VIEW_CACHE_TIMEOUT)
+    return payload
+
+
+def month_etag(club_id: int, month: str, variant: str, representation: str = "json", version=None) -> str:
+    """
+    Strong ETag for a club-month payload, from the version counter alone
+    (no slot rows are read). Any SlotStatus write bumps the version and
+    therefore the tag.
+    """
+    if version is None:
+        version = month_version(club_id, month)
+    raw = f"{club_id}:{month}:{variant}:{representation}:{version}"
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True when the request's If-None-Match already names `etag`."""
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    return "*" in tags or etag in {t.removeprefix("W/") for t in tags}
@@ -0,0 +1,105 @@
+# booking/pagination.py
+import base64
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPaginator:
+    """
+    Keyset ("seek") pagination over a composite, unique ordering such as
+    (start_at, id). The cursor carries the last row's key values, so every
+    page is one indexed range scan no matter how deep it is.
+
+    Works on `.values()` querysets: the key fields must be among the values.
+    Response shape: {"next": <url or null>, "results": [...]}.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def __init__(self, ordering, page_size=100, max_page_size=500):
+        self.ordering = tuple(ordering)  # e.g. ("start_at", "id") or ("-created_at", "-id")
+        self.fields = tuple(f.lstrip("-") for f in self.ordering)
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    # ── cursor encoding ────────────────────────────────────────────────
+    @staticmethod
+    def _json_default(value):
+        # Full isoformat: DjangoJSONEncoder would drop microseconds and
+        # break the seek on auto_now timestamps.
+        if isinstance(value, date):
+            return value.isoformat()
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    def encode_cursor(self, values) -> str:
+        raw = json.dumps(list(values), default=self._json_default).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, token, model):
+        """Key values of a cursor, parsed to the types of `model`'s key fields."""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError("wrong number of keys")
+            return [self._parse_key(model, f, v) for f, v in zip(self.fields, values)]
+        except (DjangoValidationError, ValueError, TypeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+
+    @staticmethod
+    def _parse_key(model, name, value):
+        # A tampered cursor must be a 400, not a database error on the seek
+        parsed = None if value is None else model._meta.get_field(name).to_python(value)
+        if parsed is None:
+            raise ValueError(f"{name} is missing")
+        if isinstance(parsed, datetime) and settings.USE_TZ and timezone.is_naive(parsed):
+            raise ValueError(f"{name} has no UTC offset")
+        return parsed
+
+    # ── paging ─────────────────────────────────────────────────────────
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        try:
+            size = int(raw) if raw else self.page_size
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "Must be an integer."})
+        return max(1, min(size, self.max_page_size))
+
+    def seek_filter(self, values) -> Q:
+        """(a, b) > (x, y)  ==>  a > x OR (a = x AND b > y), per-field direction."""
+        q = Q()
+        for i, order in enumerate(self.ordering):
+            field = self.fields[i]
+            op = "lt" if order.startswith("-") else "gt"
+            step = Q(**{f"{field}__{op}": values[i]})
+            for j in range(i):
+                step &= Q(**{self.fields[j]: values[j]})
+            q |= step
+        return q
+
+    def paginate(self, request, queryset):
+        """Return (rows, next_url) for a `.values()` queryset."""
+        page_size = self.get_page_size(request)
+        token = request.query_params.get(self.cursor_query_param)
+
+        queryset = queryset.order_by(*self.ordering)
+        if token:
+            queryset = queryset.filter(self.seek_filter(self.decode_cursor(token, queryset.model)))
+
+        rows = list(queryset[:page_size + 1])
+        next_url = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            cursor = self.encode_cursor(last[f] for f in self.fields)
+            next_url = replace_query_param(
+                request.build_absolute_uri(), self.cursor_query_param, cursor
+            )
+        return rows, next_url
@@ -0,0 +1,11 @@
+# booking/renderers.py
+from rest_framework.renderers import JSONRenderer
+
+
+class CompactMonthRenderer(JSONRenderer):
+    """
+    Selected with ?format=compact on the month view. Plain JSON on the wire;
+    the view sees `request.accepted_renderer.format == "compact"` and builds
+    the columnar payload instead of the per-slot dicts.
+    """
+    format = "compact"
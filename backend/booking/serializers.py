@@ -19,7 +19,7 @@ class SlotSerializer(serializers.ModelSerializer):
     Converts start_at and end_at to local time (HH:MM format).
     Includes slot_status, court name, and price_coin.
     """
-    slot_status = serializers.SerializerMethodField()
+    slot_status = serializers.CharField(source="status")
     start_time = serializers.SerializerMethodField()
     end_time = serializers.SerializerMethodField()
     court = serializers.IntegerField(source="court_id")
@@ -41,11 +41,6 @@ class SlotSerializer(serializers.ModelSerializer):
             "booking_id",
         ]
 
-    def get_slot_status(self, obj):
-        if hasattr(obj, "slot_status") and obj.slot_status:
-            return obj.slot_status.status
-        return "available"
-
     def get_start_time(self, obj):
         return timezone.localtime(obj.start_at).strftime("%H:%M")
 
@@ -53,6 +48,9 @@ class SlotSerializer(serializers.ModelSerializer):
         return timezone.localtime(obj.end_at).strftime("%H:%M")
 
     def get_booking_id(self, obj):
+        # SlotViewSet annotates this via a subquery; fall back for other callers
+        if hasattr(obj, "active_booking_no"):
+            return obj.active_booking_no
         bs = BookingSlot.objects.filter(slot=obj).select_related("booking").first()
         if bs and bs.booking and bs.booking.status not in ["cancelled"]:
             return bs.booking.booking_no
@@ -70,7 +68,7 @@ class SlotListRequestSerializer(serializers.Serializer):
 # ────────────────────────────── BookingSlot Serializer ──────────────────────────────
 class BookingSlotSerializer(serializers.ModelSerializer):
     """Intermediate serializer for Slot inside a Booking."""
-    slot_status = serializers.SerializerMethodField()
+    slot_status = serializers.CharField(source="slot.status")
     start_time = serializers.SerializerMethodField()
     end_time = serializers.SerializerMethodField()
     court = serializers.IntegerField(source="slot.court_id")
@@ -93,9 +91,6 @@ class BookingSlotSerializer(serializers.ModelSerializer):
     slot_id = serializers.IntegerField(source="slot.id")
     service_date = serializers.DateField(source="slot.service_date", format="%Y-%m-%d")
 
-    def get_slot_status(self, obj):
-        return getattr(getattr(obj.slot, "slot_status", None), "status", "available")
-
     def get_start_time(self, obj):
         return timezone.localtime(obj.slot.start_at).strftime("%H:%M")
 
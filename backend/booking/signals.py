@@ -0,0 +1,42 @@
+# booking/signals.py
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from .availability import days_for_slots, refresh_day_availability
+from .live import publish_slot_changes
+from .month_cache import bump_month_versions
+
+# Sent after any write that creates slots or flips SlotStatus rows.
+# kwargs: slot_ids (list[int]), days (set of (club_id, service_date))
+slot_status_changed = Signal()
+
+
+def notify_slot_status_changed(slot_ids=None, days=None):
+    """
+    Call from every SlotStatus write path, inside the writing transaction.
+    Pass `days` directly when the slots are already gone (e.g. after delete).
+    """
+    slot_ids = list(slot_ids or [])
+    days = set(days or ()) | days_for_slots(slot_ids)
+    if not days:
+        return
+    slot_status_changed.send(sender=None, slot_ids=slot_ids, days=days)
+
+
+@receiver(slot_status_changed)
+def update_day_availability(sender, days, **kwargs):
+    refresh_day_availability(days)
+
+
+@receiver(slot_status_changed)
+def invalidate_month_cache(sender, days, **kwargs):
+    # Bump only after commit: a reader racing the transaction still sees the
+    # old rows and caches them under the old version, which the bump retires.
+    club_months = {(club_id, d.strftime("%Y-%m")) for club_id, d in days}
+    transaction.on_commit(lambda: bump_month_versions(club_months))
+
+
+@receiver(slot_status_changed)
+def publish_live_updates(sender, slot_ids, days, **kwargs):
+    # After commit, so streams never show a status that is rolled back
+    transaction.on_commit(lambda: publish_slot_changes(slot_ids, days))
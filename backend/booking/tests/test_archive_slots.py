@@ -0,0 +1,96 @@
+import gzip
+import json
+import tempfile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from io import StringIO
+from pathlib import Path
+from booking.availability import month_start, refresh_day_availability, rebuild_day_availability
+from booking.models import Booking, BookingSlot, Club, Court, DayAvailability, Slot, SlotArchive, SlotStatus
+
+
+class TestArchiveSlots(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.club = Club.objects.create(name="Archive Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        today = timezone.localdate()
+
+        # Five months back is archived by default (3 full months are kept)
+        self.old_day = month_start(today, 5) + timedelta(days=9)
+        self.recent_day = month_start(today, 1)
+        self.old = self.make_slots(self.old_day, "expired")
+        self.recent = self.make_slots(self.recent_day, "expired")
+
+        SlotStatus.objects.filter(slot=self.old[0]).update(status="ended")
+        self.booking = Booking.objects.create(
+            booking_no="BK-ARCH", club=self.club, court=self.court, status="endgame", booking_date=self.old_day,
+        )
+        BookingSlot.objects.create(booking=self.booking, slot=self.old[0])
+        # Written while the old day was still live; rebuilds no longer touch it
+        DayAvailability.objects.create(
+            club=self.club, service_date=self.old_day, total=4, available=0, court_counts={str(self.court.id): [4, 0]},
+        )
+        self.assertEqual(rebuild_day_availability(), 1)
+
+    def make_slots(self, day, status):
+        start = timezone.make_aware(datetime.combine(day, time(10, 0)))
+        slots = []
+        for i in range(4):
+            s = Slot.objects.create(
+                court=self.court, service_date=day, price_coins=100,
+                start_at=start + timedelta(minutes=30 * i), end_at=start + timedelta(minutes=30 * (i + 1)),
+            )
+            SlotStatus.objects.create(slot=s, status=status)
+            slots.append(s)
+        return slots
+
+    def archive(self, **options):
+        out = StringIO()
+        call_command("archive_slots", stdout=out, **options)
+        return out.getvalue()
+
+    def test_moves_never_booked_slots_of_old_months(self):
+        out = self.archive(batch_size=2)
+        self.assertIn(f"Archived 3 slots before {month_start(timezone.localdate(), 3)} to SlotArchive", out)
+
+        moved = [s.id for s in self.old[1:]]
+        self.assertFalse(Slot.objects.filter(id__in=moved).exists())
+        self.assertFalse(SlotStatus.objects.filter(slot_id__in=moved).exists())
+        self.assertEqual(
+            list(SlotArchive.objects.order_by("id").values_list("id", "court_id", "service_date", "status")),
+            [(sid, self.court.id, self.old_day, "expired") for sid in moved],
+        )
+
+        # The booked slot and recent months stay hot; booking history still reads them
+        self.assertTrue(Slot.objects.filter(id=self.old[0].id).exists())
+        self.assertEqual(Slot.objects.filter(service_date=self.recent_day).count(), 4)
+        self.assertEqual(list(self.booking.booking_slots.values_list("slot_id", flat=True)), [self.old[0].id])
+
+        # The old day's rollup is frozen, even when something asks for a refresh
+        refresh_day_availability({(self.club.id, self.old_day)})
+        frozen = DayAvailability.objects.get(service_date=self.old_day)
+        self.assertEqual((frozen.total, frozen.available), (4, 0))
+
+        self.assertIn("nothing to move", self.archive())
+
+    def test_export_dir_writes_gzipped_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.archive(export_dir=tmp)
+            with gzip.open(Path(tmp) / f"slots-{self.old_day:%Y-%m}.jsonl.gz", "rt") as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertEqual([r["id"] for r in rows], [s.id for s in self.old[1:]])
+        self.assertEqual(rows[0]["service_date"], self.old_day.isoformat())
+        self.assertEqual(rows[0]["status"], "expired")
+        self.assertFalse(SlotArchive.objects.exists())
+        self.assertEqual(Slot.objects.filter(service_date=self.old_day).count(), 1)
+
+    def test_keep_months_cannot_reach_into_live_rollups(self):
+        with self.assertRaises(CommandError):
+            self.archive(keep_months=0)
+        self.assertEqual(Slot.objects.count(), 8)
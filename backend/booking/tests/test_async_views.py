@@ -0,0 +1,134 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from asgiref.sync import iscoroutinefunction
+from rest_framework.test import APIClient
+from booking.models import Booking, BookingSlot, Club, Court, Slot, SlotStatus
+from booking.availability import rebuild_day_availability
+from courtly.testing import QueryBudgetMixin
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class TestAsyncViews(QueryBudgetMixin, TestCase):
+    """The ASGI URLconf serves async views that answer exactly like the DRF ones."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.player = User.objects.create_user(username="p1", email="p1_async@example.com", password="1234")
+        self.other = User.objects.create_user(username="p2", email="p2_async@example.com", password="1234")
+        self.club = Club.objects.create(name="Async Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+
+        self.day = timezone.localdate() + timedelta(days=3)
+        start = timezone.make_aware(datetime.combine(self.day, time(10, 0)))
+        self.slots = []
+        for i in range(6):
+            s = Slot.objects.create(
+                court=self.court, service_date=self.day, price_coins=100,
+                start_at=start + timedelta(minutes=30 * i), end_at=start + timedelta(minutes=30 * (i + 1)),
+            )
+            SlotStatus.objects.create(slot=s, status="booked" if i < 2 else "available")
+            self.slots.append(s)
+        self.booking = Booking.objects.create(
+            booking_no="BK-ASYNC", user=self.player, club=self.club, court=self.court,
+            status="upcoming", booking_date=self.day, total_cost=200,
+        )
+        for s in self.slots[:2]:
+            BookingSlot.objects.create(booking=self.booking, slot=s)
+        rebuild_day_availability()
+
+        month = self.day.strftime("%Y-%m")
+        self.reads = [
+            ("GET", f"/api/available-slots/?club={self.club.id}&month={month}", None),
+            ("GET", f"/api/month-view/?club={self.club.id}&month={month}", None),
+            ("GET", f"/api/slots/month-view/?club={self.club.id}&month={month}&format=compact", None),
+            ("POST", "/api/slots/slots-list/", {"slot_list": [str(s.id) for s in self.slots[:3]]}),
+            ("GET", "/api/booking/BK-ASYNC/", None),
+        ]
+
+    def fetch(self, method, path, data):
+        if method == "GET":
+            return self.client.get(path)
+        return self.client.post(path, data, format="json")
+
+    def test_asgi_urlconf_resolves_async_views(self):
+        from courtly.asgi import application
+
+        self.assertEqual(application.request_class.urlconf, "courtly.urls_asgi")
+        for _, path, _ in self.reads:
+            self.assertTrue(iscoroutinefunction(resolve(path.split("?")[0], "courtly.urls_asgi").func), path)
+        # Everything else still goes to the DRF views
+        self.assertFalse(iscoroutinefunction(resolve("/api/booking/walkin/", "courtly.urls_asgi").func))
+
+    def test_async_views_match_sync_views(self):
+        self.client.force_authenticate(user=self.player)
+        for method, path, data in self.reads:
+            expected = self.fetch(method, path, data)
+            with override_settings(ROOT_URLCONF="courtly.urls_asgi"):
+                res = self.fetch(method, path, data)
+            self.assertEqual(res.status_code, expected.status_code, path)
+            self.assertEqual(res.json(), expected.json(), path)
+            self.assertEqual(res.get("ETag"), expected.get("ETag"), path)
+
+    @override_settings(ROOT_URLCONF="courtly.urls_asgi")
+    def test_async_views_within_budget(self):
+        self.client.force_authenticate(user=self.player)
+        for method, path, data in self.reads:
+            cache.clear()
+            self.assertEqual(self.request_within_budget(method, path, data).status_code, 200, path)
+
+    @override_settings(ROOT_URLCONF="courtly.urls_asgi")
+    def test_errors_and_permissions(self):
+        self.assertEqual(self.client.get("/api/available-slots/?club=x&month=2025-01").json(),
+                         {"detail": "club must be an integer id"})
+        self.assertEqual(self.client.get("/api/booking/BK-ASYNC/").status_code, 403)
+
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get("/api/booking/BK-ASYNC/").status_code, 403)
+        self.assertEqual(self.client.get("/api/booking/BK-NOPE/").status_code, 404)
+        self.assertEqual(self.client.post("/api/slots/slots-list/", {"slot_list": ["0"]}, format="json").status_code, 404)
+        self.assertEqual(self.client.post("/api/slots/slots-list/", {}, format="json").status_code, 400)
+
+    def test_csrf_matches_sync_view(self):
+        session = Client(enforce_csrf_checks=True)
+        session.force_login(self.player)
+        body = {"slot_list": [str(self.slots[0].id)]}
+        for urlconf in ("courtly.urls", "courtly.urls_asgi"):
+            with override_settings(ROOT_URLCONF=urlconf):
+                # A session cookie needs the CSRF token; anonymous (or JWT) callers do not
+                res = session.post("/api/slots/slots-list/", body, content_type="application/json")
+                self.assertEqual(res.status_code, 403, urlconf)
+                res = Client(enforce_csrf_checks=True).post(
+                    "/api/slots/slots-list/", body, content_type="application/json"
+                )
+                self.assertEqual(res.status_code, 200, urlconf)
+
+    @override_settings(ROOT_URLCONF="courtly.urls_asgi")
+    async def test_served_natively_with_etag(self):
+        url = f"/api/month-view/?club={self.club.id}&month={self.day:%Y-%m}"
+        res = await self.async_client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(str(self.slots[0].id), res.json()["days"][0]["booking_slots"])
+
+        res = await self.async_client.get(url, headers={"If-None-Match": res["ETag"]})
+        self.assertEqual(res.status_code, 304)
+
+    @override_settings(ROOT_URLCONF="courtly.urls_asgi")
+    async def test_server_timing_counts_queries_of_worker_threads(self):
+        # The ORM runs in sync_to_async threads, not the middleware's event loop
+        requests = [
+            self.async_client.get(f"/api/month-view/?club={self.club.id}&month={self.day:%Y-%m}"),
+            self.async_client.post(
+                "/api/slots/slots-list/", {"slot_list": [str(self.slots[0].id)]}, content_type="application/json"
+            ),
+            self.async_client.get(f"/api/slots/?club={self.club.id}"),  # DRF view
+        ]
+        for request in requests:
+            res = await request
+            self.assertEqual(res.status_code, 200, res.content)
+            self.assertRegex(res["Server-Timing"], r'desc="[1-9]\d* queries"')
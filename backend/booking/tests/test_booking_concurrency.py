@@ -0,0 +1,124 @@
+import threading
+import time
+import unittest
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking.models import Booking, BookingSlot, Club, Court, Slot, SlotStatus
+from wallet.models import Wallet
+
+User = get_user_model()
+
+
+def make_slots(court, count, status="available"):
+    base = timezone.now().replace(microsecond=0) + timedelta(days=3)
+    slots = []
+    for i in range(count):
+        s = Slot.objects.create(
+            court=court,
+            service_date=timezone.localdate() + timedelta(days=3),
+            start_at=base + timedelta(minutes=30 * i),
+            end_at=base + timedelta(minutes=30 * (i + 1)),
+            price_coins=100,
+        )
+        SlotStatus.objects.create(slot=s, status=status)
+        slots.append(s)
+    return slots
+
+
+class TestBookingCreateLocking(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Lock Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        self.user = User.objects.create_user(username="p1", email="p1_lock@example.com", password="1234")
+        Wallet.objects.create(user=self.user, balance=5000)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def book(self, slots):
+        return self.client.post(
+            "/api/booking/", {"club": self.club.id, "slots": [s.id for s in slots]}, format="json"
+        )
+
+    def test_second_booking_of_same_slot_conflicts(self):
+        slots = make_slots(self.court, 2)
+        self.assertEqual(self.book(slots).status_code, 201)
+
+        res = self.book(slots[1:])
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, 4800)
+
+    def test_query_count_does_not_grow_with_slots(self):
+        def queries_for(n):
+            court = Court.objects.create(name=f"Court {n}", club=self.club)
+            slots = make_slots(court, n)
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.book(slots).status_code, 201)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(queries_for(2), queries_for(8))
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "needs real row locks (PostgreSQL)")
+class TestBookingContention(TransactionTestCase):
+    """
+    Contention harness: many players hammer the same few slots at once.
+    Exactly one booking per slot may win; everyone else must get 409.
+    """
+    THREADS = 16
+    ROUNDS = 5
+
+    def setUp(self):
+        self.club = Club.objects.create(name="Race Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        self.slots = make_slots(self.court, self.ROUNDS * 2)
+        self.users = []
+        for i in range(self.THREADS):
+            u = User.objects.create_user(username=f"racer{i}", email=f"racer{i}@example.com", password="1234")
+            Wallet.objects.create(user=u, balance=100000)
+            self.users.append(u)
+
+    def test_no_double_booking_under_contention(self):
+        results = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(user):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            try:
+                for r in range(self.ROUNDS):
+                    pair = [self.slots[2 * r].id, self.slots[2 * r + 1].id]
+                    barrier.wait()
+                    res = client.post("/api/booking/", {"club": self.club.id, "slots": pair}, format="json")
+                    results.append(res.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(u,)) for u in self.users]
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(results.count(201), self.ROUNDS)
+        self.assertEqual(results.count(201) + results.count(409), len(results))
+        doubles = (
+            BookingSlot.objects.exclude(booking__status="cancelled")
+            .values("slot_id").annotate(n=Count("id")).filter(n__gt=1)
+        )
+        self.assertFalse(doubles.exists())
+
+        print(
+            f"\n[contention] {len(results)} requests, {results.count(201)} bookings in {elapsed:.2f}s "
+            f"({len(results) / elapsed:.0f} req/s, {results.count(201) / elapsed:.1f} bookings/s)"
+        )
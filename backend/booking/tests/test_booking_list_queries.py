@@ -0,0 +1,92 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from booking.models import Booking, BookingSlot, Club, Court, Slot, SlotStatus
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class TestBookingListQueries(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = User.objects.create_user(
+            username="mgr", email="mgr_list@example.com", password="1234", role="manager"
+        )
+        self.player = User.objects.create_user(
+            username="p1", email="p1_list@example.com", password="1234"
+        )
+        self.club = Club.objects.create(name="List Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        self.made = 0
+
+    def make_bookings(self, n, days_ahead=5):
+        for _ in range(n):
+            i = self.made
+            self.made += 1
+            start = timezone.now() + timedelta(days=days_ahead, minutes=30 * i)
+            slot = Slot.objects.create(
+                court=self.court, service_date=timezone.localdate() + timedelta(days=days_ahead),
+                start_at=start, end_at=start + timedelta(minutes=30),
+            )
+            SlotStatus.objects.create(slot=slot, status="booked")
+            b = Booking.objects.create(
+                booking_no=f"BK-L{i}", user=self.player, club=self.club, court=self.court,
+                status="confirmed", booking_date=timezone.localdate() + timedelta(days=days_ahead),
+            )
+            BookingSlot.objects.create(booking=b, slot=slot)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(ctx.captured_queries), res
+
+    def test_constant_queries_for_all_list_endpoints(self):
+        for user, url in (
+            (self.manager, "/api/bookings/"),
+            (self.manager, "/api/bookings/upcoming/"),
+            (self.player, "/api/my-booking/"),
+            (self.player, "/api/my-booking/upcoming/"),
+        ):
+            self.client.force_authenticate(user=user)
+            self.make_bookings(2)
+            small, _ = self.count_queries(url)
+            self.make_bookings(10)
+            large, res = self.count_queries(url)
+            self.assertEqual(small, large, url)
+            self.assertLessEqual(large, 2, url)
+
+    def test_able_to_cancel_uses_first_slot(self):
+        self.make_bookings(1, days_ahead=5)
+        self.make_bookings(1, days_ahead=0)
+        self.client.force_authenticate(user=self.player)
+        _, res = self.count_queries("/api/my-booking/")
+        by_id = {r["booking_id"]: r["able_to_cancel"] for r in res.data}
+        self.assertEqual(by_id, {"BK-L0": True, "BK-L1": False})
+
+    def test_manager_list_pages_and_filters(self):
+        self.make_bookings(5)
+        Booking.objects.filter(booking_no="BK-L1").update(status="cancelled")
+        self.client.force_authenticate(user=self.manager)
+
+        seen, url = [], "/api/bookings/?page_size=2"
+        while url:
+            _, res = self.count_queries(url)
+            seen += [r["booking_id"] for r in res.data["results"]]
+            url = res.data["next"]
+        self.assertEqual(seen, [f"BK-L{i}" for i in range(4, -1, -1)])
+
+        _, res = self.count_queries(f"/api/bookings/?status=cancelled&owner={self.player.id}")
+        self.assertEqual([r["booking_id"] for r in res.data["results"]], ["BK-L1"])
+        self.assertIsNone(res.data["next"])
+
+        # The frontend filters still send the pre-0012 name
+        Booking.objects.filter(booking_no="BK-L2").update(status="noshow")
+        _, res = self.count_queries("/api/bookings/?status=no_show,cancelled")
+        self.assertEqual([r["booking_id"] for r in res.data["results"]], ["BK-L2", "BK-L1"])
+
+        self.assertEqual(self.client.get("/api/bookings/?date_from=tomorrow").status_code, 400)
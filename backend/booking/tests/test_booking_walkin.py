@@ -0,0 +1,99 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from booking.models import Booking, BookingSlot, Slot, SlotStatus, Club, Court
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class TestBookingWalkin(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = User.objects.create_user(
+            username="mgr", email="mgr_walkin@example.com", password="1234", role="manager"
+        )
+        self.client.force_authenticate(user=self.manager)
+
+        self.club = Club.objects.create(name="Walk-in Club")
+        self.courts = [Court.objects.create(name=f"Court {i}", club=self.club) for i in range(3)]
+        self.day = timezone.localdate() + timedelta(days=2)
+        evening = timezone.make_aware(datetime.combine(self.day, time(17, 0)))
+
+        # 17:00-22:00 in 30-minute slots on every court; status rows only on court 0
+        self.slots = {}
+        for court in self.courts:
+            for i in range(10):
+                start = evening + timedelta(minutes=30 * i)
+                s = Slot.objects.create(
+                    court=court, service_date=self.day, price_coins=100,
+                    start_at=start, end_at=start + timedelta(minutes=30),
+                )
+                if court is self.courts[0]:
+                    SlotStatus.objects.create(slot=s, status="available")
+                self.slots[(court.id, i)] = s
+
+    def item(self, court, start="17:00", end="22:00"):
+        return {"court": court.id, "date": self.day.isoformat(), "start": start, "end": end}
+
+    def walkin(self, items):
+        return self.client.post(
+            "/api/booking/walkin/", {"club": self.club.id, "items": items, "customer_name": "Khun A"}, format="json"
+        )
+
+    def test_books_every_item_in_request_order(self):
+        res = self.walkin([self.item(self.courts[1], "20:00", "21:00"), self.item(self.courts[0], "17:00", "18:00")])
+        self.assertEqual(res.status_code, 201, res.data)
+
+        expected = [self.slots[(self.courts[1].id, i)].id for i in (6, 7)] + \
+                   [self.slots[(self.courts[0].id, i)].id for i in (0, 1)]
+        self.assertEqual(res.data["booking"]["slots"], expected)
+        self.assertEqual(res.data["booking"]["total_cost"], 400)
+
+        booking = Booking.objects.get(booking_no=res.data["booking"]["booking_no"])
+        self.assertEqual((booking.status, booking.customer_name, booking.total_cost), ("walkin", "Khun A", 400))
+        self.assertEqual(set(booking.booking_slots.values_list("slot_id", flat=True)), set(expected))
+        self.assertEqual(
+            set(SlotStatus.objects.filter(slot_id__in=expected).values_list("status", flat=True)), {"walkin"}
+        )
+
+    def test_overlapping_items_book_each_slot_once(self):
+        res = self.walkin([self.item(self.courts[0], "17:00", "18:00"), self.item(self.courts[0], "17:30", "18:30")])
+        self.assertEqual(res.status_code, 201, res.data)
+        self.assertEqual(len(res.data["booking"]["slots"]), 3)
+        self.assertEqual(res.data["booking"]["total_cost"], 300)
+
+    def test_query_count_does_not_grow_with_items(self):
+        def count(items):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.walkin(items).status_code, 201)
+            return len(ctx)
+
+        one = count([self.item(self.courts[0], "17:00", "17:30")])
+        # A full evening on three courts, one item per hour
+        many = count([
+            self.item(court, f"{h}:00", f"{h + 1}:00")
+            for court in self.courts for h in range(17, 22)
+            if not (court is self.courts[0] and h == 17)
+        ])
+        self.assertEqual(many, one)
+
+    def test_unavailable_slot_rejects_the_whole_request(self):
+        taken = self.slots[(self.courts[2].id, 9)]
+        SlotStatus.objects.create(slot=taken, status="booked")
+
+        res = self.walkin([self.item(self.courts[0]), self.item(self.courts[2])])
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.data, {"detail": f"Slot {taken.id} not available", "status": "booked"})
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(BookingSlot.objects.exists())
+        self.assertFalse(SlotStatus.objects.exclude(status="available").exclude(slot=taken).exists())
+
+    def test_item_without_slots(self):
+        res = self.walkin([self.item(self.courts[0]), self.item(self.courts[1], "08:00", "09:00")])
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["detail"], f"No slots found for court {self.courts[1].id} @ {self.day}")
+        self.assertFalse(Booking.objects.exists())
@@ -0,0 +1,69 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from booking.models import Club, Court, Slot, SlotStatus, DayAvailability
+from wallet.models import Wallet
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class TestDayAvailability(TestCase):
+    def setUp(self):
+        cache.clear()  # month payloads are cached per club id, which sqlite reuses across tests
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="player",
+            email="player_rollup@example.com",
+            password="1234",
+        )
+        Wallet.objects.create(user=self.user, balance=1000)
+
+        self.club = Club.objects.create(name="Rollup Club")
+        self.court1 = Court.objects.create(name="Court 1", club=self.club)
+        self.court2 = Court.objects.create(name="Court 2", club=self.club)
+
+        self.day = timezone.localdate() + timedelta(days=3)
+        call_command(
+            "generate_slots", club=self.club.id,
+            start=self.day.isoformat(), end=self.day.isoformat(), stdout=StringIO(),
+        )
+
+    def test_generate_slots_builds_rollup(self):
+        row = DayAvailability.objects.get(club=self.club, service_date=self.day)
+        self.assertEqual(row.total, 48)
+        self.assertEqual(row.available, 48)
+        self.assertEqual(row.court_counts[str(self.court1.id)], [24, 24])
+
+    def test_booking_and_cancel_update_rollup(self):
+        slot = Slot.objects.filter(court=self.court1, service_date=self.day).order_by("start_at").first()
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.post("/api/booking/", {"club": self.club.id, "slots": [slot.id]}, format="json")
+        self.assertEqual(res.status_code, 201)
+
+        row = DayAvailability.objects.get(club=self.club, service_date=self.day)
+        self.assertEqual(row.available, 47)
+        self.assertEqual(row.court_counts[str(self.court1.id)], [24, 23])
+
+        res = self.client.post(f"/api/booking/{res.data['booking_id']}/cancel/")
+        self.assertEqual(res.status_code, 200)
+        row.refresh_from_db()
+        self.assertEqual(row.available, 48)
+
+    def test_available_slots_view_reads_rollup(self):
+        SlotStatus.objects.filter(slot__court=self.court2).update(status="maintenance")
+        call_command("rebuild_day_availability", club=self.club.id, stdout=StringIO())
+
+        res = self.client.get(f"/api/available-slots/?club={self.club.id}&month={self.day:%Y-%m}")
+        self.assertEqual(res.status_code, 200)
+
+        day = res.data["days"][0]
+        self.assertEqual(day["date"], self.day.strftime("%d-%m-%y"))
+        self.assertEqual(day["available_percent"], 0.5)
+        self.assertEqual(len(day["available_slots"]), 24)
+        self.assertTrue(all(s["court"] == self.court1.id for s in day["available_slots"]))
@@ -0,0 +1,107 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from booking.models import Club, Court, Slot, SlotStatus, Booking, BookingSlot
+
+
+class TestExpireSlots(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.club = Club.objects.create(name="Expire Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        self.made = 0
+
+    def make_slot(self, hours_ago, status):
+        end = timezone.now() - timedelta(hours=hours_ago)
+        self.made += 1
+        slot = Slot.objects.create(
+            court=self.court, service_date=timezone.localdate(),
+            start_at=end - timedelta(minutes=30) - timedelta(seconds=self.made), end_at=end,
+        )
+        SlotStatus.objects.create(slot=slot, status=status)
+        return slot
+
+    def make_booking(self, slots, status):
+        b = Booking.objects.create(
+            booking_no=f"BK-E{self.made}", club=self.club, court=self.court, status=status,
+        )
+        for s in slots:
+            BookingSlot.objects.create(booking=b, slot=s)
+        return b
+
+    def expire(self, **options):
+        out = StringIO()
+        call_command("expire_slots", stdout=out, **options)
+        return out.getvalue()
+
+    def status(self, slot):
+        return SlotStatus.objects.get(slot=slot).status
+
+    def test_transitions_slots_and_bookings(self):
+        free = self.make_slot(1, "available")
+        future = self.make_slot(-2, "available")
+
+        first, last = self.make_slot(2, "booked"), self.make_slot(1, "booked")
+        noshow = self.make_booking([first, last], "booked")
+
+        played = self.make_slot(1, "playing")
+        ended = self.make_booking([played], "checkin")
+
+        running = self.make_slot(-1, "booked")
+        upcoming = self.make_booking([self.make_slot(1, "booked"), running], "booked")
+
+        out = self.expire()
+
+        self.assertEqual(self.status(free), "expired")
+        self.assertEqual(self.status(future), "available")
+        self.assertEqual((self.status(first), self.status(last)), ("noshow", "noshow"))
+        self.assertEqual(self.status(played), "ended")
+        self.assertEqual(self.status(running), "booked")
+
+        noshow.refresh_from_db()
+        ended.refresh_from_db()
+        upcoming.refresh_from_db()
+        self.assertEqual(noshow.status, "noshow")
+        self.assertEqual(ended.status, "endgame")
+        self.assertEqual(upcoming.status, "booked")
+        self.assertIn("Updated 5 slot statuses", out)
+
+    def test_watermark_skips_history_and_queries_stay_flat(self):
+        self.expire()
+        old = self.make_slot(48, "available")  # ended long before the watermark
+        Slot.objects.filter(pk=old.pk).update(status_updated_at=old.end_at)  # and untouched since
+        recent = [self.make_slot(0.1, "available") for _ in range(10)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            out = self.expire()
+        self.assertLess(len(ctx.captured_queries), 20)
+
+        self.assertEqual(self.status(old), "available")
+        self.assertTrue(all(self.status(s) == "expired" for s in recent))
+        self.assertIn("since", out)
+
+        self.expire(full=True)
+        self.assertEqual(self.status(old), "expired")
+
+    def test_slot_changed_after_the_watermark_passed_it(self):
+        parked = self.make_slot(48, "maintenance")
+        booked = self.make_slot(48, "maintenance")
+        booking = self.make_booking([booked], "upcoming")
+        self.expire()
+        cache.clear()  # the watermark lives in the database
+
+        # A manager moves past slots out of maintenance long after they ended
+        SlotStatus.objects.filter(slot=parked).update(status="available", updated_at=timezone.now())
+        SlotStatus.objects.filter(slot=booked).update(status="booked", updated_at=timezone.now())
+
+        out = self.expire()
+        self.assertIn("since", out)
+        self.assertEqual(self.status(parked), "expired")
+        self.assertEqual(self.status(booked), "noshow")
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, "noshow")
@@ -0,0 +1,40 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from booking.models import Club, Court, Slot, SlotStatus
+
+
+class TestGenerateSlots(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Gen Club")
+        self.courts = [Court.objects.create(name=f"Court {i}", club=self.club) for i in range(1, 4)]
+        self.start = timezone.localdate() + timedelta(days=1)
+        self.end = self.start + timedelta(days=6)
+
+    def generate(self, batch_size=50):
+        out = StringIO()
+        call_command(
+            "generate_slots", club=self.club.id, start=self.start.isoformat(),
+            end=self.end.isoformat(), batch_size=batch_size, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_bulk_generation_creates_slots_and_statuses(self):
+        out = self.generate()
+
+        # 3 courts × 7 days × 24 half-hours
+        self.assertEqual(Slot.objects.count(), 504)
+        self.assertEqual(SlotStatus.objects.filter(status="available").count(), 504)
+        self.assertIn("Created 504 slots", out)
+
+        first = Slot.objects.order_by("start_at").first()
+        self.assertEqual(timezone.localtime(first.start_at).strftime("%H:%M"), "10:00")
+        self.assertEqual(first.dow, self.start.weekday())
+
+    def test_rerun_replaces_range(self):
+        self.generate()
+        self.generate(batch_size=7)
+        self.assertEqual(Slot.objects.count(), 504)
+        self.assertEqual(SlotStatus.objects.count(), 504)
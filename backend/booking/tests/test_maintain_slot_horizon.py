@@ -0,0 +1,58 @@
+from django.test import TestCase
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from io import StringIO
+from booking.models import Club, Court, Slot, SlotStatus, DayAvailability
+from ops.models import BusinessHour, Closure, MaintenanceBlock
+
+
+class TestMaintainSlotHorizon(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Horizon Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        self.today = timezone.localdate()
+
+        # Open 18:00–20:00 every day (4 slots)
+        for dow in range(7):
+            BusinessHour.objects.create(club=self.club, dow=dow, open_time=time(18, 0), close_time=time(20, 0))
+
+        self.closed_day = self.today + timedelta(days=2)
+        Closure.objects.create(club=self.club, date=self.closed_day, reason="Holiday")
+
+        self.block_day = self.today + timedelta(days=3)
+        tz = timezone.get_current_timezone()
+        MaintenanceBlock.objects.create(
+            court=self.court,
+            start_at=timezone.make_aware(datetime.combine(self.block_day, time(18, 0)), tz),
+            end_at=timezone.make_aware(datetime.combine(self.block_day, time(19, 0)), tz),
+        )
+
+    def run_horizon(self, days=4):
+        out = StringIO()
+        call_command("maintain_slot_horizon", days=days, club=self.club.id, stdout=out)
+        return out.getvalue()
+
+    def test_follows_business_hours_closures_and_maintenance(self):
+        self.run_horizon()
+
+        # today .. today+4 = 5 days, minus one closure
+        self.assertEqual(Slot.objects.count(), 16)
+        self.assertFalse(Slot.objects.filter(service_date=self.closed_day).exists())
+        self.assertEqual(
+            SlotStatus.objects.filter(status="maintenance", slot__service_date=self.block_day).count(), 2
+        )
+        row = DayAvailability.objects.get(club=self.club, service_date=self.block_day)
+        self.assertEqual((row.total, row.available), (4, 2))
+
+    def test_rerun_only_adds_new_days_and_keeps_statuses(self):
+        self.run_horizon()
+        booked = Slot.objects.filter(service_date=self.today).order_by("start_at").first()
+        SlotStatus.objects.filter(slot=booked).update(status="booked")
+
+        self.run_horizon()
+        self.assertEqual(Slot.objects.count(), 16)
+
+        self.run_horizon(days=6)
+        self.assertEqual(Slot.objects.count(), 24)
+        self.assertEqual(SlotStatus.objects.get(slot=booked).status, "booked")
@@ -0,0 +1,128 @@
+import time
+from django.test import TestCase, override_settings
+from django.core.cache import cache, caches
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from booking.models import Club, Court, Slot, SlotStatus
+from booking.month_cache import VERSION_KEY, bump_month_versions, month_version
+from booking.signals import notify_slot_status_changed
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class TestMonthViewCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = User.objects.create_user(
+            username="mgr",
+            email="mgr_cache@example.com",
+            password="1234",
+            role="manager"
+        )
+
+        self.club = Club.objects.create(name="Cache Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.slot = Slot.objects.create(
+            court=self.court,
+            service_date=self.day,
+            start_at=timezone.now() + timedelta(days=2),
+            end_at=timezone.now() + timedelta(days=2, minutes=30),
+            price_coins=100,
+        )
+        SlotStatus.objects.create(slot=self.slot, status="available")
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_slot_status_changed([self.slot.id])
+
+        self.url = f"/api/month-view/?club={self.club.id}&month={self.day:%Y-%m}"
+
+    def slot_status(self, res):
+        return res.data["days"][0]["booking_slots"][str(self.slot.id)]["status"]
+
+    def test_second_read_is_served_from_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url)
+        self.assertEqual(self.slot_status(res), "available")
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_is_not_trusted_outside_debug(self):
+        self.client.get(self.url)
+        # Another process's bump would never reach this cache, so nothing is kept in it
+        SlotStatus.objects.filter(slot=self.slot).update(status="maintenance")
+        self.assertEqual(self.slot_status(self.client.get(self.url)), "maintenance")
+
+        # Nor can its version vouch for a 304
+        res = self.client.get(self.url)
+        self.assertNotIn("ETag", res)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"x"').status_code, 200)
+
+    def test_bump_from_another_process_reaches_this_one(self):
+        res = self.client.get(self.url)
+        etag = res["ETag"]
+
+        # expire_slots or another worker: its own connection to the same cache
+        other = caches.create_connection("default")
+        other.set(VERSION_KEY.format(club=self.club.id, month=f"{self.day:%Y-%m}"), time.time_ns(), timeout=None)
+        SlotStatus.objects.filter(slot=self.slot).update(status="maintenance")
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(self.slot_status(res), "maintenance")
+
+    def test_status_write_invalidates_cache(self):
+        self.assertEqual(self.slot_status(self.client.get(self.url)), "available")
+
+        self.client.force_authenticate(user=self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                "/api/slots/status/",
+                {"slots": [str(self.slot.id)], "changed_to": "maintenance"},
+                format="json",
+            )
+        self.assertEqual(res.data["updated_count"], 1)
+
+        self.assertEqual(self.slot_status(self.client.get(self.url)), "maintenance")
+
+    def test_etag_revalidation(self):
+        res = self.client.get(self.url)
+        etag = res["ETag"]
+        self.assertTrue(etag.startswith('"'))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+        # Other representations carry their own tag
+        compact = self.client.get(self.url + "&format=compact")
+        self.assertNotEqual(compact["ETag"], etag)
+        available = self.client.get(f"/api/available-slots/?club={self.club.id}&month={self.day:%Y-%m}")
+        self.assertEqual(
+            self.client.get(
+                f"/api/available-slots/?club={self.club.id}&month={self.day:%Y-%m}",
+                HTTP_IF_NONE_MATCH=f'W/{available["ETag"]}',
+            ).status_code,
+            304,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_slot_status_changed([self.slot.id])
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_bumps_never_reuse_a_version(self):
+        month = f"{self.day:%Y-%m}"
+        seen = [month_version(self.club.id, month)]
+        for _ in range(3):
+            bump_month_versions([(self.club.id, month), (self.club.id, month)])
+            seen.append(month_version(self.club.id, month))
+        self.assertEqual(seen, sorted(set(seen)))
+
+        cache.delete(VERSION_KEY.format(club=self.club.id, month=month))  # evicted
+        self.assertGreater(month_version(self.club.id, month), seen[-1])
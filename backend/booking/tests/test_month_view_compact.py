@@ -0,0 +1,75 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from rest_framework.test import APIClient
+from booking.models import Club, Court, Slot, SlotStatus
+
+
+class TestMonthViewCompact(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.club = Club.objects.create(name="Compact Club")
+        self.courts = [Court.objects.create(name=f"Court {i}", club=self.club) for i in (1, 2)]
+
+        # Next month, two days, 10:00–12:00 on both courts (court 2 closed on day 2)
+        first = (timezone.localdate().replace(day=1) + timedelta(days=32)).replace(day=1)
+        self.month = first.strftime("%Y-%m")
+        tz = timezone.get_current_timezone()
+        for day in (first, first + timedelta(days=1)):
+            for court in self.courts:
+                if court == self.courts[1] and day != first:
+                    continue
+                for i in range(4):
+                    start = timezone.make_aware(datetime.combine(day, time(10, 0)), tz) + timedelta(minutes=30 * i)
+                    s = Slot.objects.create(
+                        court=court, service_date=day, start_at=start,
+                        end_at=start + timedelta(minutes=30), price_coins=100,
+                    )
+                    SlotStatus.objects.create(slot=s, status="booked" if i == 0 else "available")
+
+    def get(self, extra=""):
+        return self.client.get(f"/api/month-view/?club={self.club.id}&month={self.month}{extra}")
+
+    def test_compact_matches_full_payload(self):
+        full = self.get().json()
+        res = self.get("&format=compact")
+        self.assertEqual(res.status_code, 200)
+        compact = res.json()
+
+        self.assertEqual(compact["times"], ["10:00", "10:30", "11:00", "11:30"])
+        self.assertEqual([c["name"] for c in compact["courts"]], ["Court 1", "Court 2"])
+        self.assertEqual(compact["price_coin"], 100)
+
+        # Expand the grid back into the full format's {slot_id: {...}} per day
+        width = len(compact["times"])
+        expanded = {}
+        for day in compact["days"]:
+            slots = {}
+            for cell, slot_id in enumerate(day["ids"]):
+                if slot_id is None:
+                    continue
+                court = compact["courts"][cell // width]
+                slots[str(slot_id)] = {
+                    "status": compact["statuses"][day["status"][cell]],
+                    "start_time": compact["times"][cell % width],
+                    "court": court["id"],
+                    "court_name": court["name"],
+                    "price_coin": compact["price_coin"],
+                }
+            expanded[day["date"]] = slots
+
+        for day in full["days"]:
+            for slot_id, slot in day["booking_slots"].items():
+                slot.pop("end_time")
+                self.assertEqual(expanded[day["date"]][slot_id], slot)
+        self.assertEqual(sum(len(d) for d in expanded.values()), 12)
+        self.assertLess(len(res.content), len(json.dumps(full)))
+
+    def test_full_format_is_unchanged_by_default(self):
+        res = self.get()
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("format", res.json())
@@ -0,0 +1,114 @@
+import logging
+from django.test import TestCase
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from rest_framework.test import APIClient
+from booking.models import Booking, BookingSlot, Club, Court, Slot, SlotStatus
+from courtly.query_metrics import get_query_budget
+from courtly.testing import QueryBudgetMixin, endpoint_methods
+from django.contrib.auth import get_user_model
+from wallet.models import Wallet
+
+User = get_user_model()
+
+class TestBookingQueryBudgets(QueryBudgetMixin, TestCase):
+    """Every booking endpoint declares a query budget; realistic data must stay within it."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.manager = User.objects.create_user(
+            username="mgr", email="mgr_budget@example.com", password="1234", role="manager"
+        )
+        self.player = User.objects.create_user(
+            username="p1", email="p1_budget@example.com", password="1234"
+        )
+        Wallet.objects.create(user=self.player, balance=100000)
+        self.club = Club.objects.create(name="Budget Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+
+        # 24 slots on day+3, 10:00–22:00 local
+        self.day = timezone.localdate() + timedelta(days=3)
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(datetime.combine(self.day, time(10, 0)), tz)
+        self.slots = []
+        for i in range(24):
+            s = Slot.objects.create(
+                court=self.court, service_date=self.day, price_coins=100,
+                start_at=start + timedelta(minutes=30 * i), end_at=start + timedelta(minutes=30 * (i + 1)),
+            )
+            SlotStatus.objects.create(slot=s, status="available")
+            self.slots.append(s)
+
+        # 8 existing bookings so list endpoints have rows to (not) N+1 over
+        for i, s in enumerate(self.slots[16:]):
+            SlotStatus.objects.filter(slot=s).update(status="booked")
+            b = Booking.objects.create(
+                booking_no=f"BK-B{i}", user=self.player, club=self.club, court=self.court,
+                status="upcoming", booking_date=self.day,
+            )
+            BookingSlot.objects.create(booking=b, slot=s)
+
+    def test_every_endpoint_declares_a_budget(self):
+        missing = [
+            f"{method.upper()} {route}"
+            for route, view, method in endpoint_methods("booking.urls")
+            if get_query_budget(view, method) is None
+        ]
+        self.assertEqual(missing, [])
+
+    def test_server_timing_header(self):
+        res = self.client.get(f"/api/slots/?club={self.club.id}")
+        self.assertRegex(res["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", db-slowest;dur=[\d.]+, app;dur=')
+
+    def test_log_line_is_not_dropped(self):
+        logger = logging.getLogger("courtly.query_metrics")
+        self.assertTrue(logger.isEnabledFor(logging.INFO))
+        self.assertTrue(logger.handlers)
+
+    def test_public_and_player_endpoints(self):
+        month = self.day.strftime("%Y-%m")
+        self.client.force_authenticate(user=self.player)
+
+        self.request_within_budget("GET", f"/api/available-slots/?club={self.club.id}&month={month}")
+        self.request_within_budget("GET", f"/api/month-view/?club={self.club.id}&month={month}")
+        self.request_within_budget("GET", f"/api/slots/?club={self.club.id}")
+        self.request_within_budget("GET", f"/api/slots/{self.slots[0].id}/")
+        self.request_within_budget("POST", "/api/slots/slots-list/", {"slot_list": [s.id for s in self.slots[:8]]})
+
+        res = self.request_within_budget(
+            "POST", "/api/booking/", {"club": self.club.id, "slots": [s.id for s in self.slots[:4]]}
+        )
+        self.assertEqual(res.status_code, 201)
+        booking_no = res.data["booking_id"]
+
+        self.request_within_budget("GET", f"/api/booking/{booking_no}/")
+        self.request_within_budget("GET", "/api/my-booking/")
+        self.request_within_budget("GET", "/api/my-booking/upcoming/")
+
+        res = self.request_within_budget("POST", f"/api/booking/{booking_no}/cancel/")
+        self.assertEqual(res.status_code, 200)
+
+    def test_manager_endpoints(self):
+        self.client.force_authenticate(user=self.manager)
+
+        self.request_within_budget("GET", "/api/bookings/")
+        self.request_within_budget("GET", "/api/bookings/upcoming/")
+
+        res = self.request_within_budget("POST", "/api/booking/walkin/", {
+            "club": self.club.id,
+            "items": [{"court": self.court.id, "date": self.day.isoformat(), "start": "10:00", "end": "12:00"}],
+        })
+        self.assertEqual(res.status_code, 201)
+
+        res = self.request_within_budget("POST", "/api/booking/BK-B0/checkin/")
+        self.assertEqual(res.status_code, 200)
+
+        res = self.request_within_budget("POST", "/api/slots/status/", {
+            "slots": [str(s.id) for s in self.slots[4:8]], "changed_to": "maintenance",
+        })
+        self.assertEqual(res.status_code, 200)
+
+        res = self.request_within_budget("POST", "/api/slots/update-status/", {
+            "items": [{"slot": s.id, "status": "available"} for s in self.slots[4:8]],
+        })
+        self.assertEqual(res.status_code, 200)
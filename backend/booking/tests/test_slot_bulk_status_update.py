@@ -1,6 +1,8 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
-from booking.models import SlotStatus, Slot, Court, Club
+from booking.models import Booking, BookingSlot, SlotStatus, SlotStatusTransition, Slot, Court, Club
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth import get_user_model
@@ -48,3 +50,70 @@ class TestSlotBulkStatusUpdate(TestCase):
         res = self.client.post("/api/slots/update-status/", payload, format="json")
         self.assertEqual(res.status_code, 200)
         self.assertEqual(res.data["detail"], "Bulk update complete")
+
+    def test_bulk_update_errors_and_booking_propagation(self):
+        SlotStatus.objects.filter(slot=self.slot2).update(status="walkin")
+        booking = Booking.objects.create(
+            booking_no="BK-BULK", club=self.club, court=self.court, status="walkin", booking_date=self.slot2.service_date,
+        )
+        old = Booking.objects.create(
+            booking_no="BK-OLD", club=self.club, court=self.court, status="cancelled", booking_date=self.slot2.service_date,
+        )
+        for b in (booking, old):
+            BookingSlot.objects.create(booking=b, slot=self.slot2)
+
+        payload = {"items": [
+            {"slot": self.slot1.id, "status": "maintenance"},
+            {"slot": self.slot1.id, "status": "available"},  # applied in order
+            {"slot": self.slot2.id, "status": "checkin"},  # legacy name for playing
+            {"slot": self.slot2.id, "status": "available"},
+            {"slot": 999999, "status": "maintenance"},
+            {"slot": self.slot1.id, "status": "nonsense"},
+            {"slot": self.slot1.id},
+        ]}
+        res = self.client.post("/api/slots/update-status/", payload, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["updated"], [
+            {"slot_id": self.slot1.id, "new_status": "maintenance"},
+            {"slot_id": self.slot1.id, "new_status": "available"},
+            {"slot_id": self.slot2.id, "new_status": "playing"},
+        ])
+        self.assertEqual(res.data["errors"], [
+            {"slot": self.slot2.id, "detail": "Cannot change from playing → available"},
+            {"slot": 999999, "detail": "Slot not found"},
+            {"slot": self.slot1.id, "detail": "Invalid status"},
+            {"slot": self.slot1.id, "detail": "Missing slot or status"},
+        ])
+        self.assertEqual(SlotStatus.objects.get(slot=self.slot1).status, "available")
+        self.assertEqual(SlotStatus.objects.get(slot=self.slot2).status, "playing")
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, "checkin")
+        self.assertEqual(Booking.objects.get(pk=old.pk).status, "cancelled")
+
+    def test_week_of_maintenance_is_a_fixed_number_of_queries(self):
+        def mark(slots, status):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(
+                    "/api/slots/status/", {"slots": [str(s.id) for s in slots], "changed_to": status}, format="json"
+                )
+            self.assertEqual(res.status_code, 200)
+            # SQLite caps bound parameters, so it splits the history INSERT; Postgres sends one
+            return res, len([q for q in ctx if not q["sql"].startswith('INSERT INTO "booking_slotstatustransition"')])
+
+        _, few = mark([self.slot1], "maintenance")
+
+        start = self.slot2.end_at
+        week = []
+        for i in range(7 * 48):
+            s = Slot.objects.create(
+                court=self.court, service_date=timezone.localdate(start + timedelta(minutes=30 * i)), price_coins=50,
+                start_at=start + timedelta(minutes=30 * i), end_at=start + timedelta(minutes=30 * (i + 1)),
+            )
+            week.append(SlotStatus(slot=s, status="available"))
+        SlotStatus.objects.bulk_create(week)
+
+        res, many = mark([self.slot1, self.slot2] + [ss.slot for ss in week], "maintenance")
+        self.assertEqual(res.data["updated_count"], 1 + len(week))
+        self.assertEqual(res.data["errors"], [{"slot": self.slot1.id, "detail": "Cannot change from maintenance → maintenance"}])
+        self.assertEqual(SlotStatus.objects.filter(status="maintenance").count(), 2 + len(week))
+        self.assertEqual(SlotStatusTransition.objects.filter(source="maintenance").count(), 2 + len(week))
+        self.assertEqual(many, few)
@@ -0,0 +1,108 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from booking.models import Club, Court, Slot, SlotStatus
+from booking.pagination import KeysetPaginator
+
+
+@override_settings(SLOT_CHANGES_SETTLE_SECONDS=0)
+class TestSlotChanges(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.club = Club.objects.create(name="Sync Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        other_court = Court.objects.create(name="Court 1", club=Club.objects.create(name="Other Club"))
+
+        start = timezone.now() + timedelta(days=2)
+        self.day = timezone.localdate(start)
+        self.statuses = []
+        for i, court in enumerate([self.court, self.court, other_court]):
+            slot = Slot.objects.create(
+                court=court, service_date=self.day, price_coins=100,
+                start_at=start + timedelta(minutes=30 * i), end_at=start + timedelta(minutes=30 * (i + 1)),
+            )
+            self.statuses.append(SlotStatus.objects.create(slot=slot, status="available"))
+        self.url = f"/api/slots/changes/?club={self.club.id}"
+
+    def flip(self, ss, status):
+        ss.status = status
+        ss.save(update_fields=["status", "updated_at"])
+
+    def changes(self, cursor, **params):
+        query = "".join(f"&{k}={v}" for k, v in params.items())
+        res = self.client.get(f"{self.url}&since={cursor}{query}")
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def test_without_since_returns_only_a_cursor(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["results"], [])
+        self.assertTrue(res.data["cursor"])
+
+    def test_returns_only_rows_changed_after_cursor(self):
+        cursor = self.client.get(self.url).data["cursor"]
+        self.flip(self.statuses[0], "maintenance")
+        self.flip(self.statuses[2], "maintenance")  # other club
+
+        data = self.changes(cursor)
+        self.assertEqual(data["results"], [{
+            "id": self.statuses[0].slot_id,
+            "slot_status": "maintenance",
+            "court": self.court.id,
+            "service_date": self.day.isoformat(),
+        }])
+        self.assertFalse(data["has_more"])
+
+        # Nothing new since the returned cursor
+        with self.assertNumQueries(1):
+            self.assertEqual(self.changes(data["cursor"])["results"], [])
+
+        self.flip(self.statuses[1], "booked")
+        self.assertEqual([r["id"] for r in self.changes(data["cursor"])["results"]], [self.statuses[1].slot_id])
+
+    def test_pages_through_changes(self):
+        cursor = self.client.get(self.url).data["cursor"]
+        self.flip(self.statuses[0], "maintenance")
+        self.flip(self.statuses[1], "maintenance")
+
+        first = self.changes(cursor, page_size=1)
+        self.assertTrue(first["has_more"])
+        second = self.changes(first["cursor"], page_size=1)
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            [r["id"] for r in first["results"] + second["results"]],
+            [self.statuses[0].slot_id, self.statuses[1].slot_id],
+        )
+
+    def test_write_stamped_long_before_its_commit_is_not_missed(self):
+        cursor = self.client.get(self.url).data["cursor"]
+        # As expire_slots or a slow booking: `at` taken well before the UPDATE commits
+        SlotStatus.objects.filter(pk=self.statuses[0].pk).update(
+            status="expired", updated_at=timezone.now() - timedelta(minutes=10)
+        )
+        self.assertEqual(
+            [(r["id"], r["slot_status"]) for r in self.changes(cursor)["results"]],
+            [(self.statuses[0].slot_id, "expired")],
+        )
+
+    @override_settings(SLOT_CHANGES_SETTLE_SECONDS=60)
+    def test_cursor_trails_the_settle_window(self):
+        cursor = self.client.get(self.url).data["cursor"]
+        self.flip(self.statuses[0], "maintenance")
+
+        # Fresh rows are delivered, but again on the next poll too, so a
+        # transaction that commits late with an older updated_at is not missed
+        data = self.changes(cursor)
+        self.assertIn(
+            {"id": self.statuses[0].slot_id, "status": "maintenance"},
+            [{"id": r["id"], "status": r["slot_status"]} for r in data["results"]],
+        )
+        self.assertEqual(self.changes(data["cursor"])["results"], data["results"])
+
+    def test_rejects_bad_input(self):
+        self.assertEqual(self.client.get("/api/slots/changes/?since=abc").status_code, 400)
+        self.assertEqual(self.client.get(f"{self.url}&since=abc").status_code, 400)
+        tampered = KeysetPaginator(("status_updated_at", "id")).encode_cursor([timezone.now().isoformat(), "x"])
+        self.assertEqual(self.client.get(f"{self.url}&since={tampered}").status_code, 400)
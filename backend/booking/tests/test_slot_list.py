@@ -0,0 +1,75 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.utils import timezone
+from datetime import timedelta
+from booking.models import Booking, BookingSlot, Club, Court, Slot, SlotStatus
+from booking.pagination import KeysetPaginator
+
+
+class TestSlotList(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.club = Club.objects.create(name="List Club")
+        self.other_club = Club.objects.create(name="Other Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        other_court = Court.objects.create(name="Court X", club=self.other_club)
+
+        self.day = timezone.localdate() + timedelta(days=1)
+        base = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.slots = []
+        for i in range(5):
+            s = Slot.objects.create(
+                court=self.court, service_date=self.day,
+                start_at=base + timedelta(minutes=30 * i),
+                end_at=base + timedelta(minutes=30 * (i + 1)),
+            )
+            SlotStatus.objects.create(slot=s, status="available")
+            self.slots.append(s)
+        Slot.objects.create(
+            court=other_court, service_date=self.day, start_at=base, end_at=base + timedelta(minutes=30),
+        )
+
+        booking = Booking.objects.create(
+            booking_no="BK-LIST", club=self.club, court=self.court, status="upcoming",
+        )
+        BookingSlot.objects.create(booking=booking, slot=self.slots[0])
+        SlotStatus.objects.filter(slot=self.slots[0]).update(status="booked")
+
+    def test_keyset_pages_in_constant_queries(self):
+        seen = []
+        url = f"/api/slots/?club={self.club.id}&page_size=2"
+        while url:
+            with self.assertNumQueries(1):
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            seen += [r["id"] for r in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(seen, [s.id for s in self.slots])
+
+    def test_row_shape_and_booking_id(self):
+        res = self.client.get(f"/api/slots/?court={self.court.id}&date_from={self.day}&date_to={self.day}")
+        first = res.data["results"][0]
+        self.assertEqual(first["booking_id"], "BK-LIST")
+        self.assertEqual(first["slot_status"], "booked")
+        self.assertEqual(first["service_date"], self.day.isoformat())
+        self.assertIsNone(res.data["results"][1]["booking_id"])
+
+        detail = self.client.get(f"/api/slots/{self.slots[0].id}/")
+        self.assertEqual(detail.data["booking_id"], "BK-LIST")
+
+    def test_invalid_filters(self):
+        self.assertEqual(self.client.get("/api/slots/?club=abc").status_code, 400)
+        self.assertEqual(self.client.get("/api/slots/?date_from=2025/01/01").status_code, 400)
+        self.assertEqual(self.client.get("/api/slots/?cursor=@@@").status_code, 400)
+
+    def test_tampered_cursor_is_rejected(self):
+        pager = KeysetPaginator(("start_at", "id"))
+        start = self.slots[0].start_at.isoformat()
+        for keys in (["yesterday", 1], [start, "one"], [start, None], [start, [1]], [start.split("+")[0], 1], [start]):
+            res = self.client.get(f"/api/slots/?cursor={pager.encode_cursor(keys)}")
+            self.assertEqual(res.status_code, 400, keys)
+            self.assertEqual(res.data, {"cursor": "Invalid cursor."})
+
+        res = self.client.get(f"/api/slots/?club={self.club.id}&cursor={pager.encode_cursor([start, self.slots[0].id])}")
+        self.assertEqual([r["id"] for r in res.data["results"]], [s.id for s in self.slots[1:]])
@@ -0,0 +1,126 @@
+from importlib import import_module
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from rest_framework.test import APIClient
+from booking.models import Booking, BookingSlot, Club, Court, Slot, SlotStatus
+from booking.availability import rebuild_day_availability
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+backfill = import_module("booking.migrations.0014_backfill_slot_status")
+
+
+class TestSlotStatusColumns(TestCase):
+    """Slot.status mirrors SlotStatus, so reads never join the old table."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.player = User.objects.create_user(username="p1", email="p1_columns@example.com", password="1234")
+        self.club = Club.objects.create(name="Columns Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+
+        self.day = timezone.localdate() + timedelta(days=3)
+        start = timezone.make_aware(datetime.combine(self.day, time(10, 0)))
+        self.slots = [
+            Slot.objects.create(
+                court=self.court, service_date=self.day, price_coins=100,
+                start_at=start + timedelta(minutes=30 * i), end_at=start + timedelta(minutes=30 * (i + 1)),
+            )
+            for i in range(4)
+        ]
+
+    def assertInLockstep(self):
+        self.assertEqual(
+            dict(Slot.objects.filter(slot_status__isnull=False).values_list("id", "status")),
+            dict(SlotStatus.objects.values_list("slot_id", "status")),
+        )
+        # Stamped by the database at the mirroring UPDATE, not copied from updated_at
+        copies = dict(Slot.objects.filter(slot_status__isnull=False).values_list("id", "status_updated_at"))
+        for slot_id, updated_at in SlotStatus.objects.values_list("slot_id", "updated_at"):
+            self.assertLess(abs(copies[slot_id] - updated_at), timedelta(minutes=1))
+
+    def test_every_slot_status_write_is_mirrored(self):
+        a, b, c, d = self.slots
+        ss = SlotStatus.objects.create(slot=a, status="booked")
+        SlotStatus.objects.bulk_create([SlotStatus(slot=b, status="maintenance"), SlotStatus(slot=c, status="booked")])
+        self.assertInLockstep()
+
+        ss.status = "playing"
+        ss.save(update_fields=["status", "updated_at"])
+        SlotStatus.objects.filter(slot=b, status="maintenance").update(status="available", updated_at=timezone.now())
+        SlotStatus.objects.filter(slot=c, status="available").update(status="walkin")  # matches nothing
+        self.assertInLockstep()
+        self.assertEqual([s.status for s in Slot.objects.order_by("id")], ["playing", "available", "booked", "available"])
+
+        # Filling in missing rows leaves existing ones (and their copies) alone
+        SlotStatus.objects.bulk_create(
+            [SlotStatus(slot=s, status="available") for s in self.slots], ignore_conflicts=True
+        )
+        self.assertEqual(Slot.objects.get(pk=d.pk).status, "available")
+        self.assertEqual(Slot.objects.get(pk=a.pk).status, "playing")
+
+    def test_bulk_writes_mirror_one_update_per_status(self):
+        with CaptureQueriesContext(connection) as ctx:
+            SlotStatus.objects.bulk_create(
+                [SlotStatus(slot=s, status="booked" if i < 3 else "maintenance") for i, s in enumerate(self.slots)]
+            )
+        self.assertEqual(len([q for q in ctx if q["sql"].startswith('UPDATE "booking_slot" ')]), 2)
+        self.assertInLockstep()
+
+        rows = list(SlotStatus.objects.order_by("slot_id"))
+        for row, status in zip(rows, ["available", "available", "walkin", "booked"]):
+            row.status = status
+        with CaptureQueriesContext(connection) as ctx:
+            SlotStatus.objects.bulk_update(rows, ["status", "updated_at"])
+        self.assertEqual(len([q for q in ctx if q["sql"].startswith('UPDATE "booking_slot" ')]), 3)
+        self.assertInLockstep()
+
+    def test_reads_do_not_join_slot_status(self):
+        for s in self.slots:
+            SlotStatus.objects.create(slot=s, status="available")
+        SlotStatus.objects.filter(slot=self.slots[0]).update(status="booked", updated_at=timezone.now())
+        booking = Booking.objects.create(
+            booking_no="BK-COL", user=self.player, club=self.club, court=self.court,
+            status="upcoming", booking_date=self.day,
+        )
+        BookingSlot.objects.create(booking=booking, slot=self.slots[0])
+        rebuild_day_availability()
+
+        self.client.force_authenticate(user=self.player)
+        month = self.day.strftime("%Y-%m")
+        with CaptureQueriesContext(connection) as ctx:
+            available = self.client.get(f"/api/available-slots/?club={self.club.id}&month={month}")
+            grid = self.client.get(f"/api/month-view/?club={self.club.id}&month={month}")
+            detail = self.client.get("/api/booking/BK-COL/")
+            listed = self.client.get(f"/api/slots/?club={self.club.id}")
+            history = self.client.get("/api/my-booking/")
+        self.assertFalse([q["sql"] for q in ctx if "booking_slotstatus" in q["sql"]])
+
+        self.assertEqual(len(available.data["days"][0]["available_slots"]), 3)
+        self.assertEqual(grid.data["days"][0]["booking_slots"][str(self.slots[0].id)]["status"], "booked")
+        self.assertEqual(detail.data["booking_slots"][str(self.slots[0].id)]["slot_status"], "booked")
+        self.assertEqual([r["slot_status"] for r in listed.data["results"]], ["booked"] + ["available"] * 3)
+        self.assertEqual(history.status_code, 200)
+
+    def test_backfill_copies_slot_status_in_chunks(self):
+        for s in self.slots[:3]:
+            SlotStatus.objects.create(slot=s, status="maintenance")
+        # As left by code that predates the columns
+        Slot.objects.update(status="available", status_updated_at=None)
+
+        chunk = backfill.BACKFILL_CHUNK
+        backfill.BACKFILL_CHUNK = 2
+        try:
+            backfill.backfill_slot_status(apps, connection.schema_editor())
+        finally:
+            backfill.BACKFILL_CHUNK = chunk
+
+        self.assertInLockstep()
+        self.assertEqual(Slot.objects.get(pk=self.slots[3].pk).status, "available")
+        self.assertIsNone(Slot.objects.get(pk=self.slots[3].pk).status_updated_at)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from datetime import timedelta
+from booking.live import RESYNC, broker
+from booking.models import Club, Court, Slot, SlotStatus
+from booking.signals import notify_slot_status_changed
+
+
+@override_settings(SLOT_EVENTS_BACKEND="local")
+class TestSlotStream(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Live Club")
+        court = Court.objects.create(name="Court 1", club=self.club)
+        start = timezone.now() + timedelta(days=2)
+        self.slot = Slot.objects.create(
+            court=court, service_date=timezone.localdate(start), price_coins=100,
+            start_at=start, end_at=start + timedelta(minutes=30),
+        )
+        self.ss = SlotStatus.objects.create(slot=self.slot, status="available")
+        self.url = f"/api/slots/stream/?club={self.club.id}"
+
+    def flip(self, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ss.status = status
+            self.ss.save(update_fields=["status", "updated_at"])
+            notify_slot_status_changed([self.slot.id])
+
+    @staticmethod
+    def parse(message):
+        event, data = message.decode().strip().split("\n")
+        return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+    async def test_committed_change_reaches_subscribers(self):
+        sub = broker.subscribe(self.club.id)
+        other = broker.subscribe(self.club.id + 1)
+        try:
+            await sync_to_async(self.flip)("booked")
+            event, data = self.parse(await asyncio.wait_for(sub.queue.get(), 1))
+            self.assertEqual(event, "slots")
+            self.assertEqual(data["slots"], [{
+                "id": self.slot.id,
+                "slot_status": "booked",
+                "court": self.slot.court_id,
+                "service_date": self.slot.service_date.isoformat(),
+            }])
+            self.assertTrue(other.queue.empty())
+        finally:
+            broker.unsubscribe(sub)
+            broker.unsubscribe(other)
+        self.assertFalse(broker.has_subscribers())
+
+    async def test_slow_reader_gets_resync_instead_of_backlog(self):
+        with self.settings(SLOT_STREAM_QUEUE_SIZE=2):
+            sub = broker.subscribe(self.club.id)
+        try:
+            for i in range(3):
+                broker.publish(self.club.id, f"event: n\ndata: {i}\n\n".encode())
+            await asyncio.sleep(0)
+            self.assertEqual(sub.queue.qsize(), 1)
+            self.assertEqual(sub.queue.get_nowait(), RESYNC)
+        finally:
+            broker.unsubscribe(sub)
+
+    async def test_stream_endpoint(self):
+        res = await self.async_client.get(self.url)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        stream = res.streaming_content
+        try:
+            event, data = self.parse(await anext(stream))
+            self.assertEqual(event, "ready")
+            self.assertTrue(data["cursor"])
+
+            await sync_to_async(self.flip)("maintenance")
+            event, data = self.parse(await asyncio.wait_for(anext(stream), 1))
+            self.assertEqual((event, data["slots"][0]["slot_status"]), ("slots", "maintenance"))
+        finally:
+            # Client disconnect: the ASGI handler cancels the pending read
+            read = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            read.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await read
+        self.assertFalse(broker.has_subscribers())
+
+    def test_requires_asgi_and_points_to_polling(self):
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 501)
+        self.flip("booked")
+        polled = self.client.get(f"{res.json()['poll']}&since={res.json()['cursor']}")
+        self.assertEqual(polled.status_code, 200)
+        self.assertEqual([r["slot_status"] for r in polled.json()["results"]], ["booked"])
+        self.assertEqual(self.client.get("/api/slots/stream/").status_code, 400)
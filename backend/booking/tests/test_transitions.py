@@ -0,0 +1,127 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from io import StringIO
+from rest_framework.test import APIClient
+from booking.models import Booking, BookingSlot, Club, Court, Slot, SlotStatus, SlotStatusTransition
+from booking.transitions import booking_sources, can_move_booking, can_move_slot, slot_sources
+from django.contrib.auth import get_user_model
+from wallet.models import Wallet
+
+User = get_user_model()
+
+
+class TestTransitions(TestCase):
+    """Every write path goes through booking.transitions and leaves a history row per slot moved."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = User.objects.create_user(
+            username="mgr", email="mgr_transitions@example.com", password="1234", role="manager"
+        )
+        self.player = User.objects.create_user(username="p1", email="p1_transitions@example.com", password="1234")
+        Wallet.objects.create(user=self.player, balance=10000)
+        self.club = Club.objects.create(name="Transition Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+
+        self.day = timezone.localdate() + timedelta(days=3)
+        start = timezone.make_aware(datetime.combine(self.day, time(10, 0)))
+        self.slots = []
+        for i in range(4):
+            s = Slot.objects.create(
+                court=self.court, service_date=self.day, price_coins=100,
+                start_at=start + timedelta(minutes=30 * i), end_at=start + timedelta(minutes=30 * (i + 1)),
+            )
+            SlotStatus.objects.create(slot=s, status="available")
+            self.slots.append(s)
+
+    def make_booking(self, slots, status, slot_status):
+        b = Booking.objects.create(
+            booking_no=f"BK-T{slots[0].id}", user=self.player, club=self.club, court=self.court,
+            status=status, booking_date=self.day,
+        )
+        for s in slots:
+            BookingSlot.objects.create(booking=b, slot=s)
+        SlotStatus.objects.filter(slot__in=slots).update(status=slot_status)
+        return b
+
+    def history(self, slot):
+        return list(
+            SlotStatusTransition.objects.filter(slot=slot)
+            .order_by("id")
+            .values_list("from_status", "to_status", "source", "actor_id")
+        )
+
+    def test_tables(self):
+        self.assertTrue(can_move_slot("book", "available", "walkin"))
+        self.assertFalse(can_move_slot("book", "maintenance", "booked"))
+        self.assertFalse(can_move_slot("maintenance", "booked", "available"))
+        self.assertTrue(can_move_slot("manager", "playing", "ended"))
+        self.assertEqual(slot_sources("expire", "noshow"), {"booked", "walkin"})
+        self.assertEqual(slot_sources("cancel", "playing"), set())
+
+        self.assertTrue(can_move_booking("cancel", "upcoming", "cancelled"))
+        self.assertFalse(can_move_booking("cancel", "checkin", "cancelled"))
+        self.assertEqual(booking_sources("checkin", "checkin"), {"upcoming", "walkin"})
+
+    def test_book_and_cancel_are_logged(self):
+        self.client.force_authenticate(user=self.player)
+        res = self.client.post("/api/booking/", {"club": self.club.id, "slots": [self.slots[0].id]}, format="json")
+        self.assertEqual(res.status_code, 201, res.data)
+
+        res = self.client.post(f"/api/booking/{res.data['booking_id']}/cancel/")
+        self.assertEqual(res.status_code, 200, res.data)
+        self.assertEqual(SlotStatus.objects.get(slot=self.slots[0]).status, "available")
+        self.assertEqual(self.history(self.slots[0]), [
+            ("available", "booked", "book", self.player.id),
+            ("booked", "available", "cancel", self.player.id),
+        ])
+
+    def test_cancel_refuses_a_booking_already_played(self):
+        booking = self.make_booking(self.slots[:2], "checkin", "playing")
+        self.client.force_authenticate(user=self.player)
+
+        res = self.client.post(f"/api/booking/{booking.booking_no}/cancel/")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(res.data["detail"], "Cannot cancel a booking that is 'checkin'")
+        self.assertEqual(set(SlotStatus.objects.filter(slot__in=self.slots[:2]).values_list("status", flat=True)),
+                         {"playing"})
+        self.assertFalse(SlotStatusTransition.objects.exists())
+
+    def test_cancel_without_refund_when_a_slot_moved_on(self):
+        booking = self.make_booking(self.slots[:2], "upcoming", "booked")
+        SlotStatus.objects.filter(slot=self.slots[1]).update(status="maintenance")
+        self.client.force_authenticate(user=self.player)
+
+        res = self.client.post(f"/api/booking/{booking.booking_no}/cancel/")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, "upcoming")
+        self.assertEqual(Wallet.objects.get(user=self.player).balance, 10000)
+        self.assertEqual(SlotStatus.objects.get(slot=self.slots[0]).status, "booked")
+        self.assertFalse(SlotStatusTransition.objects.exists())
+
+    def test_checkin_moves_booked_slots_to_playing(self):
+        booking = self.make_booking(self.slots[:2], "upcoming", "booked")
+        self.client.force_authenticate(user=self.manager)
+
+        res = self.client.post(f"/api/booking/{booking.booking_no}/checkin/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["updated_slots"], [str(s.id) for s in self.slots[:2]])
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, "checkin")
+        for s in self.slots[:2]:
+            self.assertEqual(self.history(s), [("booked", "playing", "checkin", self.manager.id)])
+
+        res = self.client.post(f"/api/booking/{booking.booking_no}/checkin/")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(SlotStatusTransition.objects.count(), 2)
+
+    def test_expire_slots_is_logged_without_actor(self):
+        past = timezone.now() - timedelta(hours=1)
+        Slot.objects.filter(pk=self.slots[0].pk).update(start_at=past - timedelta(minutes=30), end_at=past)
+
+        call_command("expire_slots", stdout=StringIO())
+        self.assertEqual(self.history(self.slots[0]), [("available", "expired", "expire", None)])
+        self.assertEqual(SlotStatusTransition.objects.count(), 1)
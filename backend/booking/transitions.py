@@ -0,0 +1,198 @@
+# booking/transitions.py
+# The slot / booking state machine. Every SlotStatus write path (booking,
+# walk-in, cancel, check-in, expire_slots, the manager grid) names its path
+# here. The tables below are compiled once into frozenset lookups; moves are
+# applied with one conditional UPDATE per target status and recorded in
+# SlotStatusTransition with one bulk INSERT.
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .models import Booking, SlotStatus, SlotStatusTransition
+from .signals import notify_slot_status_changed
+
+# ── slot statuses (SlotStatus.STATUS) ───────────────────────────────────
+AVAILABLE = "available"
+BOOKED = "booked"
+WALKIN = "walkin"
+PLAYING = "playing"
+ENDED = "ended"
+EXPIRED = "expired"
+NOSHOW = "noshow"
+MAINTENANCE = "maintenance"
+
+# path → {current status: statuses it may move to}
+SLOT_TRANSITIONS = {
+    "book": {AVAILABLE: (BOOKED, WALKIN)},
+    "cancel": {BOOKED: (AVAILABLE,), WALKIN: (AVAILABLE,)},
+    "checkin": {BOOKED: (PLAYING,), WALKIN: (PLAYING,)},
+    "expire": {AVAILABLE: (EXPIRED,), BOOKED: (NOSHOW,), WALKIN: (NOSHOW,), PLAYING: (ENDED,)},
+    # POST /api/slots/update-status/
+    "manager": {
+        AVAILABLE: (MAINTENANCE, WALKIN, BOOKED, EXPIRED),
+        BOOKED: (PLAYING, NOSHOW),
+        WALKIN: (PLAYING, NOSHOW),
+        PLAYING: (ENDED,),
+        MAINTENANCE: (AVAILABLE,),
+    },
+    # POST /api/slots/status/
+    "maintenance": {AVAILABLE: (MAINTENANCE,), MAINTENANCE: (AVAILABLE,)},
+}
+
+# Names the manager grid sent before the slot statuses were unified
+SLOT_STATUS_ALIASES = {"checkin": PLAYING, "endgame": ENDED, "no_show": NOSHOW}
+
+# ── booking statuses (Booking.STATUS) ───────────────────────────────────
+BOOKING_TRANSITIONS = {
+    "cancel": {s: ("cancelled",) for s in ("pending", "confirmed", "upcoming", "walkin")},
+    "checkin": {"upcoming": ("checkin",), "walkin": ("checkin",)},
+    # expire_slots, after the booking's last slot: noshow → noshow, ended → endgame
+    # ("booked" bookings were written by the manager grid before it mapped statuses)
+    "expire": {"upcoming": ("noshow",), "booked": ("noshow",), "walkin": ("noshow",), "checkin": ("endgame",)},
+}
+
+# Booking statuses the frontend filters still send (renamed in migration 0012)
+BOOKING_STATUS_ALIASES = {"no_show": "noshow"}
+
+# A booking follows its slots into these statuses (manager grid)
+BOOKING_FOLLOWS_SLOT = {PLAYING: "checkin", NOSHOW: "noshow", ENDED: "endgame"}
+
+
+def _compile(table):
+    allowed = frozenset(
+        (path, src, dst) for path, moves in table.items() for src, dsts in moves.items() for dst in dsts
+    )
+    sources = defaultdict(set)
+    for path, src, dst in allowed:
+        sources[(path, dst)].add(src)
+    return allowed, {key: frozenset(srcs) for key, srcs in sources.items()}
+
+
+_SLOT_ALLOWED, _SLOT_SOURCES = _compile(SLOT_TRANSITIONS)
+_BOOKING_ALLOWED, _BOOKING_SOURCES = _compile(BOOKING_TRANSITIONS)
+SLOT_STATUSES = frozenset(dict(SlotStatus.STATUS))
+
+
+def can_move_slot(path, current, new) -> bool:
+    return (path, current, new) in _SLOT_ALLOWED
+
+
+def slot_sources(path, new) -> frozenset:
+    """Statuses from which `path` may move a slot to `new`."""
+    return _SLOT_SOURCES.get((path, new), frozenset())
+
+
+def can_move_booking(path, current, new) -> bool:
+    return (path, current, new) in _BOOKING_ALLOWED
+
+
+def booking_sources(path, new) -> frozenset:
+    return _BOOKING_SOURCES.get((path, new), frozenset())
+
+
+def log_transitions(changes, source, actor=None, at=None):
+    """Append (slot_id, from_status, to_status) rows to the history in one INSERT."""
+    at = at or timezone.now()
+    actor_id = getattr(actor, "pk", None)
+    SlotStatusTransition.objects.bulk_create(
+        [
+            SlotStatusTransition(
+                slot_id=slot_id, from_status=src, to_status=dst, source=source, actor_id=actor_id, created_at=at,
+            )
+            for slot_id, src, dst in changes
+        ],
+        batch_size=1000,
+    )
+
+
+def move_slots(path, current, new, actor=None, at=None):
+    """
+    Move every slot in `current` ({slot_id: status}, rows locked by the
+    caller) that `path` allows to `new`, with one conditional UPDATE and one
+    history INSERT. Returns the ids moved, in `current` order, or None if
+    the UPDATE matched fewer rows than expected (a concurrent writer got
+    there first; roll back).
+    """
+    sources = slot_sources(path, new)
+    sids = [sid for sid, status in current.items() if status in sources]
+    if not sids:
+        return []
+    at = at or timezone.now()
+    moved = SlotStatus.objects.filter(slot_id__in=sids, status__in=sources).update(status=new, updated_at=at)
+    if moved != len(sids):
+        return None
+    log_transitions([(sid, current[sid], new) for sid in sids], path, actor, at)
+    return sids
+
+
+def _slot_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def apply_slot_transitions(items, path, actor=None, propagate_to_bookings=False):
+    """
+    Move slots to new statuses along `path`. Call inside a transaction.
+
+    `items` is a list of (slot_id, new_status) in request order (either may
+    be None). Items are checked in order against the locked rows, so a slot
+    listed twice moves through both steps. With `propagate_to_bookings`,
+    bookings holding a changed slot (cancelled ones excepted) follow it
+    into checkin / noshow / endgame.
+
+    Returns (applied, errors): applied is the accepted (slot_id, new_status)
+    pairs, errors is [{"slot", "detail"}] for the rest.
+    """
+    ids = {_slot_id(slot_id) for slot_id, _ in items} - {None}
+    current = dict(
+        SlotStatus.objects
+        .select_for_update()
+        .filter(slot_id__in=ids)
+        .order_by("slot_id")
+        .values_list("slot_id", "status")
+    )
+    original = dict(current)
+
+    applied, errors = [], []
+    for slot_id, new_status in items:
+        sid = _slot_id(slot_id)
+        new_status = SLOT_STATUS_ALIASES.get(new_status, new_status)
+        if not slot_id or not new_status:
+            errors.append({"slot": slot_id, "detail": "Missing slot or status"})
+        elif sid not in current:
+            errors.append({"slot": slot_id, "detail": "Slot not found"})
+        elif new_status not in SLOT_STATUSES:
+            errors.append({"slot": slot_id, "detail": "Invalid status"})
+        elif not can_move_slot(path, current[sid], new_status):
+            errors.append({"slot": slot_id, "detail": f"Cannot change from {current[sid]} → {new_status}"})
+        else:
+            current[sid] = new_status
+            applied.append((slot_id, new_status))
+
+    # Net changes grouped by target, one conditional UPDATE each; a slot
+    # that went through several steps is logged as one move
+    by_target = defaultdict(list)
+    for sid, status in current.items():
+        if status != original[sid]:
+            by_target[status].append(sid)
+
+    now = timezone.now()
+    for status, sids in by_target.items():
+        sources = {original[sid] for sid in sids}
+        SlotStatus.objects.filter(slot_id__in=sids, status__in=sources).update(status=status, updated_at=now)
+        booking_status = BOOKING_FOLLOWS_SLOT.get(status)
+        if propagate_to_bookings and booking_status:
+            (
+                Booking.objects
+                .filter(booking_slots__slot_id__in=sids)
+                .exclude(status="cancelled")
+                .update(status=booking_status)
+            )
+    changed = [sid for sids in by_target.values() for sid in sids]
+    if changed:
+        log_transitions([(sid, original[sid], current[sid]) for sid in changed], path, actor, now)
+
+    notify_slot_status_changed(changed)
+    return applied, errors
@@ -3,6 +3,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from .views.slot_views import SlotViewSet, available_slots_month_view, month_view
+from .views.stream_views import slot_stream_view
 from .views.booking_views import (
     booking_create_view,
     bookings_all_view,
@@ -36,6 +37,7 @@ urlpatterns = [
 
     # ADD THIS (correct placement)
     path("slots/slots-list/", SlotViewSet.as_view({"post": "slots_list"}), name="slots-list"),
+    path("slots/stream/", slot_stream_view, name="slots-stream"),
 
     # ────────────────────────────────
     # Booking Endpoints
@@ -0,0 +1,25 @@
+# booking/urls_async.py
+# booking.urls for the ASGI app: the same routes, in the same order, with the
+# read-heavy endpoints resolved to their async-native views.
+from django.urls import URLResolver, path
+
+from . import urls
+from .views import async_views
+
+ASYNC_VIEWS = {
+    "available-slots": async_views.available_slots_month_view,
+    "month-view": async_views.slot_month_view,
+    "slots-list": async_views.slots_list_view,
+    "booking-detail": async_views.booking_detail_view,
+}
+
+urlpatterns = [
+    path(str(p.pattern), ASYNC_VIEWS[p.name], name=p.name) if getattr(p, "name", None) in ASYNC_VIEWS else p
+    for p in urls.urlpatterns
+]
+
+# The router's /slots/month-view/ action, ahead of the router include
+router_at = next(i for i, p in enumerate(urlpatterns) if isinstance(p, URLResolver))
+urlpatterns.insert(
+    router_at, path("slots/month-view/", async_views.slot_month_view, name="slot-month-view")
+)
@@ -0,0 +1,161 @@
+# booking/views/async_views.py
+# Async-native versions of the read-heavy endpoints. The ASGI app
+# (courtly.asgi) resolves through courtly.urls_asgi, which swaps these in for
+# the DRF views; validation, payloads and query budgets are shared with them.
+# Cache and ORM calls are awaited, so a request waiting on I/O holds no
+# thread while it waits.
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from courtly.query_metrics import query_budget
+
+from ..models import Booking
+from ..month_cache import acached_month_payload, amonth_version, etag_matches, month_etag, versions_are_shared
+from .booking_views import booking_detail_payload, booking_detail_slots, can_view_booking
+from .slot_views import (
+    _available_slots_plan,
+    arun_plan,
+    booking_month_plan,
+    booking_month_variant,
+    parse_booking_month,
+    parse_club_month,
+    parse_slot_list,
+    slot_list_items,
+    slot_list_queryset,
+)
+
+
+def _json(data, status=status.HTTP_200_OK, headers=None):
+    # DRF's renderer, so bodies match the sync views byte for byte
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type="application/json", headers=headers)
+
+
+def api_errors(view):
+    """Render DRF exceptions (ParseError, ValidationError, ...) the way an APIView would."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+            code, headers = exc.status_code, None
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                # As APIView.handle_exception: 401 only if the first authenticator has a challenge
+                challenge = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(request)
+                if challenge:
+                    headers = {"WWW-Authenticate": challenge}
+                else:
+                    code = status.HTTP_403_FORBIDDEN
+            return _json(data, status=code, headers=headers)
+    return wrapper
+
+
+async def authenticate(request):
+    """Run the configured DRF authenticators (session, JWT) off the event loop."""
+    def user():
+        return Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]).user
+    return await sync_to_async(user)()
+
+
+def session_csrf(view):
+    """
+    CSRF as the DRF views apply it: like APIView.as_view, the view is exempt
+    from the middleware, and SessionAuthentication enforces the token only
+    when the request is authenticated by session cookie. JWT and anonymous
+    callers need none. Goes inside api_errors, which renders the 403.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        await authenticate(request)
+        return await view(request, *args, **kwargs)
+    return csrf_exempt(wrapper)
+
+
+async def _month_response(request, club_id, month, variant, representation, plan):
+    """Async twin of slot_views._month_response."""
+    if not versions_are_shared():
+        return _json(await arun_plan(plan()), headers={"Cache-Control": "no-cache"})
+    version = await amonth_version(club_id, month)
+    etag = month_etag(club_id, month, variant, representation, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    payload = await acached_month_payload(club_id, month, variant, lambda: arun_plan(plan()), version)
+    return _json(payload, headers=headers)
+
+
+@query_budget(3)
+@require_GET
+@api_errors
+async def available_slots_month_view(request):
+    """GET /available-slots/?club=<id>&month=YYYY-MM"""
+    club_id, first_day, last_day = parse_club_month(request.GET)
+    return await _month_response(
+        request, club_id, first_day.strftime("%Y-%m"), "available-slots", "json",
+        lambda: _available_slots_plan(club_id, first_day, last_day),
+    )
+
+
+@query_budget(2)
+@require_GET
+@api_errors
+async def slot_month_view(request):
+    """GET /month-view/ and /slots/month-view/?club=&month=YYYY-MM[&day=][&format=compact]"""
+    club_id, first_day, start_day, last_day, day_filter = parse_booking_month(request.GET)
+    representation = "compact" if request.GET.get("format") == "compact" else "json"
+    return await _month_response(
+        request, club_id, first_day.strftime("%Y-%m"),
+        booking_month_variant(representation, start_day, day_filter), representation,
+        lambda: booking_month_plan(representation, club_id, first_day, start_day, last_day, day_filter),
+    )
+
+
+@query_budget(2)
+@require_POST
+@api_errors
+@session_csrf
+async def slots_list_view(request):
+    """POST /slots/slots-list/  {"slot_list": ["25188", "25189"]}"""
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"null")
+        except ValueError:
+            raise ParseError("JSON parse error")
+    else:
+        data = request.POST
+
+    slots = [s async for s in slot_list_queryset(parse_slot_list(data))]
+    if not slots:
+        return _json({"detail": "No slots found"}, status=404)
+    return _json({"slot_items": slot_list_items(slots)})
+
+
+@query_budget(2)
+@require_GET
+@api_errors
+async def booking_detail_view(request, booking_no: str):
+    """GET /booking/<booking_no>/  (Authenticated: Manager or Owner)"""
+    user = await authenticate(request)
+    if not user.is_authenticated:
+        raise NotAuthenticated()
+
+    try:
+        b = await Booking.objects.select_related("user").aget(booking_no=booking_no)
+    except Booking.DoesNotExist:
+        return _json({"detail": "Not found"}, status=404)
+
+    if not can_view_booking(user, b):
+        return _json({"detail": "Forbidden"}, status=403)
+
+    slots = [s async for s in booking_detail_slots(b)]
+    return _json(booking_detail_payload(b, slots))
@@ -0,0 +1,64 @@
+# booking/views/booking_list.py
+# Shared list engine for the booking list endpoints (all / my / upcoming)
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from ..models import BookingSlot
+from .utils import able_to_cancel_at
+
+LIST_FIELDS = (
+    "id", "booking_no", "created_at", "total_cost", "booking_date", "status",
+    "user_id", "user__username", "customer_name",
+    "first_slot_start", "first_slot_status",
+)
+
+
+def with_first_slot(qs):
+    """Annotate each booking with its earliest slot's start and status (no per-row queries)."""
+    first = BookingSlot.objects.filter(booking_id=OuterRef("pk")).order_by("slot__start_at")
+    return qs.annotate(
+        first_slot_start=Subquery(first.values("slot__start_at")[:1]),
+        first_slot_status=Subquery(first.values("slot__status")[:1]),
+    )
+
+
+def booking_list_values(qs):
+    """`.values()` queryset with everything the list rows need (one query)."""
+    return with_first_slot(qs).values(*LIST_FIELDS)
+
+
+def build_booking_rows(rows, with_owner_username=False):
+    """Turn booking_list_values() rows into the dicts the list endpoints return."""
+    tz = timezone.get_current_timezone()
+    data = []
+
+    for b in rows:
+        able_to_cancel = able_to_cancel_at(b["first_slot_start"], b["first_slot_status"])
+        if b["status"] == "cancelled":
+            able_to_cancel = False
+
+        row = {
+            "booking_id": b["booking_no"],
+            "created_date": timezone.localtime(b["created_at"], tz).strftime("%Y-%m-%d %H:%M"),
+            "total_cost": int(b["total_cost"] or 0),
+            "booking_date": b["booking_date"].strftime("%Y-%m-%d") if b["booking_date"] else None,
+            "booking_status": b["status"],
+            "able_to_cancel": able_to_cancel,
+            "owner_id": b["user_id"] if b["user_id"] else None,
+        }
+        if with_owner_username:
+            row["owner_username"] = b["user__username"] if b["user_id"] else (b["customer_name"] or "Unknown")
+        data.append(row)
+
+    return data
+
+
+def booking_list_rows(qs, limit=None, with_owner_username=False):
+    """
+    Run one query for the whole list and build the row dicts the list
+    endpoints return. `qs` is a filtered, ordered Booking queryset.
+    """
+    rows = booking_list_values(qs)
+    if limit:
+        rows = rows[:limit]
+    return build_booking_rows(rows, with_owner_username)
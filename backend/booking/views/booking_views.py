@@ -1,43 +1,49 @@
+from datetime import datetime
+
 from django.db import transaction
 from ..models import Slot, SlotStatus, Booking, BookingSlot
 from core.models import Club
-from wallet.models import Wallet, CoinLedger
+from ops.audit import audit
+from ops.idempotency import idempotent
+from wallet.ledger import lock_wallet, post_entry
 from django.utils import timezone
 from ..serializers import BookingCreateSerializer
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status, permissions
+from courtly.query_metrics import query_budget
 from .utils import gen_booking_no, calculate_able_to_cancel
+from .booking_list import booking_list_rows, booking_list_values, build_booking_rows
+from ..pagination import KeysetPaginator
+from ..signals import notify_slot_status_changed
+from ..transitions import AVAILABLE, BOOKING_STATUS_ALIASES, can_move_booking, can_move_slot, move_slots
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 4) GET /api/booking/<booking_id>/   (Authenticated: Manager or Owner)
 # ─────────────────────────────────────────────────────────────────────────────
-@api_view(["GET"])
-@permission_classes([permissions.IsAuthenticated])
-def booking_detail_view(request, booking_no: str):
-    try:
-        b = Booking.objects.select_related("user").get(booking_no=booking_no)
-    except Booking.DoesNotExist:
-        return Response({"detail": "Not found"}, status=404)
+def can_view_booking(user, booking) -> bool:
+    """Owners see their own bookings; managers and admins see all."""
+    return booking.user_id == user.pk or getattr(user, "role", None) in ["manager", "admin"]
 
-    user_role = getattr(request.user, "role", None)
-    if b.user != request.user and user_role not in ["manager", "admin"]:
-        return Response({"detail": "Forbidden"}, status=403)
 
-    slots = (
-        BookingSlot.objects.filter(booking=b)
-        .select_related("slot", "slot__court", "slot__slot_status")
+def booking_detail_slots(booking):
+    return (
+        BookingSlot.objects.filter(booking=booking)
+        .select_related("slot", "slot__court")
         .order_by("slot__start_at")
     )
+
+
+def booking_detail_payload(b, slots):
+    """Response body of booking_detail_view; `slots` is booking_detail_slots(b), evaluated."""
     tz = timezone.get_current_timezone()
 
     booking_slots = {}
     for s in slots:
         slot = s.slot
-        status_val = getattr(slot.slot_status, "status", "available") if slot.slot_status else "available"
         booking_slots[str(slot.id)] = {
-            "slot_status": status_val,
+            "slot_status": slot.status,
             "service_date": slot.service_date.strftime("%Y-%m-%d"),
             "start_time": timezone.localtime(slot.start_at, tz).strftime("%H:%M"),
             "end_time": timezone.localtime(slot.end_at, tz).strftime("%H:%M"),
@@ -47,14 +53,13 @@ def booking_detail_view(request, booking_no: str):
             "booking_id": b.booking_no
         }
 
-    first_slot = slots.first()
-    able_to_cancel = calculate_able_to_cancel(first_slot) if first_slot else False
+    able_to_cancel = calculate_able_to_cancel(slots[0]) if slots else False
     if b.status == "cancelled":
         able_to_cancel = False
 
     created_local = timezone.localtime(b.created_at, tz)
 
-    payload = {
+    return {
         "created_date": created_local.strftime("%Y-%m-%d %H:%M"),
         "booking_id": b.booking_no,
         "owner_id": b.user_id if b.user_id else None,
@@ -69,7 +74,20 @@ def booking_detail_view(request, booking_no: str):
         "booking_slots": booking_slots,
     }
 
-    return Response(payload, status=200)
+
+@query_budget(2)
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def booking_detail_view(request, booking_no: str):
+    try:
+        b = Booking.objects.select_related("user").get(booking_no=booking_no)
+    except Booking.DoesNotExist:
+        return Response({"detail": "Not found"}, status=404)
+
+    if not can_view_booking(request.user, b):
+        return Response({"detail": "Forbidden"}, status=403)
+
+    return Response(booking_detail_payload(b, list(booking_detail_slots(b))), status=200)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -78,12 +96,14 @@ def booking_detail_view(request, booking_no: str):
 #    - Manager → skip wallet capture + mark slots as walkin
 #    - Always create booking with status = upcoming
 # ─────────────────────────────────────────────────────────────────────────────
+@query_budget(24)
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
-@transaction.atomic
+@idempotent("booking.create")
+@transaction.atomic(savepoint=False)
 def booking_create_view(request):
     """
-    Create a new booking.
+    Create a new booking. Honours an Idempotency-Key header (ops.idempotency).
     - Player booking:
         * Must have enough wallet balance.
         * Booking is linked to user.
@@ -117,31 +137,45 @@ def booking_create_view(request):
     if not Club.objects.filter(id=club_id).exists():
         return Response({"detail": "Club not found"}, status=404)
 
-    # Fetch all requested slots
-    qs = (
-        Slot.objects
-        .filter(id__in=slots_in)
-        .select_related("court", "slot_status")
-        .order_by("start_at")
-    )
+    new_status = "walkin" if user_role == "manager" else "booked"
 
-    if not qs.exists():
+    # Make sure every requested slot has a status row, then lock them in
+    # slot-id order (always before the wallet) so concurrent bookings of
+    # overlapping slots queue up instead of deadlocking.
+    slot_ids = list(Slot.objects.filter(id__in=slots_in).values_list("id", flat=True))
+    if not slot_ids:
         return Response({"detail": "No valid slots found"}, status=404)
 
-    first_slot = qs.first()
-    total_cost = 0
+    SlotStatus.objects.bulk_create(
+        [SlotStatus(slot_id=sid, status="available") for sid in slot_ids],
+        ignore_conflicts=True,
+    )
+    locked = dict(
+        SlotStatus.objects
+        .select_for_update()
+        .filter(slot_id__in=slot_ids)
+        .order_by("slot_id")
+        .values_list("slot_id", "status")
+    )
+
+    slots = list(
+        Slot.objects
+        .filter(id__in=slot_ids)
+        .order_by("start_at")
+        .values("id", "court_id", "service_date", "price_coins")
+    )
+    first_slot = slots[0]
 
     # Validate all slots and calculate cost
-    for s in qs:
-        status_val = getattr(getattr(s, "slot_status", None), "status", "available")
-        if status_val != "available":
-            return Response({"detail": f"Slot {s.id} not available"}, status=409)
+    for s in slots:
+        if not can_move_slot("book", locked.get(s["id"]), new_status):
+            return Response({"detail": f"Slot {s['id']} not available"}, status=409)
 
-        total_cost += s.price_coins
+    total_cost = 0 if user_role == "manager" else sum(s["price_coins"] for s in slots)
 
     # Player must have enough wallet balance
     if user_role != "manager":
-        wallet, _ = Wallet.objects.get_or_create(user=request.user, defaults={"balance": 0})
+        wallet = lock_wallet(request.user.id)
 
         if wallet.balance < total_cost:
             return Response(
@@ -154,30 +188,31 @@ def booking_create_view(request):
     # ───────────────────────────────────────────────
 
     if user_role == "manager":
-        # Manager walk-in/phone-call booking (no user link)
+        # Manager walk-in/phone-call booking (no user link), cost 0
         booking = Booking.objects.create(
             booking_no=gen_booking_no(),
             user=None,
             club_id=club_id,
-            court_id=first_slot.court_id,
-            booking_date=first_slot.service_date,
+            court_id=first_slot["court_id"],
+            booking_date=first_slot["service_date"],
             status="upcoming",
+            total_cost=total_cost,
             booking_method=booking_method,
             customer_name=owner_username,
             contact_method="phone-call",
             contact_detail=owner_contact,
             payment_method="mobile-banking",
         )
-        total_cost = 0  # Manager bookings cost 0
     else:
         # Player booking
         booking = Booking.objects.create(
             booking_no=gen_booking_no(),
             user=request.user,
             club_id=club_id,
-            court_id=first_slot.court_id,
-            booking_date=first_slot.service_date,
+            court_id=first_slot["court_id"],
+            booking_date=first_slot["service_date"],
             status="upcoming",
+            total_cost=total_cost,
             booking_method=booking_method,
             customer_name=None,
             contact_method="Courtly Website",
@@ -185,34 +220,25 @@ def booking_create_view(request):
             payment_method=payment_method,
         )
 
-    created_slot_ids = []
+    created_slot_ids = [s["id"] for s in slots]
 
-    # Create BookingSlot & update status
-    for s in qs:
-        BookingSlot.objects.create(booking=booking, slot=s)
-        new_status = "walkin" if user_role == "manager" else "booked"
-
-        SlotStatus.objects.update_or_create(
-            slot=s,
-            defaults={"status": new_status}
-        )
+    # One INSERT for all BookingSlots, one conditional UPDATE for all statuses
+    # (plus their history row). The rowcount is the last line of defence
+    # against a double booking.
+    BookingSlot.objects.bulk_create(
+        [BookingSlot(booking=booking, slot_id=sid) for sid in created_slot_ids]
+    )
+    if move_slots("book", locked, new_status, actor=request.user) is None:
+        transaction.set_rollback(True)
+        return Response({"detail": "One or more slots were just booked by someone else"}, status=409)
 
-        created_slot_ids.append(s.id)
+    notify_slot_status_changed(created_slot_ids)
 
     # Deduct player wallet
     if user_role != "manager":
-        wallet.balance -= total_cost
-        wallet.save(update_fields=["balance"])
-
-        CoinLedger.objects.create(
-            user=request.user,
-            type="capture",
-            amount=-total_cost,
-            ref_booking=booking
-        )
+        post_entry(wallet, "capture", -total_cost, ref_booking=booking)
 
-    booking.total_cost = total_cost
-    booking.save(update_fields=["total_cost"])
+    audit("booking.create", booking, actor=request.user)
 
     return Response(
         {
@@ -229,73 +255,58 @@ def booking_create_view(request):
 # ─────────────────────────────────────────────────────────────────────────────
 # 7) GET /api/bookings/ (manager/admin = all) & GET /api/my-bookings/ (owner only)
 # ─────────────────────────────────────────────────────────────────────────────
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def bookings_all_view(request):
-    """Managers/Admins — Get all bookings in the system."""
+    """
+    Managers/Admins — Browse all bookings, newest first.
+    GET /api/bookings/?status=&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&court=&owner=&cursor=&page_size=
+    Keyset-paginated on (created_at, id): {"next": <url|null>, "results": [...]}
+    """
     role = getattr(request.user, "role", "player")
     if role not in ["manager", "admin"]:
         return Response({"detail": "Forbidden"}, status=403)
 
-    qs = Booking.objects.all().select_related("user").order_by("-created_at")[:200]
-    tz = timezone.get_current_timezone()
-    data = []
+    qs = Booking.objects.all()
 
-    for b in qs:
-        slots = (
-            BookingSlot.objects.filter(booking=b)
-            .select_related("slot", "slot__slot_status")
-            .order_by("slot__start_at")
-        )
-        first_slot = slots.first()
-        able_to_cancel = calculate_able_to_cancel(first_slot) if first_slot else False
-        if b.status == "cancelled":
-            able_to_cancel = False
-
-        created_local = timezone.localtime(b.created_at, tz)
-        data.append({
-            "booking_id": b.booking_no,
-            "created_date": created_local.strftime("%Y-%m-%d %H:%M"),
-            "total_cost": int(b.total_cost or 0),
-            "booking_date": b.booking_date.strftime("%Y-%m-%d") if b.booking_date else None,
-            "booking_status": b.status,
-            "able_to_cancel": able_to_cancel,
-            "owner_id": b.user_id if b.user_id else None,
-            "owner_username": b.user.username if b.user_id else (b.customer_name or "Unknown"),
-        })
+    raw_status = request.query_params.get("status")
+    if raw_status:
+        statuses = [s.strip() for s in raw_status.split(",") if s.strip()]
+        qs = qs.filter(status__in=[BOOKING_STATUS_ALIASES.get(s, s) for s in statuses])
 
-    return Response(data, status=200)
+    for param, lookup in (("court", "court_id"), ("owner", "user_id")):
+        raw = request.query_params.get(param)
+        if raw:
+            try:
+                qs = qs.filter(**{lookup: int(raw)})
+            except ValueError:
+                return Response({"detail": f"{param} must be an integer id"}, status=400)
+
+    for param, lookup in (("date_from", "booking_date__gte"), ("date_to", "booking_date__lte")):
+        raw = request.query_params.get(param)
+        if raw:
+            try:
+                qs = qs.filter(**{lookup: datetime.strptime(raw, "%Y-%m-%d").date()})
+            except ValueError:
+                return Response({"detail": f"{param} must be YYYY-MM-DD"}, status=400)
 
+    pager = KeysetPaginator(("-created_at", "-id"), page_size=200, max_page_size=500)
+    rows, next_url = pager.paginate(request, booking_list_values(qs))
 
+    return Response(
+        {"next": next_url, "results": build_booking_rows(rows, with_owner_username=True)},
+        status=200,
+    )
+
+
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def bookings_my_view(request):
     """Players — Get bookings belonging to the current user."""
-    qs = Booking.objects.filter(user=request.user).order_by("-created_at")[:50]
-    tz = timezone.get_current_timezone()
-    data = []
-
-    for b in qs:
-        slots = (
-            BookingSlot.objects.filter(booking=b)
-            .select_related("slot", "slot__slot_status")
-            .order_by("slot__start_at")
-        )
-        first_slot = slots.first()
-        able_to_cancel = calculate_able_to_cancel(first_slot) if first_slot else False
-        if b.status == "cancelled":
-            able_to_cancel = False
-
-        created_local = timezone.localtime(b.created_at, tz)
-        data.append({
-            "booking_id": b.booking_no,
-            "created_date": created_local.strftime("%Y-%m-%d %H:%M"),
-            "total_cost": int(b.total_cost or 0),
-            "booking_date": b.booking_date.strftime("%Y-%m-%d") if b.booking_date else None,
-            "booking_status": b.status,
-            "able_to_cancel": able_to_cancel,
-            "owner_id": b.user_id,
-        })
+    qs = Booking.objects.filter(user=request.user).order_by("-created_at")
+    data = booking_list_rows(qs, limit=50)
 
     return Response(data, status=200)
 
@@ -303,12 +314,14 @@ def bookings_my_view(request):
 # ─────────────────────────────────────────────────────────────────────────────
 #  Cancel: POST /api/bookings/<booking_no>/cancel/
 # ─────────────────────────────────────────────────────────────────────────────
+@query_budget(23)
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @transaction.atomic
 def booking_cancel_view(request, booking_no: str):
     try:
-        booking = Booking.objects.get(booking_no=booking_no)
+        # Locked so two concurrent cancels cannot both pass the status check
+        booking = Booking.objects.select_for_update().get(booking_no=booking_no)
     except Booking.DoesNotExist:
         return Response({"detail": "Booking not found"}, status=404)
 
@@ -318,10 +331,12 @@ def booking_cancel_view(request, booking_no: str):
 
     if booking.status == "cancelled":
         return Response({"detail": "Already cancelled"}, status=400)
+    if not can_move_booking("cancel", booking.status, "cancelled"):
+        return Response({"detail": f"Cannot cancel a booking that is '{booking.status}'"}, status=400)
 
     slots = (
         BookingSlot.objects.filter(booking=booking)
-        .select_related("slot", "slot__court", "slot__slot_status")
+        .select_related("slot", "slot__court")
     )
     if not slots.exists():
         return Response({"detail": "No slot info found"}, status=400)
@@ -339,26 +354,38 @@ def booking_cancel_view(request, booking_no: str):
             status=400,
         )
 
-    # Refund + set slot available
-    refund = 0
-    for bs in slots:
-        slot = bs.slot
-        refund += slot.price_coins
-        if hasattr(slot, "slot_status") and slot.slot_status:
-            slot.slot_status.status = "available"
-            slot.slot_status.save(update_fields=["status", "updated_at"])
-        else:
-            SlotStatus.objects.create(slot=slot, status="available")
+    # Refund + release the slots
+    refund = sum(bs.slot.price_coins for bs in slots)
+    slot_ids = [bs.slot_id for bs in slots]
+    SlotStatus.objects.bulk_create(
+        [SlotStatus(slot_id=sid, status="available") for sid in slot_ids],
+        ignore_conflicts=True,
+    )
+    current = dict(
+        SlotStatus.objects
+        .select_for_update()
+        .filter(slot_id__in=slot_ids)
+        .order_by("slot_id")
+        .values_list("slot_id", "status")
+    )
+    moved = move_slots("cancel", current, AVAILABLE, actor=request.user)
+    if moved is None or len(moved) != len(slot_ids):
+        # A slot was moved on (checked in, expired, re-booked) under us: no refund
+        transaction.set_rollback(True)
+        return Response({"detail": "Booking slots changed; reload and try again"}, status=409)
 
     # Update booking status
     booking.status = "cancelled"
     booking.save(update_fields=["status"])
 
-    # Refund to wallet
-    wallet, _ = Wallet.objects.get_or_create(user=booking.user, defaults={"balance": 0})
-    wallet.balance += refund
-    wallet.save(update_fields=["balance"])
-    CoinLedger.objects.create(user=booking.user, type="refund", amount=refund, ref_booking=booking)
+    # Refund to wallet (walk-ins have no owner wallet)
+    if booking.user_id:
+        post_entry(lock_wallet(booking.user_id), "refund", refund, ref_booking=booking)
+
+    # Lock order matches booking_create_view: slots → wallet → day rollup
+    notify_slot_status_changed(slot_ids)
+
+    audit("booking.cancel", booking, actor=request.user)
 
     # Spec-compliant response
     return Response(
@@ -372,6 +399,7 @@ def booking_cancel_view(request, booking_no: str):
     )
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def my_booking_upcoming_view(request):
@@ -383,29 +411,6 @@ def my_booking_upcoming_view(request):
         .filter(user=request.user, status="confirmed", booking_date__gte=today)
         .order_by("booking_date", "created_at")
     )
-
-    tz = timezone.get_current_timezone()
-    data = []
-
-    for b in qs:
-        slots = (
-            BookingSlot.objects.filter(booking=b)
-            .select_related("slot", "slot__slot_status")
-            .order_by("slot__start_at")
-        )
-        first_slot = slots.first()
-        able_to_cancel = calculate_able_to_cancel(first_slot) if first_slot else False
-
-        created_local = timezone.localtime(b.created_at, tz)
-
-        data.append({
-            "booking_id": b.booking_no,
-            "created_date": created_local.strftime("%Y-%m-%d %H:%M"),
-            "total_cost": int(b.total_cost or 0),
-            "booking_date": b.booking_date.strftime("%Y-%m-%d"),
-            "booking_status": b.status,
-            "able_to_cancel": able_to_cancel,
-            "owner_id": b.user_id,
-        })
+    data = booking_list_rows(qs)
 
     return Response(data, status=200)
@@ -1,18 +1,26 @@
 # booking/views/manager_views.py
+from collections import defaultdict
+
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 from rest_framework import permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from courtly.query_metrics import query_budget
 
 from ..models import Slot, SlotStatus, Booking, BookingSlot, Club
 from ..serializers import BookingCreateSerializer
-from .utils import gen_booking_no, combine_dt, calculate_able_to_cancel
+from .utils import gen_booking_no, combine_dt
+from .booking_list import booking_list_rows
+from ..signals import notify_slot_status_changed
+from ..transitions import PLAYING, WALKIN, apply_slot_transitions, can_move_booking, can_move_slot, move_slots
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Walk-in (Manager only): POST /api/booking/walkin/
 # ─────────────────────────────────────────────────────────────────────────────
+@query_budget(16)
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @transaction.atomic
@@ -43,9 +51,58 @@ def booking_walkin_view(request):
     first_court = first_item.get("court")
     if not first_date or not first_court:
         return Response({"detail": "items[].date and items[].court are required"}, status=400)
-    if first_date < timezone.localdate():
-        return Response({"detail": f"Cannot book for a past date: {first_date}"}, status=400)
+    for it in items:
+        if it["date"] < timezone.localdate():
+            return Response({"detail": f"Cannot book for a past date: {it['date']}"}, status=400)
+
+    # Every item's range in one query: OR of (court, date, start..end)
+    ranges = [
+        (it["court"], it["date"], combine_dt(it["date"], it["start"]), combine_dt(it["date"], it["end"]))
+        for it in items
+    ]
+    match = Q()
+    for court_id, d, start_dt, end_dt in ranges:
+        match |= Q(court_id=court_id, service_date=d, start_at__gte=start_dt, end_at__lte=end_dt)
+    by_day = defaultdict(list)
+    for sid, court_id, d, start_at, end_at, price in (
+        Slot.objects
+        .filter(match)
+        .order_by("start_at")
+        .values_list("id", "court_id", "service_date", "start_at", "end_at", "price_coins")
+    ):
+        by_day[(court_id, d)].append((sid, start_at, end_at, price))
+
+    # Back to items, in request order (a slot covered by two items counts once)
+    slot_ids, prices = [], {}
+    for court_id, d, start_dt, end_dt in ranges:
+        in_range = [
+            (sid, price) for sid, start_at, end_at, price in by_day[(court_id, d)]
+            if start_at >= start_dt and end_at <= end_dt
+        ]
+        if not in_range:
+            return Response({"detail": f"No slots found for court {court_id} @ {d}"}, status=400)
+        for sid, price in in_range:
+            if sid not in prices:
+                prices[sid] = price
+                slot_ids.append(sid)
+
+    # Lock all status rows together, in slot-id order like booking_create_view
+    SlotStatus.objects.bulk_create(
+        [SlotStatus(slot_id=sid, status="available") for sid in slot_ids],
+        ignore_conflicts=True,
+    )
+    locked = dict(
+        SlotStatus.objects
+        .select_for_update()
+        .filter(slot_id__in=slot_ids)
+        .order_by("slot_id")
+        .values_list("slot_id", "status")
+    )
+    for sid in slot_ids:
+        if not can_move_slot("book", locked[sid], WALKIN):
+            return Response({"detail": f"Slot {sid} not available", "status": locked[sid]}, status=409)
 
+    total_cost = sum(prices.values())
     booking = Booking.objects.create(
         booking_no=gen_booking_no(),
         user=request.user,  # created by manager
@@ -53,55 +110,17 @@ def booking_walkin_view(request):
         court_id=first_court,
         status="walkin",
         booking_date=first_date,
-        total_cost=0,
+        total_cost=total_cost,
         customer_name=customer_name,
         contact_method=contact_method,
         contact_detail=contact_detail,
     )
+    BookingSlot.objects.bulk_create([BookingSlot(booking=booking, slot_id=sid) for sid in slot_ids])
+    if move_slots("book", locked, WALKIN, actor=request.user) is None:
+        transaction.set_rollback(True)
+        return Response({"detail": "One or more slots were just booked by someone else"}, status=409)
 
-    total_cost = 0
-    created_slots = []
-
-    for it in items:
-        court_id = it["court"]
-        d = it["date"]
-        start_dt = combine_dt(d, it["start"])
-        end_dt = combine_dt(d, it["end"])
-
-        # query matching slots in that range
-        slots = (
-            Slot.objects
-            .select_related("slot_status")
-            .filter(
-                court_id=court_id,
-                service_date=d,
-                start_at__gte=timezone.make_naive(start_dt),
-                end_at__lte=timezone.make_naive(end_dt),
-            )
-            .order_by("start_at")
-        )
-
-        if not slots:
-            return Response({"detail": f"No slots found for court {court_id} @ {d}"}, status=400)
-
-        for s in slots:
-            if not hasattr(s, "slot_status"):
-                SlotStatus.objects.create(slot=s, status="available")
-                s.refresh_from_db()
-
-            if s.slot_status.status != "available":
-                return Response(
-                    {"detail": f"Slot {s.id} not available", "status": s.slot_status.status},
-                    status=409,
-                )
-
-            BookingSlot.objects.create(booking=booking, slot=s)
-            SlotStatus.objects.update_or_create(slot=s, defaults={"status": "walkin"})
-            total_cost += s.price_coins
-            created_slots.append(s.id)
-
-    booking.total_cost = total_cost
-    booking.save(update_fields=["total_cost", "customer_name", "contact_method", "contact_detail"])
+    notify_slot_status_changed(slot_ids)
 
     return Response(
         {
@@ -114,7 +133,7 @@ def booking_walkin_view(request):
                 "contact_method": booking.contact_method,
                 "contact_detail": booking.contact_detail,
                 "status": "walkin",
-                "slots": created_slots,
+                "slots": slot_ids,
                 "total_cost": total_cost,
             },
         },
@@ -125,6 +144,7 @@ def booking_walkin_view(request):
 # ─────────────────────────────────────────────────────────────────────────────
 #  Bulk status update (Manager only): POST /api/slots/update-status/
 # ─────────────────────────────────────────────────────────────────────────────
+@query_budget(14)
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @transaction.atomic
@@ -137,49 +157,11 @@ def slot_bulk_status_update_view(request):
     if not items or not isinstance(items, list):
         return Response({"detail": "items must be a list of {slot, status}"}, status=400)
 
-    # UPDATED transitions
-    allowed_transitions = {
-        "available": ["maintenance", "walkin", "booked", "expired"],
-        "booked": ["checkin", "noshow"],
-        "upcoming": ["checkin", "noshow"],  # <-- new
-        "walkin": ["checkin", "noshow"],
-        "checkin": ["endgame"],
-        "maintenance": ["available"],
-    }
-
-    updated, errors = [], []
-
-    for it in items:
-        slot_id = it.get("slot")
-        new_status = it.get("status")
-
-        if not slot_id or not new_status:
-            errors.append({"slot": slot_id, "detail": "Missing slot or status"})
-            continue
-
-        try:
-            ss = SlotStatus.objects.select_related("slot").get(slot_id=slot_id)
-        except SlotStatus.DoesNotExist:
-            errors.append({"slot": slot_id, "detail": "Slot not found"})
-            continue
-
-        if new_status not in dict(SlotStatus.STATUS):
-            errors.append({"slot": slot_id, "detail": "Invalid status"})
-            continue
-
-        if new_status not in allowed_transitions.get(ss.status, []):
-            errors.append({"slot": slot_id, "detail": f"Cannot change from {ss.status} → {new_status}"})
-            continue
-
-        ss.status = new_status
-        ss.save(update_fields=["status", "updated_at"])
-
-        booking_slot = BookingSlot.objects.filter(slot=ss.slot).select_related("booking").first()
-        if booking_slot and booking_slot.booking:
-            booking_slot.booking.status = new_status
-            booking_slot.booking.save(update_fields=["status"])
-
-        updated.append({"slot_id": slot_id, "new_status": new_status})
+    applied, errors = apply_slot_transitions(
+        [(it.get("slot"), it.get("status")) for it in items], "manager",
+        actor=request.user, propagate_to_bookings=True,
+    )
+    updated = [{"slot_id": slot_id, "new_status": new_status} for slot_id, new_status in applied]
 
     return Response({"detail": "Bulk update complete", "updated": updated, "errors": errors}, status=200)
 
@@ -187,6 +169,7 @@ def slot_bulk_status_update_view(request):
 # ─────────────────────────────────────────────────────────────────────────────
 #  Check-in Booking (Manager only): POST /api/booking/<booking_no>/checkin/
 # ─────────────────────────────────────────────────────────────────────────────
+@query_budget(16)
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @transaction.atomic
@@ -201,9 +184,9 @@ def booking_checkin_view(request, booking_no):
     if role != "manager":
         return Response({"detail": "Only managers can perform check-in."}, status=403)
 
-    # Step 1: Retrieve booking
+    # Step 1: Retrieve booking, locked so a concurrent cancel cannot interleave
     try:
-        booking = Booking.objects.get(booking_no=booking_no)
+        booking = Booking.objects.select_for_update().get(booking_no=booking_no)
     except Booking.DoesNotExist:
         return Response({"detail": "Booking not found."}, status=404)
 
@@ -214,33 +197,32 @@ def booking_checkin_view(request, booking_no):
             status=400,
         )
 
-    # Step 3: Allowed check-in statuses
-    # Spec: upcoming + walkin
-    ALLOWED_CHECKIN = ["upcoming", "walkin"]
-
-    if booking.status not in ALLOWED_CHECKIN:
+    # Step 3: Allowed check-in statuses (booking.transitions: upcoming + walkin)
+    if not can_move_booking("checkin", booking.status, "checkin"):
         return Response(
             {"detail": f"Cannot check-in from status '{booking.status}'. Only upcoming or walkin allowed."},
             status=400,
         )
 
-    # Step 4: Update booking status
+    # Step 4: booked / walkin slots of this booking → playing, in one UPDATE
+    current = dict(
+        SlotStatus.objects
+        .select_for_update()
+        .filter(slot__booked_by__booking=booking)
+        .order_by("slot_id")
+        .values_list("slot_id", "status")
+    )
+    moved = move_slots("checkin", current, PLAYING, actor=request.user)
+    if moved is None:
+        transaction.set_rollback(True)
+        return Response({"detail": "Booking slots changed; reload and try again"}, status=409)
+    updated_slots = [str(sid) for sid in moved]
+    notify_slot_status_changed(moved)
+
+    # Step 5: Update booking status
     booking.status = "checkin"
     booking.save(update_fields=["status"])
 
-    # Step 5: Update all related slot statuses → playing
-    booking_slots = BookingSlot.objects.filter(booking=booking).select_related("slot")
-    updated_slots = []
-
-    for bs in booking_slots:
-        try:
-            ss = SlotStatus.objects.get(slot=bs.slot)
-            ss.status = "playing"  # ← SPEC: change slot state to playing after check-in
-            ss.save(update_fields=["status", "updated_at"])
-            updated_slots.append(str(ss.slot.id))
-        except SlotStatus.DoesNotExist:
-            continue
-
     return Response(
         {
             "booking_id": booking.booking_no,
@@ -252,6 +234,7 @@ def booking_checkin_view(request, booking_no):
     )
 
 
+@query_budget(11)
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 @transaction.atomic
@@ -279,31 +262,10 @@ def slot_simple_status_update_view(request):
     except Exception:
         return Response({"detail": "All slot IDs must be numeric strings or integers."}, status=400)
 
-    allowed_map = {
-        "available": ["maintenance"],
-        "maintenance": ["available"],
-    }
-
-    updated_count = 0
-    errors = []
-
-    for slot_id in slots:
-        try:
-            ss = SlotStatus.objects.select_related("slot").get(slot_id=slot_id)
-        except SlotStatus.DoesNotExist:
-            errors.append({"slot": slot_id, "detail": "Slot not found"})
-            continue
-
-        if ss.status not in allowed_map[changed_to]:
-            errors.append({
-                "slot": slot_id,
-                "detail": f"Cannot change from {ss.status} → {changed_to}"
-            })
-            continue
-
-        ss.status = changed_to
-        ss.save(update_fields=["status", "updated_at"])
-        updated_count += 1
+    applied, errors = apply_slot_transitions(
+        [(slot_id, changed_to) for slot_id in slots], "maintenance", actor=request.user
+    )
+    updated_count = len(applied)
 
     return Response(
         {
@@ -316,6 +278,7 @@ def slot_simple_status_update_view(request):
     )
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def bookings_upcoming_view(request):
@@ -329,32 +292,8 @@ def bookings_upcoming_view(request):
     qs = (
         Booking.objects
         .filter(status="confirmed", booking_date__gte=today)
-        .select_related("user")
         .order_by("booking_date", "created_at")
     )
-
-    tz = timezone.get_current_timezone()
-    data = []
-
-    for b in qs:
-        slots = (
-            BookingSlot.objects.filter(booking=b)
-            .select_related("slot", "slot__slot_status")
-            .order_by("slot__start_at")
-        )
-        first_slot = slots.first()
-        able_to_cancel = calculate_able_to_cancel(first_slot) if first_slot else False
-
-        created_local = timezone.localtime(b.created_at, tz)
-
-        data.append({
-            "booking_id": b.booking_no,
-            "created_date": created_local.strftime("%Y-%m-%d %H:%M"),
-            "total_cost": int(b.total_cost or 0),
-            "booking_date": b.booking_date.strftime("%Y-%m-%d"),
-            "booking_status": b.status,
-            "able_to_cancel": able_to_cancel,
-            "owner_id": b.user_id if b.user_id else None,
-        })
+    data = booking_list_rows(qs)
 
     return Response(data, status=200)
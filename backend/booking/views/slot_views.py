@@ -2,27 +2,234 @@
 import calendar
 from datetime import date, datetime, timedelta
 
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.response import Response
+from courtly.query_metrics import query_budget
 
-from ..models import Slot, SlotStatus
+from ..availability import AVAILABLE_Q
+from ..models import Slot, DayAvailability, BookingSlot, Court
+from ..month_cache import cached_month_payload, etag_matches, month_etag, month_version, versions_are_shared
+from ..pagination import KeysetPaginator
+from ..renderers import CompactMonthRenderer
 from ..serializers import SlotSerializer, SlotListRequestSerializer
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 1) /available-slots/?club=&month=YYYY-MM  (AllowAny)
+# Payload builders (results are cached per club-month, see month_cache.py)
 # ─────────────────────────────────────────────────────────────────────────────
-@api_view(["GET"])
-@permission_classes([permissions.AllowAny])
-def available_slots_month_view(request):
+def run_plan(plan):
+    """Evaluate a payload plan: list each queryset, then shape the rows."""
+    querysets, shape = plan
+    return shape(*(list(qs) for qs in querysets))
+
+
+async def arun_plan(plan):
+    """run_plan on the async ORM (used by the ASGI views in async_views.py)."""
+    querysets, shape = plan
+    rows = []
+    for qs in querysets:
+        rows.append([row async for row in qs])
+    return shape(*rows)
+
+
+def _available_slots_plan(club_id, first_day, last_day):
+    """Plan for the /available-slots/ calendar of one club-month."""
+    # Percentages come from the DayAvailability rollup (one row per day)
+    rollup = (
+        DayAvailability.objects
+        .filter(
+            club_id=club_id,
+            service_date__gte=first_day,
+            service_date__lte=last_day,
+            total__gt=0,
+        )
+        .order_by("service_date")
+        .values_list("service_date", "total", "available")
+    )
+
+    # Only available slots are listed, so only those are fetched
+    available_rows = (
+        Slot.objects
+        .filter(
+            AVAILABLE_Q,
+            court__club_id=club_id,
+            service_date__gte=first_day,
+            service_date__lte=last_day,
+        )
+        .order_by("service_date", "court_id", "start_at")
+        .values_list("service_date", "start_at", "end_at", "court_id", "court__name", "price_coins")
+    )
+
+    def shape(rollup, available_rows):
+        slots_by_day = {}
+        for service_date, start_at, end_at, court_id, court_name, price in available_rows:
+            slots_by_day.setdefault(service_date, []).append({
+                "slot_status": "available",
+                "service_date": service_date.isoformat(),
+                "start_time": timezone.localtime(start_at).strftime("%H:%M"),
+                "end_time": timezone.localtime(end_at).strftime("%H:%M"),
+                "court": court_id,
+                "court_name": court_name,
+                "price_coin": price,
+            })
+
+        days_payload = []
+        for service_date, total, available in rollup:
+            days_payload.append({
+                "date": service_date.strftime("%d-%m-%y"),
+                "available_percent": round(available / total, 2),
+                "available_slots": slots_by_day.get(service_date, []),
+            })
+
+        return {
+            "month": first_day.strftime("%m-%y"),
+            "days": days_payload,
+        }
+
+    return (rollup, available_rows), shape
+
+
+def _slot_month_plan(club_id, first_day, start_day, last_day, slots_key, day_filter=None):
+    """Plan for the per-day {slot_id: slot} grid shared by both month views."""
+    qs = (
+        Slot.objects
+        .select_related("court")
+        .filter(
+            court__club_id=club_id,
+            service_date__gte=start_day,
+            service_date__lte=last_day,
+        )
+        .order_by("service_date", "court_id", "start_at")
+    )
+
+    if day_filter:
+        qs = qs.filter(service_date__day=day_filter)
+
+    def shape(slots):
+        tz = timezone.get_current_timezone()
+        by_day = {}
+
+        for s in slots:
+            day_key = s.service_date.strftime("%d-%m-%y")
+            by_day.setdefault(day_key, {})[str(s.id)] = {
+                "status": s.status,
+                "start_time": timezone.localtime(s.start_at, tz).strftime("%H:%M"),
+                "end_time": timezone.localtime(s.end_at, tz).strftime("%H:%M"),
+                "court": s.court_id,
+                "court_name": s.court.name,
+                "price_coin": s.price_coins,
+            }
+
+        payload = {
+            "month": first_day.strftime("%m-%y"),
+            "days": [{"date": d, slots_key: slots} for d, slots in by_day.items()],
+        }
+        payload["days"].sort(key=lambda x: datetime.strptime(x["date"], "%d-%m-%y"))
+        return payload
+
+    return (qs,), shape
+
+
+def _slot_month_compact_plan(club_id, first_day, start_day, last_day, day_filter=None):
     """
-    Public calendar: GET /available-slots/?club=<id>&month=YYYY-MM
+    Columnar variant of _slot_month_plan (?format=compact).
+
+    Courts, the time grid and the status names are sent once. Each day then
+    carries parallel arrays over the court × time grid, where cell
+    `c * len(times) + t` is court `courts[c]` at `times[t]`:
+      ids    – slot id, or null where that court has no slot
+      status – index into `statuses` (null with the id)
+    Slots are `slot_minutes` long. `price_coin` is month-wide when every
+    slot costs the same; otherwise each day also has a parallel `prices` array.
     """
+    qs = (
+        Slot.objects
+        .filter(court__club_id=club_id, service_date__gte=start_day, service_date__lte=last_day)
+        .order_by("service_date", "court_id", "start_at")
+        .values_list("id", "service_date", "court_id", "start_at", "price_coins", "status")
+    )
+    if day_filter:
+        qs = qs.filter(service_date__day=day_filter)
+    courts = Court.objects.filter(club_id=club_id).order_by("id").values("id", "name")
+
+    def shape(rows, courts):
+        tz = timezone.get_current_timezone()
+        starts = [timezone.localtime(r[3], tz).strftime("%H:%M") for r in rows]
+        times = sorted(set(starts))
+        time_index = {t: i for i, t in enumerate(times)}
+
+        court_index = {c["id"]: i for i, c in enumerate(courts)}
+
+        statuses = [code for code, _ in Slot.STATUS]
+        status_index = {code: i for i, code in enumerate(statuses)}
+
+        prices = {r[4] for r in rows}
+        uniform_price = prices.pop() if len(prices) == 1 else None
+
+        width = len(times)
+        cells = len(courts) * width
+        days = []
+        current = None
+        for (slot_id, service_date, court_id, _, price, status), start in zip(rows, starts):
+            if current is None or current["date"] != service_date:
+                current = {"date": service_date, "ids": [None] * cells, "status": [None] * cells}
+                if uniform_price is None:
+                    current["prices"] = [None] * cells
+                days.append(current)
+
+            if status not in status_index:
+                status_index[status] = len(statuses)
+                statuses.append(status)
+
+            cell = court_index[court_id] * width + time_index[start]
+            current["ids"][cell] = slot_id
+            current["status"][cell] = status_index[status]
+            if uniform_price is None:
+                current["prices"][cell] = price
+
+        for day in days:
+            day["date"] = day["date"].strftime("%d-%m-%y")
+
+        return {
+            "month": first_day.strftime("%m-%y"),
+            "format": "compact",
+            "courts": courts,
+            "times": times,
+            "slot_minutes": 30,
+            "statuses": statuses,
+            "price_coin": uniform_price,
+            "days": days,
+        }
+
+    return (qs, courts), shape
 
-    raw_club = request.query_params.get("club")
-    month_str = request.query_params.get("month")
+
+def _month_response(request, club_id, month, variant, build):
+    """
+    Serve a cached club-month payload with a strong ETag. A client that
+    already holds the current version gets a bodyless 304 before anything
+    is built or serialized.
+    """
+    if not versions_are_shared():
+        # A per-process version cannot vouch for other processes' writes
+        return Response(build(), headers={"Cache-Control": "no-cache"})
+    version = month_version(club_id, month)
+    etag = month_etag(club_id, month, variant, request.accepted_renderer.format, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # always revalidate, cheaply
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(cached_month_payload(club_id, month, variant, build, version), headers=headers)
+
+
+def parse_club_month(params):
+    """(club_id, first_day, last_day) from ?club=&month=YYYY-MM; ParseError otherwise."""
+    raw_club = params.get("club")
+    month_str = params.get("month")
 
     # Sanitize month
     if month_str:
@@ -32,85 +239,81 @@ def available_slots_month_view(request):
     try:
         club_id = int(raw_club)
     except (TypeError, ValueError):
-        return Response({"detail": "club must be an integer id"}, status=400)
+        raise ParseError("club must be an integer id")
 
     # Validate month format
     if not month_str or len(month_str) != 7 or "-" not in month_str:
-        return Response({"detail": "month is required as YYYY-MM"}, status=400)
+        raise ParseError("month is required as YYYY-MM")
 
     try:
         y, m = map(int, month_str.split("-"))
+        first_day = date(y, m, 1)
     except ValueError:
-        return Response({"detail": "invalid month format, use YYYY-MM"}, status=400)
+        raise ParseError("invalid month format, use YYYY-MM")
 
-    first_day = date(y, m, 1)
-    last_day = date(y, m, calendar.monthrange(y, m)[1])
+    return club_id, first_day, date(y, m, calendar.monthrange(y, m)[1])
 
-    # Query slots
-    qs = (
-        Slot.objects
-        .select_related("court", "slot_status")
-        .filter(
-            court__club_id=club_id,
-            service_date__gte=first_day,
-            service_date__lte=last_day
-        )
-        .order_by("service_date", "court_id", "start_at")
-    )
 
-    by_day = {}
+def parse_booking_month(params):
+    """
+    parse_club_month plus the booking-page rules: no past months, optional
+    ?day=, and past days hidden. Returns (club_id, first_day, start_day,
+    last_day, day_filter).
+    """
+    club_id, first_day, last_day = parse_club_month(params)
+    today = timezone.localdate()
 
-    for s in qs:
-        day_key = s.service_date.strftime("%d-%m-%y")
-        status_val = getattr(getattr(s, "slot_status", None), "status", "available")
+    if last_day < today:
+        raise ParseError("Cannot view past months.")
 
-        if day_key not in by_day:
-            by_day[day_key] = {
-                "total": 0,
-                "available": 0,
-                "slots": []
-            }
+    # Optional day filter
+    day_filter = None
+    raw_day = params.get("day")
+    if raw_day:
+        try:
+            day_filter = int(raw_day)
+            if not (1 <= day_filter <= last_day.day):
+                raise ValueError
+        except ValueError:
+            raise ParseError("day must be valid")
 
-        by_day[day_key]["total"] += 1
+    return club_id, first_day, max(first_day, today), last_day, day_filter
 
-        # ❗ FIX: available = only "available" (NOT expired)
-        if status_val == "available":
-            by_day[day_key]["available"] += 1
 
-        if status_val == "available":
-            by_day[day_key]["slots"].append({
-                "slot_status": status_val,
-                "service_date": s.service_date.isoformat(),
-                "start_time": timezone.localtime(s.start_at).strftime("%H:%M"),
-                "end_time": timezone.localtime(s.end_at).strftime("%H:%M"),
-                "court": s.court_id,
-                "court_name": s.court.name,
-                "price_coin": s.price_coins,
-            })
+def booking_month_variant(representation, start_day, day_filter):
+    # Past days are hidden, so the variant changes with "today"
+    prefix = "booking-slots-compact" if representation == "compact" else "booking-slots"
+    return f"{prefix}:{start_day}:{day_filter or ''}"
 
-    days_payload = []
-    for day_key in sorted(by_day.keys(), key=lambda x: datetime.strptime(x, "%d-%m-%y")):
-        info = by_day[day_key]
-        available_percent = (
-            round(info["available"] / info["total"], 2)
-            if info["total"] > 0 else 0.0
-        )
 
-        days_payload.append({
-            "date": day_key,
-            "available_percent": available_percent,
-            "available_slots": info["slots"],
-        })
+def booking_month_plan(representation, club_id, first_day, start_day, last_day, day_filter):
+    if representation == "compact":
+        return _slot_month_compact_plan(club_id, first_day, start_day, last_day, day_filter)
+    return _slot_month_plan(club_id, first_day, start_day, last_day, "booking_slots", day_filter)
 
-    return Response({
-        "month": first_day.strftime("%m-%y"),
-        "days": days_payload,
-    })
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1) /available-slots/?club=&month=YYYY-MM  (AllowAny)
+# ─────────────────────────────────────────────────────────────────────────────
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def available_slots_month_view(request):
+    """
+    Public calendar: GET /available-slots/?club=<id>&month=YYYY-MM
+    """
+    club_id, first_day, last_day = parse_club_month(request.query_params)
+
+    return _month_response(
+        request, club_id, first_day.strftime("%Y-%m"), "available-slots",
+        lambda: run_plan(_available_slots_plan(club_id, first_day, last_day)),
+    )
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # NEW: /month-view/?club=&month=YYYY-MM  (AllowAny)
 # ─────────────────────────────────────────────────────────────────────────────
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def month_view(request):
@@ -118,155 +321,199 @@ def month_view(request):
     Monthly slot overview for a given club.
     GET /month-view/?club=1&month=2025-10
     """
-    raw_club = request.query_params.get("club")
-    month_str = request.query_params.get("month")
+    club_id, first_day, last_day = parse_club_month(request.query_params)
 
-    # Validate club
-    try:
-        club_id = int(raw_club)
-    except (TypeError, ValueError):
-        return Response({"detail": "club must be an integer id"}, status=400)
+    return _month_response(
+        request, club_id, first_day.strftime("%Y-%m"), "slot-list",
+        lambda: run_plan(_slot_month_plan(club_id, first_day, first_day, last_day, "slot_list")),
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2) SlotViewSet
+# ─────────────────────────────────────────────────────────────────────────────
+def active_booking_no():
+    """Subquery: booking_no of the slot's non-cancelled booking (latest wins)."""
+    return Subquery(
+        BookingSlot.objects
+        .filter(slot_id=OuterRef("pk"))
+        .exclude(booking__status="cancelled")
+        .order_by("-booking_id")
+        .values("booking__booking_no")[:1]
+    )
 
-    # Validate month
-    if not month_str or len(month_str) != 7 or "-" not in month_str:
-        return Response({"detail": "month is required as YYYY-MM"}, status=400)
+
+def parse_slot_list(data):
+    """Slot ids from a slots-list body; ParseError / ValidationError otherwise."""
+    if not data:
+        raise ParseError("Request body cannot be empty")
+
+    ser = SlotListRequestSerializer(data=data)
+    ser.is_valid(raise_exception=True)
 
     try:
-        y, m = map(int, month_str.split("-"))
+        return [int(sid) for sid in ser.validated_data["slot_list"]]
     except ValueError:
-        return Response({"detail": "invalid month format, use YYYY-MM"}, status=400)
+        raise ParseError("slot_list must contain integers")
 
-    first_day = date(y, m, 1)
-    last_day = date(y, m, calendar.monthrange(y, m)[1])
 
-    qs = (
+def slot_list_queryset(slot_ids):
+    return (
         Slot.objects
-        .select_related("court", "slot_status")
-        .filter(
-            court__club_id=club_id,
-            service_date__gte=first_day,
-            service_date__lte=last_day,
-        )
-        .order_by("service_date", "court_id", "start_at")
+        .select_related("court")
+        .filter(id__in=slot_ids)
+        .order_by("start_at")
     )
 
-    tz = timezone.get_current_timezone()
-    by_day = {}
-
-    for s in qs:
-        day_key = s.service_date.strftime("%d-%m-%y")
-        status_val = getattr(getattr(s, "slot_status", None), "status", "available")
 
-        by_day.setdefault(day_key, {})[str(s.id)] = {
-            "status": status_val,
-            "start_time": timezone.localtime(s.start_at, tz).strftime("%H:%M"),
-            "end_time": timezone.localtime(s.end_at, tz).strftime("%H:%M"),
+def slot_list_items(slots):
+    return [
+        {
+            "slot_status": s.status,
+            "service_date": s.service_date.strftime("%Y-%m-%d"),
+            "start_time": timezone.localtime(s.start_at).strftime("%H:%M"),
+            "end_time": timezone.localtime(s.end_at).strftime("%H:%M"),
             "court": s.court_id,
             "court_name": s.court.name,
             "price_coin": s.price_coins,
         }
+        for s in slots
+    ]
 
-    payload = {
-        "month": first_day.strftime("%m-%y"),
-        "days": [{"date": d, "slot_list": slots} for d, slots in by_day.items()],
-    }
 
-    payload["days"].sort(key=lambda x: datetime.strptime(x["date"], "%d-%m-%y"))
-    return Response(payload)
+def changes_pager():
+    return KeysetPaginator(("status_updated_at", "id"), page_size=500, max_page_size=2000)
+
+
+def changes_horizon():
+    """Newest /changes/ cursor key that no still-open transaction can fall behind."""
+    return [timezone.now() - timedelta(seconds=settings.SLOT_CHANGES_SETTLE_SECONDS), 0]
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-# 2) SlotViewSet
-# ─────────────────────────────────────────────────────────────────────────────
 class SlotViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Slot.objects.all().select_related("court", "slot_status")
+    queryset = Slot.objects.all().select_related("court")
     serializer_class = SlotSerializer
     permission_classes = [permissions.AllowAny]
+    query_budgets = {"list": 2, "retrieve": 2, "changes": 1, "month_view": 2, "slots_list": 2}
 
-    @action(detail=False, url_path="month-view", methods=["GET"])
-    def month_view(self, request):
+    def get_queryset(self):
+        return super().get_queryset().annotate(active_booking_no=active_booking_no())
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == "month_view":
+            renderers.append(CompactMonthRenderer())  # ?format=compact
+        return renderers
+
+    def list(self, request, *args, **kwargs):
         """
-        GET /api/month-view/?club=1&month=2025-11
+        GET /api/slots/?club=&court=&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&cursor=&page_size=
+        Keyset-paginated on (start_at, id); rows are built from values() tuples.
         """
+        qs = Slot.objects.all()
+
+        for param, lookup in (("club", "court__club_id"), ("court", "court_id")):
+            raw = request.query_params.get(param)
+            if raw:
+                try:
+                    qs = qs.filter(**{lookup: int(raw)})
+                except ValueError:
+                    return Response({"detail": f"{param} must be an integer id"}, status=400)
+
+        for param, lookup in (("date_from", "service_date__gte"), ("date_to", "service_date__lte")):
+            raw = request.query_params.get(param)
+            if raw:
+                try:
+                    qs = qs.filter(**{lookup: datetime.strptime(raw, "%Y-%m-%d").date()})
+                except ValueError:
+                    return Response({"detail": f"{param} must be YYYY-MM-DD"}, status=400)
+
+        qs = qs.annotate(booking_no=active_booking_no()).values(
+            "id", "service_date", "start_at", "end_at", "court_id", "court__name",
+            "price_coins", "status", "booking_no",
+        )
 
-        raw_club = request.query_params.get("club")
-        month_str = request.query_params.get("month")
-        raw_day = request.query_params.get("day")
+        pager = KeysetPaginator(("start_at", "id"), page_size=200, max_page_size=1000)
+        rows, next_url = pager.paginate(request, qs)
 
-        # Sanitize month
-        if month_str:
-            month_str = month_str.rstrip("/").strip()
+        tz = timezone.get_current_timezone()
+        results = [
+            {
+                "id": r["id"],
+                "slot_status": r["status"],
+                "service_date": r["service_date"].isoformat(),
+                "start_time": timezone.localtime(r["start_at"], tz).strftime("%H:%M"),
+                "end_time": timezone.localtime(r["end_at"], tz).strftime("%H:%M"),
+                "court": r["court_id"],
+                "court_name": r["court__name"],
+                "price_coin": r["price_coins"],
+                "booking_id": r["booking_no"],
+            }
+            for r in rows
+        ]
+        return Response({"next": next_url, "results": results})
 
-        # Validate club
+    @action(detail=False, methods=["GET"])
+    def changes(self, request):
+        """
+        GET /api/slots/changes/?club=&since=<cursor>&page_size=
+        Slots whose status changed after `since`, seeking on (status_updated_at, id).
+        Without `since` only a fresh cursor is returned (take it before loading
+        the month grid). The cursor trails now() by SLOT_CHANGES_SETTLE_SECONDS,
+        so rows near the edge may be sent twice; applying them is idempotent.
+        """
         try:
-            club_id = int(raw_club)
+            club_id = int(request.query_params.get("club"))
         except (TypeError, ValueError):
             return Response({"detail": "club must be an integer id"}, status=400)
 
-        # Validate month
-        if not month_str or len(month_str) != 7 or "-" not in month_str:
-            return Response({"detail": "month is required as YYYY-MM"}, status=400)
+        pager = changes_pager()
+        horizon = changes_horizon()
 
-        try:
-            y, m = map(int, month_str.split("-"))
-        except ValueError:
-            return Response({"detail": "invalid month format, use YYYY-MM"}, status=400)
+        token = request.query_params.get("since")
+        if not token:
+            return Response({"cursor": pager.encode_cursor(horizon), "has_more": False, "results": []})
 
-        first_day = date(y, m, 1)
-        last_day = date(y, m, calendar.monthrange(y, m)[1])
-        today = timezone.localdate()
-
-        if last_day < today:
-            return Response({"detail": "Cannot view past months."}, status=400)
-
-        # Optional day filter
-        day_filter = None
-        if raw_day:
-            try:
-                day_filter = int(raw_day)
-                if not (1 <= day_filter <= last_day.day):
-                    raise ValueError
-            except ValueError:
-                return Response({"detail": "day must be valid"}, status=400)
-
-        qs = (
+        since = pager.decode_cursor(token, Slot)
+
+        page_size = pager.get_page_size(request)
+        rows = list(
             Slot.objects
-            .select_related("court", "slot_status")
-            .filter(
-                court__club_id=club_id,
-                service_date__gte=max(first_day, today),
-                service_date__lte=last_day,
-            )
-            .order_by("service_date", "court_id", "start_at")
+            .filter(pager.seek_filter(since), court__club_id=club_id)
+            .order_by(*pager.ordering)
+            .values("id", "status", "status_updated_at", "court_id", "service_date")[:page_size + 1]
         )
-
-        if day_filter:
-            qs = qs.filter(service_date__day=day_filter)
-
-        tz = timezone.get_current_timezone()
-        by_day = {}
-
-        for s in qs:
-            day_key = s.service_date.strftime("%d-%m-%y")
-            by_day.setdefault(day_key, {})[str(s.id)] = {
-                "status": getattr(getattr(s, "slot_status", None), "status", "available"),
-                "start_time": timezone.localtime(s.start_at, tz).strftime("%H:%M"),
-                "end_time": timezone.localtime(s.end_at, tz).strftime("%H:%M"),
-                "court": s.court_id,
-                "court_name": s.court.name,
-                "price_coin": s.price_coins,
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        cursor = [rows[-1]["status_updated_at"], rows[-1]["id"]] if rows else since
+        if cursor > horizon:  # still settling: resend from the horizon next time
+            cursor, has_more = max(since, horizon), False
+
+        results = [
+            {
+                "id": r["id"],
+                "slot_status": r["status"],
+                "court": r["court_id"],
+                "service_date": r["service_date"].isoformat(),
             }
+            for r in rows
+        ]
+        return Response({"cursor": pager.encode_cursor(cursor), "has_more": has_more, "results": results})
 
-        payload = {
-            "month": first_day.strftime("%m-%y"),
-            "days": [
-                {"date": d, "booking_slots": slots}
-                for d, slots in by_day.items()
-            ],
-        }
-        payload["days"].sort(key=lambda x: datetime.strptime(x["date"], "%d-%m-%y"))
+    @action(detail=False, url_path="month-view", methods=["GET"])
+    def month_view(self, request):
+        """
+        GET /api/month-view/?club=1&month=2025-11
+        """
+        club_id, first_day, start_day, last_day, day_filter = parse_booking_month(request.query_params)
+        representation = request.accepted_renderer.format
 
-        return Response(payload)
+        return _month_response(
+            request, club_id, first_day.strftime("%Y-%m"),
+            booking_month_variant(representation, start_day, day_filter),
+            lambda: run_plan(booking_month_plan(representation, club_id, first_day, start_day, last_day, day_filter)),
+        )
 
     @action(detail=False, methods=["POST"], url_path="slots-list")
     def slots_list(self, request):
@@ -277,42 +524,8 @@ class SlotViewSet(viewsets.ReadOnlyModelViewSet):
         }
         """
 
-        if not request.data:
-            return Response({"detail": "Request body cannot be empty"}, status=400)
-
-        ser = SlotListRequestSerializer(data=request.data)
-        ser.is_valid(raise_exception=True)
-
-        slot_ids = ser.validated_data["slot_list"]
-
-        if not slot_ids:
-            return Response({"detail": "slot_list cannot be empty"}, status=400)
-
-        try:
-            slot_ids = [int(sid) for sid in slot_ids]
-        except:
-            return Response({"detail": "slot_list must contain integers"}, status=400)
-
-        qs = (
-            Slot.objects
-            .select_related("court", "slot_status")
-            .filter(id__in=slot_ids)
-            .order_by("start_at")
-        )
-
-        if not qs.exists():
+        slots = list(slot_list_queryset(parse_slot_list(request.data)))
+        if not slots:
             return Response({"detail": "No slots found"}, status=404)
 
-        items = []
-        for s in qs:
-            items.append({
-                "slot_status": getattr(getattr(s, "slot_status", None), "status", "available"),
-                "service_date": s.service_date.strftime("%Y-%m-%d"),
-                "start_time": timezone.localtime(s.start_at).strftime("%H:%M"),
-                "end_time": timezone.localtime(s.end_at).strftime("%H:%M"),
-                "court": s.court_id,
-                "court_name": s.court.name,
-                "price_coin": s.price_coins,
-            })
-
-        return Response({"slot_items": items}, status=200)
+        return Response({"slot_items": slot_list_items(slots)}, status=200)
@@ -0,0 +1,59 @@
+# booking/views/stream_views.py
+# Server-Sent Events: live slot status updates for one club.
+import asyncio
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from courtly.query_metrics import query_budget
+
+from ..live import broker, ensure_listener, sse_message
+from .slot_views import changes_horizon, changes_pager
+
+
+async def _slot_events(club_id):
+    sub = broker.subscribe(club_id)
+    ensure_listener()
+    try:
+        # Where to resume with /api/slots/changes/ after a dropped connection
+        yield sse_message("ready", {"club": club_id, "cursor": changes_pager().encode_cursor(changes_horizon())})
+        while True:
+            try:
+                yield await asyncio.wait_for(sub.queue.get(), settings.SLOT_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"  # keeps proxies from closing an idle stream
+    finally:
+        broker.unsubscribe(sub)
+
+
+@query_budget(0)
+@require_GET
+async def slot_stream_view(request):
+    """
+    GET /api/slots/stream/?club=<id>   (text/event-stream, AllowAny)
+
+    Events:
+      ready  – {"club", "cursor"}: a /api/slots/changes/ cursor for catching up
+      slots  – {"club", "slots": [{"id", "slot_status", "court", "service_date"}]}
+      resync – slots were added/removed or events were dropped; reload the grid
+    """
+    try:
+        club_id = int(request.GET.get("club"))
+    except (TypeError, ValueError):
+        return JsonResponse({"detail": "club must be an integer id"}, status=400)
+
+    # A WSGI worker would be held for the life of the stream. Hand the client
+    # what it needs to poll /api/slots/changes/ instead.
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            "detail": "Live updates require the ASGI server (courtly.asgi); poll the changes feed instead.",
+            "poll": f"/api/slots/changes/?club={club_id}",
+            "cursor": changes_pager().encode_cursor(changes_horizon()),
+        }, status=501)
+
+    response = StreamingHttpResponse(_slot_events(club_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: do not buffer the stream
+    return response
@@ -1,4 +1,4 @@
-# gen_booking_no, combine_dt, calculate_able_to_cancel
+# gen_booking_no, combine_dt, calculate_able_to_cancel, able_to_cancel_at
 # booking/views/utils.py
 import uuid
 import calendar
@@ -24,12 +24,19 @@ def combine_dt(d: date, t) -> datetime:
 
 def calculate_able_to_cancel(first_slot):
     """Check if booking can be cancelled (more than 24 hours before start)."""
-    if not first_slot or not first_slot.slot or not hasattr(first_slot.slot, "slot_status"):
+    if not first_slot or not first_slot.slot:
         return False
 
-    if first_slot.slot.slot_status.status == "cancelled":
+    return able_to_cancel_at(first_slot.slot.start_at, first_slot.slot.status)
+
+
+def able_to_cancel_at(first_start_at, first_slot_status) -> bool:
+    """Same rule as calculate_able_to_cancel, from already-fetched values."""
+    if first_start_at is None or first_slot_status is None:
+        return False
+
+    if first_slot_status == "cancelled":
         return False
 
-    slot_start = first_slot.slot.start_at
-    slot_local = timezone.localtime(slot_start)
+    slot_local = timezone.localtime(first_start_at)
     return timezone.now() <= slot_local - timedelta(hours=24)
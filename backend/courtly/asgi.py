@@ -3,6 +3,9 @@ ASGI config for courtly project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Requests served here resolve against courtly.urls_asgi, which routes the
+read-heavy booking endpoints to their async-native views.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -10,7 +13,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.handlers.asgi import ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'courtly.settings')
 
 application = get_asgi_application()
+
+
+class AsyncViewsRequest(ASGIRequest):
+    urlconf = "courtly.urls_asgi"
+
+
+application.request_class = AsyncViewsRequest
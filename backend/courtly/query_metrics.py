@@ -0,0 +1,159 @@
+# courtly/query_metrics.py
+# Per-request DB instrumentation: query count, DB time and the slowest SQL,
+# reported as Server-Timing headers and one structured log line per request.
+#
+# The collector for the current request lives in a ContextVar, and every
+# connection gets one permanent execute_wrapper that reports to it. Under
+# ASGI the ORM runs in sync_to_async worker threads with their own
+# connections; asgiref copies the context into those threads, so their
+# queries are counted too.
+import json
+import logging
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("courtly.query_metrics")
+
+
+class QueryMetrics:
+    """connection.execute_wrapper hook that times every query it sees."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = ""
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed > self.slowest:
+                self.slowest, self.slowest_sql = elapsed, sql
+
+
+_current = ContextVar("query_metrics", default=None)
+
+
+def _record(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def _hook(connection):
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+def _hook_new_connection(sender, connection, **kwargs):
+    _hook(connection)
+
+
+# Every connection opened from now on, in any thread
+connection_created.connect(_hook_new_connection)
+
+
+def query_budget(budget):
+    """
+    Declare the max queries an endpoint may run (int, or {method: int}).
+    Put it above @api_view. Class-based views set `query_budgets` instead,
+    keyed by viewset action or HTTP method. The test suite enforces these
+    (see courtly.testing.QueryBudgetMixin) and the middleware logs overruns.
+    """
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def get_query_budget(view, method):
+    """Budget declared for `view` (a resolved URL callback) and HTTP `method`, or None."""
+    method = method.lower()
+    budget = getattr(view, "query_budget", None)
+    if budget is None:
+        budgets = getattr(getattr(view, "cls", None), "query_budgets", None) or {}
+        action = (getattr(view, "actions", None) or {}).get(method)
+        budget = budgets.get(action, budgets.get(method))
+    if isinstance(budget, dict):
+        budget = budget.get(method)
+    return budget
+
+
+class QueryMetricsMiddleware:
+    # Async-capable so async views under ASGI are not pushed onto a thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = QueryMetrics()
+        started = perf_counter()
+        _hook_thread_connections()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics, perf_counter() - started)
+
+    async def __acall__(self, request):
+        metrics = QueryMetrics()
+        started = perf_counter()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics, perf_counter() - started)
+
+    def report(self, request, response, metrics, total):
+        response["Server-Timing"] = ", ".join((
+            f'db;dur={metrics.duration * 1000:.1f};desc="{metrics.count} queries"',
+            f"db-slowest;dur={metrics.slowest * 1000:.1f}",
+            f"app;dur={total * 1000:.1f}",
+        ))
+
+        match = getattr(request, "resolver_match", None)
+        budget = get_query_budget(match.func, request.method) if match else None
+        over_budget = budget is not None and metrics.count > budget
+        line = json.dumps({
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": metrics.count,
+            "query_budget": budget,
+            "db_ms": round(metrics.duration * 1000, 1),
+            "total_ms": round(total * 1000, 1),
+            "slowest_ms": round(metrics.slowest * 1000, 1),
+            "slowest_sql": metrics.slowest_sql[:500],
+        })
+        logger.log(logging.WARNING if over_budget else logging.INFO, line)
+        return response
+
+
+def _hook_thread_connections():
+    # Connections this thread opened before this module was imported
+    for conn in connections.all(initialized_only=True):
+        _hook(conn)
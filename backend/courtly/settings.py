@@ -58,6 +58,7 @@ AUTH_USER_MODEL = "accounts.User"
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "courtly.query_metrics.QueryMetricsMiddleware",  # Server-Timing + per-request query log
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -100,10 +101,75 @@ DATABASES = {
         "HOST": env("POSTGRES_HOST"),
         "PORT": env("POSTGRES_PORT", default="5432"),
         "OPTIONS": {"sslmode": env("POSTGRES_SSL_MODE", default="require")},
-        "CONN_MAX_AGE": 60,
+        # Persistent connections are per thread; under ASGI every request gets
+        # a fresh thread, so set 0 there (and pool with pgbouncer if needed)
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
     }
 }
 
+# ============================================================
+# 🧩 Cache
+# ============================================================
+# A file cache under backend/.cache by default, shared by every process on
+# the host: month-view versions are bumped by whichever process writes,
+# including the scheduler's expire_slots. Use a redis:// URL when running
+# several hosts. A locmem cache is per process, so outside DEBUG
+# booking.month_cache refuses to cache month payloads in it.
+CACHES = {
+    "default": env.cache("DJANGO_CACHE_URL", default=f"filecache://{BASE_DIR / '.cache' / 'django'}"),
+}
+
+# Seconds a month-view payload stays cached (entries are versioned, so this
+# only bounds memory, not staleness)
+MONTH_VIEW_CACHE_TIMEOUT = env.int("MONTH_VIEW_CACHE_TIMEOUT", default=3600)
+
+# /api/slots/changes/ never advances its cursor past now - SETTLE seconds, so
+# writes from transactions that commit late are still picked up. Rows are
+# stamped by the database at their status UPDATE (see SlotStatusQuerySet), so
+# this must cover the rest of the writing transaction plus app/DB clock skew.
+SLOT_CHANGES_SETTLE_SECONDS = env.int("SLOT_CHANGES_SETTLE_SECONDS", default=5)
+
+# booking.archive: `manage.py archive_slots` moves never-booked slots of
+# months older than this many full months out of booking_slot
+SLOT_ARCHIVE_KEEP_MONTHS = env.int("SLOT_ARCHIVE_KEEP_MONTHS", default=3)
+
+# booking.live: /api/slots/stream/ (SSE, needs the ASGI app). BACKEND is
+# "postgres" (NOTIFY/LISTEN, reaches every process) or "local" (in-process
+# only); empty picks postgres when the database is Postgres.
+SLOT_EVENTS_BACKEND = env("SLOT_EVENTS_BACKEND", default="")
+SLOT_STREAM_QUEUE_SIZE = env.int("SLOT_STREAM_QUEUE_SIZE", default=100)
+SLOT_STREAM_HEARTBEAT_SECONDS = env.int("SLOT_STREAM_HEARTBEAT_SECONDS", default=15)
+
+# courtly.query_metrics: per-request query count / DB time headers and log line
+QUERY_METRICS_ENABLED = env.bool("QUERY_METRICS_ENABLED", default=True)
+
+# Django's default logging drops INFO from our own loggers; send the
+# per-request query_metrics lines (WARNING when over budget) to stderr
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "courtly.query_metrics": {
+            "handlers": ["console"],
+            "level": env("QUERY_METRICS_LOG_LEVEL", default="INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# ops.audit: AuditLog rows are queued in-process and bulk-inserted per batch
+# or every FLUSH_INTERVAL seconds (0 = no background thread)
+AUDIT_LOG_BATCH_SIZE = env.int("AUDIT_LOG_BATCH_SIZE", default=100)
+AUDIT_LOG_FLUSH_INTERVAL = env.float("AUDIT_LOG_FLUSH_INTERVAL", default=2.0)
+AUDIT_LOG_MAX_QUEUE = env.int("AUDIT_LOG_MAX_QUEUE", default=10000)
+
+# ops.idempotency: how long a stored Idempotency-Key response is replayed;
+# `manage.py purge_idempotency_keys` deletes older rows
+IDEMPOTENCY_KEY_TTL_HOURS = env.int("IDEMPOTENCY_KEY_TTL_HOURS", default=24)
+
 # ============================================================
 # 🧩 Password validation
 # ============================================================
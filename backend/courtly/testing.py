@@ -0,0 +1,60 @@
+# courtly/testing.py
+# Test helpers shared by the app test suites.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+
+from .query_metrics import get_query_budget
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin: `self.request_within_budget(method, path, data)` calls the
+    endpoint with `self.client` and fails if it runs more queries than its
+    @query_budget / `query_budgets` declaration allows.
+    """
+
+    def request_within_budget(self, method, path, data=None, **extra):
+        view = resolve(path.split("?")[0]).func
+        budget = get_query_budget(view, method)
+        self.assertIsNotNone(budget, f"{method} {path} declares no query budget")
+
+        with CaptureQueriesContext(connection) as ctx:
+            if method.upper() == "GET":
+                res = self.client.get(path, data, **extra)
+            else:
+                res = getattr(self.client, method.lower())(path, data, format="json", **extra)
+            if res.streaming:  # streamed bodies run their queries while being read
+                res.streaming_content = [b"".join(res.streaming_content)]
+        self.assertLessEqual(
+            len(ctx), budget,
+            f"{method} {path} ran {len(ctx)} queries (budget {budget}):\n"
+            + "\n".join(q["sql"] for q in ctx.captured_queries),
+        )
+        return res
+
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+
+def endpoint_methods(urlconf_module):
+    """Yield (route, view, method) for every endpoint mounted from `urlconf_module`."""
+    def walk(patterns, prefix):
+        for p in patterns:
+            if isinstance(p, URLResolver):
+                yield from walk(p.url_patterns, prefix + str(p.pattern))
+            elif isinstance(p, URLPattern) and p.name != "api-root":
+                view = p.callback
+                actions = getattr(view, "actions", None)
+                if actions:
+                    methods = actions.keys()
+                elif hasattr(view, "cls"):
+                    methods = [m for m in HTTP_METHODS if hasattr(view.cls, m)]
+                else:  # plain Django view
+                    methods = ["get"]
+                for method in methods:
+                    yield prefix + str(p.pattern), view, method
+
+    for p in get_resolver().url_patterns:
+        if isinstance(p, URLResolver) and getattr(p.urlconf_module, "__name__", None) == urlconf_module:
+            yield from walk(p.url_patterns, str(p.pattern))
@@ -10,6 +10,7 @@ from drf_spectacular.views import (
 
 from django.conf import settings
 from django.conf.urls.static import static
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from rest_framework.renderers import JSONRenderer
 
 # Custom JSON schema view
@@ -40,3 +41,5 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # runserver did this by itself; uvicorn does not
+    urlpatterns += staticfiles_urlpatterns()
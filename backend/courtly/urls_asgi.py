@@ -0,0 +1,11 @@
+# courtly/urls_asgi.py
+# URLconf of the ASGI app (courtly.asgi): booking routes come from
+# booking.urls_async, everything else from courtly.urls.
+from django.urls import include, path
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path("api/", include("booking.urls_async")),
+    *wsgi_urlpatterns,
+]
@@ -0,0 +1,151 @@
+# ops/audit.py
+# Buffered AuditLog writer: requests only append to an in-process queue,
+# a background thread bulk-inserts batches on a size/time threshold.
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """
+    Bounded in-process queue of AuditLog rows.
+
+    - `enqueue()` is O(1) and never touches the database unless the queue is
+      full, in which case the caller flushes a batch itself (back-pressure,
+      nothing is dropped).
+    - A batch whose insert fails goes back on the queue, as far as it still
+      fits, and the error propagates.
+    - A daemon thread flushes every `interval` seconds, or as soon as
+      `batch_size` rows are waiting. `interval=None` disables the thread;
+      rows then go out on size threshold, `flush()` or process exit.
+    """
+
+    def __init__(self, batch_size=100, interval=2.0, max_queue=10000):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def enqueue(self, entry):
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.flush()
+            self.queue.put(entry)
+
+        if self.interval is None:
+            if self.queue.qsize() >= self.batch_size:
+                self.flush()
+            return
+        self._ensure_thread()
+        if self.queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows written."""
+        from .models import AuditLog
+
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return written
+                try:
+                    AuditLog.objects.bulk_create(batch)
+                except Exception:
+                    self._requeue(batch)
+                    raise
+                written += len(batch)
+
+    def _requeue(self, batch):
+        # Back of the queue for the next pass; rows that no longer fit are lost
+        dropped = 0
+        for entry in batch:
+            try:
+                self.queue.put_nowait(entry)
+            except queue.Full:
+                dropped += 1
+        logger.error("AuditLog flush failed: %d rows requeued, %d dropped", len(batch) - dropped, dropped)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                # A connection broken by the last failed pass is replaced here
+                close_old_connections()
+                self.flush()
+            except Exception:  # keep the writer alive; flush() requeued the failed batch
+                logger.exception("AuditLog flush failed")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> AuditWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter(
+                    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+                    interval=settings.AUDIT_LOG_FLUSH_INTERVAL or None,
+                    max_queue=settings.AUDIT_LOG_MAX_QUEUE,
+                )
+                atexit.register(_flush_on_exit, _writer)
+    return _writer
+
+
+def _flush_on_exit(writer):
+    # Worker shutdown: write whatever is still queued
+    try:
+        writer.flush()
+    except Exception:
+        logger.exception("AuditLog flush at exit failed")
+
+
+def audit(action, subject, actor=None):
+    """
+    Record `actor` doing `action` (e.g. "booking.create") on `subject`.
+    Queued only once the surrounding transaction commits, so rolled-back
+    requests leave no trace. created_at is stamped at flush time, at most
+    AUDIT_LOG_FLUSH_INTERVAL after the event.
+    """
+    from .models import AuditLog
+
+    entry = AuditLog(
+        actor_user_id=getattr(actor, "pk", None),
+        action=action,
+        subject_type=type(subject).__name__,
+        subject_id=subject.pk,
+    )
+    transaction.on_commit(lambda: get_writer().enqueue(entry))
+
+
+def flush_audit_log() -> int:
+    """Flush queued AuditLog rows now (tests, management commands)."""
+    return get_writer().flush()
@@ -0,0 +1,107 @@
+# ops/idempotency.py
+# Idempotency-Key support for POST endpoints that clients retry on timeouts.
+#
+# The key row is claimed in the same transaction as the view's own writes and
+# the response is stored before commit, so a key is only ever recorded
+# together with the booking / top-up it produced. A retry that arrives while
+# the first request is still running blocks on the key row (unique index)
+# until that request commits, then replays its response.
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def _encode(value):
+    if isinstance(value, UploadedFile):
+        return [value.name, value.size]
+    return str(value)
+
+
+def request_fingerprint(request) -> str:
+    """sha256 of the request data; uploads count by name and size, not content."""
+    data = request.data
+    if hasattr(data, "lists"):  # QueryDict (form / multipart)
+        data = dict(data.lists())
+    raw = json.dumps(data, sort_keys=True, default=_encode, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def key_cutoff():
+    """Keys created before this instant have expired."""
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def _replay(row):
+    return Response(row.response_body, status=row.status_code, headers={REPLAYED_HEADER: "true"})
+
+
+def idempotent(scope):
+    """
+    Honour an Idempotency-Key header on a DRF view (put it below @api_view /
+    @permission_classes, or use method_decorator on a viewset method).
+
+    - No header: the view runs as usual.
+    - New key: the view runs; a response below 500 is stored with the key.
+      Exceptions (DRF validation errors included) and rollbacks release
+      the key, so a corrected retry can reuse it.
+    - Known key, same request: the stored response is returned as is, with
+      `Idempotent-Replayed: true`, and the view does not run.
+    - Known key, different request or endpoint: 422.
+
+    Views that use transaction.atomic should pass savepoint=False so a
+    rollback they request reaches the key too.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if key is None:
+                return view(request, *args, **kwargs)
+            if not key or len(key) > 255:
+                return Response({"detail": f"{HEADER} must be 1-255 characters"}, status=400)
+
+            fingerprint = request_fingerprint(request)
+            with transaction.atomic():
+                claim = IdempotencyKey(user_id=request.user.pk, key=key, scope=scope, fingerprint=fingerprint)
+                IdempotencyKey.objects.bulk_create([claim], ignore_conflicts=True)
+                row = IdempotencyKey.objects.select_for_update().get(user_id=request.user.pk, key=key)
+
+                if row.status_code is not None:
+                    if row.created_at < key_cutoff():
+                        # Expired but not purged yet: start over with this request
+                        row.delete()
+                        row = IdempotencyKey.objects.create(
+                            user_id=request.user.pk, key=key, scope=scope, fingerprint=fingerprint
+                        )
+                    elif row.scope != scope or row.fingerprint != fingerprint:
+                        return Response(
+                            {"detail": f"{HEADER} was already used for a different request"}, status=422
+                        )
+                    else:
+                        return _replay(row)
+
+                response = view(request, *args, **kwargs)
+                if transaction.get_rollback():
+                    return response  # the view rolled back its work; the key goes with it
+                if response.status_code >= 500:
+                    transaction.set_rollback(True)
+                    return response
+
+                row.status_code = response.status_code
+                row.response_body = response.data
+                row.save(update_fields=["status_code", "response_body"])
+                return response
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ops.audit import AuditWriter
+from ops.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request AuditLog overhead: a synchronous INSERT vs. enqueueing on the "
+        "buffered writer (plus the amortized bulk flush done off the request path). "
+        "Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=2000, help="Events per run (default 2000)")
+        parser.add_argument("--batch-size", type=int, default=100, help="Writer batch size (default 100)")
+
+    def handle(self, *args, **options):
+        n = options["events"]
+        actor_id = get_user_model().objects.values_list("id", flat=True).first()
+
+        def entry(i):
+            return AuditLog(actor_user_id=actor_id, action="bench.event", subject_type="Bench", subject_id=i)
+
+        with transaction.atomic():
+            started = perf_counter()
+            for i in range(n):
+                entry(i).save()
+            sync_us = (perf_counter() - started) / n * 1e6
+
+            writer = AuditWriter(batch_size=options["batch_size"], interval=None, max_queue=n + 1)
+            writer.batch_size = n + 1  # keep the size threshold out of the request-path timing
+            entries = [entry(i) for i in range(n)]
+            started = perf_counter()
+            for e in entries:
+                writer.enqueue(e)
+            enqueue_us = (perf_counter() - started) / n * 1e6
+
+            writer.batch_size = options["batch_size"]
+            started = perf_counter()
+            written = writer.flush()
+            flush_us = (perf_counter() - started) / max(written, 1) * 1e6
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"events: {n}, batch size: {options['batch_size']}")
+        self.stdout.write(f"  synchronous INSERT     {sync_us:10.1f} µs/event (on the request path)")
+        self.stdout.write(f"  buffered enqueue       {enqueue_us:10.1f} µs/event (on the request path)")
+        self.stdout.write(f"  bulk flush, amortized  {flush_us:10.1f} µs/event (background thread)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Request-path saving: {sync_us - enqueue_us:.1f} µs/event ({sync_us / max(enqueue_us, 0.001):.0f}x)"
+        ))
@@ -0,0 +1,34 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ops.idempotency import key_cutoff
+from ops.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete Idempotency-Key rows older than IDEMPOTENCY_KEY_TTL_HOURS, "
+        "in small batches so writers are never blocked for long."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per DELETE (default 5000)")
+
+    def handle(self, *args, **options):
+        started = monotonic()
+        cutoff = key_cutoff()
+        stale = IdempotencyKey.objects.filter(created_at__lt=cutoff)
+
+        deleted = 0
+        while True:
+            ids = list(stale.values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} idempotency keys created before "
+            f"{timezone.localtime(cutoff):%Y-%m-%d %H:%M} [{monotonic() - started:.2f}s]"
+        ))
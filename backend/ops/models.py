@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from core.models import Club, Court
 
 class BusinessHour(models.Model):
@@ -41,3 +42,22 @@ class AuditLog(models.Model):
             models.Index(fields=["subject_type", "subject_id"]),
             models.Index(fields=["created_at"]),
         ]
+
+class IdempotencyKey(models.Model):
+    """
+    First response to a request sent with an Idempotency-Key header, replayed
+    to retries of it (see ops.idempotency). Rows older than
+    IDEMPOTENCY_KEY_TTL_HOURS are removed by `purge_idempotency_keys`.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=64)            # booking.create, topup.create
+    fingerprint = models.CharField(max_length=64)      # sha256 of the request data
+    status_code = models.PositiveSmallIntegerField(null=True)  # null until the first request finishes
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="idempotencykey_user_key_uniq"),
+        ]
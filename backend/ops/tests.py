@@ -1,3 +1,181 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from booking.models import Booking, Club, Court, Slot, SlotStatus
+from ops import audit as audit_module
+from ops.audit import AuditWriter, audit, flush_audit_log
+from courtly.testing import QueryBudgetMixin
+from ops.idempotency import request_fingerprint
+from ops.models import AuditLog, IdempotencyKey
+from wallet.models import TopupRequest, Wallet
+
+
+def log_entry(i):
+    return AuditLog(action="test.event", subject_type="Test", subject_id=i)
+
+
+class TestAuditWriter(TestCase):
+    def test_flushes_on_size_threshold(self):
+        writer = AuditWriter(batch_size=3, interval=None, max_queue=10)
+        writer.enqueue(log_entry(1))
+        writer.enqueue(log_entry(2))
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        writer.enqueue(log_entry(3))
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_full_queue_applies_back_pressure_without_dropping(self):
+        writer = AuditWriter(batch_size=100, interval=None, max_queue=2)
+        for i in range(5):
+            writer.enqueue(log_entry(i))
+        writer.flush()
+        self.assertEqual(AuditLog.objects.count(), 5)
+
+    def test_failed_batch_is_requeued(self):
+        writer = AuditWriter(batch_size=10, interval=None, max_queue=5)
+        broken = log_entry(2)
+        broken.action = None
+        writer.enqueue(log_entry(1))
+        writer.enqueue(broken)
+
+        with self.assertLogs("ops.audit", "ERROR") as logs, self.assertRaises(IntegrityError), transaction.atomic():
+            writer.flush()
+        self.assertIn("2 rows requeued, 0 dropped", logs.output[0])
+        self.assertEqual(writer.queue.qsize(), 2)
+
+        broken.action = "test.event"
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+
+@override_settings(AUDIT_LOG_FLUSH_INTERVAL=0)
+class TestAuditInstrumentation(TestCase):
+    def setUp(self):
+        audit_module._writer = None
+        self.club = Club.objects.create(name="Audit Club")
+        self.court = Court.objects.create(name="Court 1", club=self.club)
+        self.user = get_user_model().objects.create_user(
+            username="auditor", email="auditor@example.com", password="1234"
+        )
+        Wallet.objects.create(user=self.user, balance=1000)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        audit_module._writer = None
+
+    def test_only_committed_events_are_written(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            audit("booking.create", self.club, actor=self.user)
+        self.assertEqual(flush_audit_log(), 0)  # nothing queued before commit
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(flush_audit_log(), 1)
+        row = AuditLog.objects.get()
+        self.assertEqual((row.action, row.subject_type, row.actor_user_id), ("booking.create", "Club", self.user.id))
+
+    def test_booking_create_and_cancel_are_audited(self):
+        start = timezone.now() + timedelta(days=3)
+        slot = Slot.objects.create(
+            court=self.court, service_date=timezone.localdate() + timedelta(days=3),
+            start_at=start, end_at=start + timedelta(minutes=30), price_coins=100,
+        )
+        SlotStatus.objects.create(slot=slot, status="available")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post("/api/booking/", {"club": self.club.id, "slots": [slot.id]}, format="json")
+        self.assertEqual(res.status_code, 201)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(f"/api/booking/{res.data['booking_id']}/cancel/")
+        self.assertEqual(res.status_code, 200)
+
+        flush_audit_log()
+        booking = Booking.objects.get()
+        self.assertEqual(
+            list(AuditLog.objects.filter(subject_type="Booking", subject_id=booking.id)
+                 .order_by("id").values_list("action", flat=True)),
+            ["booking.create", "booking.cancel"],
+        )
+
+
+class TestIdempotencyKeys(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Retry Club")
+        court = Court.objects.create(name="Court 1", club=self.club)
+        self.user = get_user_model().objects.create_user(
+            username="retrier", email="retrier@example.com", password="1234"
+        )
+        Wallet.objects.create(user=self.user, balance=1000)
+        start = timezone.now() + timedelta(days=3)
+        self.slots = []
+        for i in range(2):
+            slot = Slot.objects.create(
+                court=court, service_date=timezone.localdate(start), price_coins=100,
+                start_at=start + timedelta(minutes=30 * i), end_at=start + timedelta(minutes=30 * (i + 1)),
+            )
+            SlotStatus.objects.create(slot=slot, status="available")
+            self.slots.append(slot)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def book(self, slot, key="key-1"):
+        return self.request_within_budget(
+            "POST", "/api/booking/", {"club": self.club.id, "slots": [slot.id]}, HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.book(self.slots[0])
+        self.assertEqual(first.status_code, 201)
+
+        retry = self.book(self.slots[0])
+        self.assertEqual((retry.status_code, retry.data), (201, first.data))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, 900)
+
+    def test_key_reused_for_another_request(self):
+        self.book(self.slots[0])
+        res = self.book(self.slots[1])
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_keys_are_per_user_and_optional(self):
+        self.assertEqual(self.book(self.slots[0]).status_code, 201)
+        self.assertEqual(self.book(self.slots[1], key="key-2").status_code, 201)
+        res = self.client.post("/api/booking/", {"club": self.club.id, "slots": [self.slots[1].id]}, format="json")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(IdempotencyKey.objects.count(), 2)
+
+    def test_topup_submission(self):
+        url = "/api/wallet/topups/"
+        # Rejected by validation: nothing is stored, a corrected retry may reuse the key
+        self.assertEqual(self.client.post(url, {"amount_thb": 50}, HTTP_IDEMPOTENCY_KEY="slip-1").status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        # Slips upload to object storage, so seed the stored first response
+        request = APIRequestFactory().post(url, {"amount_thb": 200})
+        IdempotencyKey.objects.create(
+            user=self.user, key="slip-1", scope="topup.create", status_code=201, response_body={"id": 7},
+            fingerprint=request_fingerprint(Request(request, parsers=[FormParser(), MultiPartParser()])),
+        )
+        res = self.client.post(url, {"amount_thb": 200}, HTTP_IDEMPOTENCY_KEY="slip-1")
+        self.assertEqual((res.status_code, res.data, res["Idempotent-Replayed"]), (201, {"id": 7}, "true"))
+        self.assertFalse(TopupRequest.objects.exists())
+
+    def test_expired_keys_are_purged(self):
+        self.book(self.slots[0])
+        self.book(self.slots[1], key="key-2")
+        IdempotencyKey.objects.filter(key="key-1").update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command("purge_idempotency_keys", batch_size=1, stdout=StringIO())
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["key-2"])
@@ -0,0 +1,45 @@
+# backend/wallet/ledger.py
+# Single write path for coins: every CoinLedger row moves Wallet.balance in the same transaction.
+from django.db.models import F, Sum
+
+from .models import CoinLedger, Wallet
+
+
+def ledger_sum(user_id) -> int:
+    return CoinLedger.objects.filter(user_id=user_id).aggregate(s=Sum("amount"))["s"] or 0
+
+
+def get_wallet(user_id) -> Wallet:
+    """
+    Return the user's Wallet for reading. A missing wallet is opened once
+    from the ledger total; after that reads never aggregate.
+    """
+    wallet = Wallet.objects.filter(user_id=user_id).first()
+    if wallet is None:
+        wallet, _ = Wallet.objects.get_or_create(user_id=user_id, defaults={"balance": ledger_sum(user_id)})
+    return wallet
+
+
+def lock_wallet(user_id) -> Wallet:
+    """Return the user's Wallet row locked FOR UPDATE (call inside a transaction)."""
+    wallet = Wallet.objects.select_for_update().filter(user_id=user_id).first()
+    if wallet is None:
+        get_wallet(user_id)
+        wallet = Wallet.objects.select_for_update().get(user_id=user_id)
+    return wallet
+
+
+def post_entry(wallet, type, amount, ref_booking=None) -> CoinLedger:
+    """
+    Append a ledger row and move the balance by `amount` atomically.
+    `wallet` must come from lock_wallet() in the current transaction.
+    """
+    Wallet.objects.filter(pk=wallet.pk).update(balance=F("balance") + amount)
+    wallet.balance += amount
+    return CoinLedger.objects.create(
+        user_id=wallet.user_id,
+        type=type,
+        amount=amount,
+        ref_booking=ref_booking,
+        balance_after=wallet.balance,
+    )
@@ -0,0 +1,62 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from wallet.models import CoinLedger, Wallet
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify every Wallet.balance against its CoinLedger in one pass: the ledger sum "
+        "and the running balance on the newest entry must both match."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Reset drifting balances to the ledger sum")
+        parser.add_argument("--show", type=int, default=20, help="Drifting wallets to list (default 20)")
+
+    def handle(self, *args, **options):
+        started = monotonic()
+        ledger_total = (
+            CoinLedger.objects.filter(user_id=OuterRef("user_id"))
+            .order_by().values("user_id").annotate(s=Sum("amount")).values("s")
+        )
+        last_running = (
+            CoinLedger.objects.filter(user_id=OuterRef("user_id"))
+            .order_by("-created_at", "-id").values("balance_after")[:1]
+        )
+
+        with transaction.atomic():
+            wallets = Wallet.objects.annotate(
+                ledger=Coalesce(Subquery(ledger_total, output_field=IntegerField()), Value(0)),
+                running=Subquery(last_running, output_field=IntegerField()),
+            )
+            drift_q = ~Q(balance=F("ledger")) | (Q(running__isnull=False) & ~Q(running=F("balance")))
+            if options["fix"]:
+                wallets = wallets.select_for_update(of=("self",))
+            drifting = list(
+                wallets.filter(drift_q).order_by("user_id")
+                .values("id", "user_id", "user__username", "balance", "ledger", "running")
+            )
+            checked = Wallet.objects.count()
+
+            for row in drifting[:options["show"]]:
+                self.stdout.write(
+                    f"  user {row['user_id']} ({row['user__username']}): balance={row['balance']} "
+                    f"ledger={row['ledger']} last running={row['running']}"
+                )
+
+            if options["fix"] and drifting:
+                Wallet.objects.bulk_update(
+                    [Wallet(id=row["id"], balance=row["ledger"]) for row in drifting], ["balance"],
+                    batch_size=1000,
+                )
+
+        style = self.style.WARNING if drifting else self.style.SUCCESS
+        action = "fixed" if options["fix"] and drifting else "drifting"
+        self.stdout.write(style(
+            f"Checked {checked} wallets: {len(drifting)} {action} ({monotonic() - started:.2f}s)"
+        ))
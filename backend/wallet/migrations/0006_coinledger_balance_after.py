@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:25
+
+from django.db import migrations, models
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value, Window
+from django.db.models.functions import Coalesce
+
+
+def backfill_running_balance(apps, schema_editor):
+    CoinLedger = apps.get_model("wallet", "CoinLedger")
+
+    running = (
+        CoinLedger.objects
+        .annotate(running=Window(
+            Sum("amount"), partition_by=[F("user_id")], order_by=[F("created_at").asc(), F("id").asc()],
+        ))
+        .values_list("id", "running")
+    )
+
+    batch = []
+    for entry_id, total in running.iterator(chunk_size=5000):
+        batch.append(CoinLedger(id=entry_id, balance_after=total))
+        if len(batch) >= 5000:
+            CoinLedger.objects.bulk_update(batch, ["balance_after"])
+            batch = []
+    CoinLedger.objects.bulk_update(batch, ["balance_after"])
+
+
+def reset_wallet_balances(apps, schema_editor):
+    """Start every Wallet at its ledger sum, so it agrees with the newest balance_after."""
+    CoinLedger = apps.get_model("wallet", "CoinLedger")
+    Wallet = apps.get_model("wallet", "Wallet")
+
+    missing = (
+        CoinLedger.objects.exclude(user_id__in=Wallet.objects.values("user_id"))
+        .order_by().values("user_id").annotate(s=Sum("amount"))
+    )
+    Wallet.objects.bulk_create(
+        [Wallet(user_id=row["user_id"], balance=row["s"]) for row in missing], batch_size=1000,
+    )
+
+    # Same set-based query as `manage.py reconcile_wallets --fix`
+    ledger_total = (
+        CoinLedger.objects.filter(user_id=OuterRef("user_id"))
+        .order_by().values("user_id").annotate(s=Sum("amount")).values("s")
+    )
+    Wallet.objects.update(balance=Coalesce(Subquery(ledger_total, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0005_alter_wallet_balance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coinledger',
+            name='balance_after',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_running_balance, migrations.RunPython.noop),
+        migrations.RunPython(reset_wallet_balances, migrations.RunPython.noop),
+    ]
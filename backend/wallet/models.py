@@ -17,6 +17,8 @@ class CoinLedger(models.Model):
         Booking, null=True, blank=True, on_delete=models.SET_NULL, related_name="ledger_entries"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Wallet balance right after this entry (running balance, written by wallet.ledger.post_entry)
+    balance_after = models.IntegerField(null=True, blank=True)
 
     class Meta:
         indexes = [models.Index(fields=["user", "created_at"])]
@@ -16,5 +16,6 @@ def create_user_initial_coins(sender, instance, created, **kwargs):
             user=instance,
             type="initial",
             amount=1000,
-            ref_booking=None
+            ref_booking=None,
+            balance_after=1000,  # first entry: the wallet is opened from the ledger sum
         )
@@ -4,6 +4,7 @@ from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from wallet.models import TopupRequest, CoinLedger
+from courtly.testing import QueryBudgetMixin
 
 
 class WalletFlowTests(APITestCase):
@@ -112,4 +113,148 @@ class WalletFlowTests(APITestCase):
 
         # Manager can approve
         res_mgr_approve = self.manager_client.post(f"/api/wallet/topups/{topup_id}/approve/")
-        self.assertEqual(res_mgr_approve.status_code, status.HTTP_200_OK)
\ No newline at end of file
+        self.assertEqual(res_mgr_approve.status_code, status.HTTP_200_OK)
+
+class WalletLedgerConsistencyTests(APITestCase):
+    """Wallet.balance moves with every ledger entry; reads never aggregate."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.player = User.objects.create_user(
+            username="ledger1", email="ledger1@example.com", password="Str0ngPass!234"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.player)
+
+    def test_balance_and_running_balance_follow_entries(self):
+        from django.db import transaction
+        from wallet.ledger import lock_wallet, post_entry
+
+        # Wallet opens from the signup ledger entry
+        self.assertEqual(self.client.get("/api/wallet/balance/").data["balance"], 1000)
+
+        with transaction.atomic():
+            wallet = lock_wallet(self.player.id)
+            post_entry(wallet, "topup", 500)
+            post_entry(wallet, "capture", -200)
+
+        with self.assertNumQueries(1):
+            res = self.client.get("/api/wallet/balance/")
+        self.assertEqual(res.data["balance"], 1300)
+        self.assertEqual(
+            list(CoinLedger.objects.filter(user=self.player).order_by("id").values_list("balance_after", flat=True)),
+            [1000, 1500, 1300],
+        )
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from wallet.ledger import get_wallet
+        from wallet.models import Wallet
+
+        get_wallet(self.player.id)
+        out = StringIO()
+        call_command("reconcile_wallets", stdout=out)
+        self.assertIn("0 drifting", out.getvalue())
+
+        Wallet.objects.filter(user=self.player).update(balance=42)
+        out = StringIO()
+        call_command("reconcile_wallets", fix=True, stdout=out)
+        self.assertIn("1 fixed", out.getvalue())
+        self.assertEqual(Wallet.objects.get(user=self.player).balance, 1000)
+
+
+class LedgerExportTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.player = User.objects.create_user(
+            username="export1", email="export1@example.com", password="Str0ngPass!234"
+        )
+        for amount, entry_type in ((100, "topup"), (-50, "capture"), (50, "refund")):
+            CoinLedger.objects.create(user=self.player, type=entry_type, amount=amount)
+        self.client = APIClient()
+        self.client.force_authenticate(self.player)
+
+    def read_csv(self, res):
+        return b"".join(res.streaming_content).decode("utf-8-sig").splitlines()
+
+    def test_streams_csv_with_filters(self):
+        res = self.client.get("/api/wallet/ledger/export-csv/")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        lines = self.read_csv(res)
+        self.assertEqual(lines[0], "Reference ID,Username,Amount,Date,Type,Status")
+        self.assertEqual(len(lines), 5)  # header + initial + 3 entries
+
+        lines = self.read_csv(self.client.get("/api/wallet/ledger/export-csv/?type=topup,refund"))
+        self.assertEqual(len(lines), 3)
+
+        from django.utils import timezone
+        from datetime import timedelta
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+        lines = self.read_csv(self.client.get(f"/api/wallet/ledger/export-csv/?date_from={tomorrow}"))
+        self.assertEqual(len(lines), 1)
+
+        res = self.client.get("/api/wallet/ledger/export-csv/?date_from=yesterday")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_gzip(self):
+        import gzip
+        res = self.client.get("/api/wallet/ledger/export-csv/?gzip=1")
+        self.assertEqual(res["Content-Type"], "application/gzip")
+        self.assertIn("wallet_transactions.csv.gz", res["Content-Disposition"])
+        lines = gzip.decompress(b"".join(res.streaming_content)).decode("utf-8-sig").splitlines()
+        self.assertEqual(len(lines), 5)
+
+    async def test_streams_asynchronously_under_asgi(self):
+        await self.async_client.aforce_login(self.player)
+        res = await self.async_client.get("/api/wallet/ledger/export-csv/")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # A sync iterator would be buffered whole by the ASGI handler
+        self.assertTrue(res.is_async)
+        lines = b"".join([chunk async for chunk in res.streaming_content]).decode("utf-8-sig").splitlines()
+        self.assertEqual(len(lines), 5)
+
+
+class WalletQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.player = User.objects.create_user(
+            username="budget1", email="budget1@example.com", password="Str0ngPass!234"
+        )
+        self.manager = User.objects.create_user(
+            username="budgetmgr", email="budgetmgr@example.com", password="Str0ngPass!234", role="manager"
+        )
+        for i in range(10):
+            CoinLedger.objects.create(user=self.player, type="topup", amount=100)
+        self.topups = [TopupRequest.objects.create(user=self.player, amount_thb=100, coins=100) for _ in range(6)]
+        self.client = APIClient()
+
+    def test_every_endpoint_declares_a_budget(self):
+        from courtly.query_metrics import get_query_budget
+        from courtly.testing import endpoint_methods
+
+        missing = [
+            f"{method.upper()} {route}"
+            for route, view, method in endpoint_methods("wallet.urls")
+            if get_query_budget(view, method) is None
+        ]
+        self.assertEqual(missing, [])
+
+    def test_player_endpoints(self):
+        self.client.force_authenticate(self.player)
+        self.request_within_budget("GET", "/api/wallet/balance/")
+        self.request_within_budget("GET", "/api/wallet/ledger/")
+        self.request_within_budget("GET", "/api/wallet/ledger/export-csv/")
+        self.request_within_budget("GET", "/api/wallet/topups/")
+        self.request_within_budget("GET", f"/api/wallet/topups/{self.topups[0].id}/")
+
+    def test_manager_endpoints(self):
+        self.client.force_authenticate(self.manager)
+        self.request_within_budget("GET", "/api/wallet/topups/")
+        res = self.request_within_budget("POST", f"/api/wallet/topups/{self.topups[0].id}/approve/")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.request_within_budget("POST", f"/api/wallet/topups/{self.topups[1].id}/reject/")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.request_within_budget("DELETE", f"/api/wallet/topups/{self.topups[2].id}/")
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
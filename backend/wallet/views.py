@@ -1,10 +1,17 @@
 # backend/wallet/views.py
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
 from django.utils.encoding import smart_str
 import csv
+import zlib
 
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
@@ -13,6 +20,10 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 
+from ops.audit import audit
+from ops.idempotency import idempotent
+
+from .ledger import get_wallet, lock_wallet, post_entry
 from .models import CoinLedger, TopupRequest
 from .serializers import (
     WalletBalanceSerializer,
@@ -25,24 +36,67 @@ from .permissions import IsManager
 
 class WalletBalanceView(APIView):
     permission_classes = [IsAuthenticated]
+    query_budgets = {"get": 6}  # first read opens the wallet from the ledger
 
     def get(self, request):
         """
-        Return REAL wallet balance using CoinLedger as the source of truth.
-        (Wallet.balance is ignored to prevent mismatch issues)
+        Return the materialized Wallet.balance. Every CoinLedger write goes
+        through wallet.ledger.post_entry, so it always equals the ledger sum
+        (check with `manage.py reconcile_wallets`).
         """
-        ledger_sum = (
-            CoinLedger.objects.filter(user=request.user)
-            .aggregate(s=Sum("amount"))
-            .get("s") or 0
-        )
+        return Response({"balance": get_wallet(request.user.id).balance})
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object for csv.writer that hands each line back instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def _csv_chunks(rows):
+    writer = csv.writer(_Echo())
+    yield ("\ufeff" + writer.writerow(["Reference ID", "Username", "Amount", "Date", "Type", "Status"])).encode()
+
+    buf = []
+    for entry_id, username, amount, created_at, entry_type in rows:
+        buf.append(writer.writerow([
+            entry_id,
+            smart_str(username or ""),
+            amount,
+            created_at.strftime("%d %b %Y, %H:%M"),
+            entry_type.capitalize(),
+            "Approved",
+        ]))
+        if len(buf) >= EXPORT_CHUNK_SIZE:
+            yield "".join(buf).encode()
+            buf = []
+    if buf:
+        yield "".join(buf).encode()
+
+
+def _gzip_chunks(chunks):
+    gz = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        # Sync-flush per chunk so compressed bytes leave as soon as rows do
+        yield gz.compress(chunk) + gz.flush(zlib.Z_SYNC_FLUSH)
+    yield gz.flush()
 
-        return Response({"balance": int(ledger_sum)})
+
+async def _async_chunks(chunks):
+    # ASGI reads a sync iterator to the end before sending anything; pulling
+    # chunk by chunk from the worker thread keeps the export streaming
+    pull = sync_to_async(next)
+    while (chunk := await pull(chunks, None)) is not None:
+        yield chunk
 
 
 class CoinLedgerViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     serializer_class = CoinLedgerSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {"list": 2, "export_csv": 2}
 
     def get_queryset(self):
         qs = CoinLedger.objects.select_related("ref_booking").order_by("-created_at")
@@ -53,27 +107,55 @@ class CoinLedgerViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
 
     @action(detail=False, methods=["get"], url_path="export-csv")
     def export_csv(self, request):
-        qs = self.get_queryset().select_related("user")
-        resp = HttpResponse(content_type="text/csv; charset=utf-8")
-        resp["Content-Disposition"] = 'attachment; filename="wallet_transactions.csv"'
-        resp.write("\ufeff")
-        writer = csv.writer(resp)
-        writer.writerow(["Reference ID", "Username", "Amount", "Date", "Type", "Status"])
-        for row in qs:
-            writer.writerow([
-                row.id,
-                smart_str(getattr(row.user, "username", "")),
-                row.amount,
-                row.created_at.strftime("%d %b %Y, %H:%M"),
-                row.type.capitalize(),
-                "Approved",
-            ])
+        """
+        Stream the ledger as CSV (optionally gzipped) without loading it:
+        rows come from a server-side cursor in chunks and are written out
+        as they arrive, under WSGI and (through an async iterator) ASGI.
+
+        Query params: date_from / date_to (YYYY-MM-DD, local dates, inclusive),
+        type (comma-separated), gzip=1.
+        """
+        qs = self.get_queryset()
+
+        tz = timezone.get_current_timezone()
+        for param, lookup, offset in (("date_from", "gte", 0), ("date_to", "lt", 1)):
+            raw = request.query_params.get(param)
+            if not raw:
+                continue
+            day = parse_date(raw)
+            if day is None:
+                return Response({"detail": f"{param} must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+            bound = timezone.make_aware(datetime.combine(day + timedelta(days=offset), time.min), tz)
+            qs = qs.filter(**{f"created_at__{lookup}": bound})
+
+        types = [t for t in request.query_params.get("type", "").split(",") if t]
+        if types:
+            qs = qs.filter(type__in=types)
+
+        rows = qs.values_list("id", "user__username", "amount", "created_at", "type").iterator(
+            chunk_size=EXPORT_CHUNK_SIZE
+        )
+        chunks = _csv_chunks(rows)
+        filename = "wallet_transactions.csv"
+        content_type = "text/csv; charset=utf-8"
+        if request.query_params.get("gzip") in ("1", "true"):
+            chunks = _gzip_chunks(chunks)
+            content_type = "application/gzip"
+            filename += ".gz"
+        if isinstance(request._request, ASGIRequest):
+            chunks = _async_chunks(chunks)
+        resp = StreamingHttpResponse(chunks, content_type=content_type)
+        resp["Content-Disposition"] = f'attachment; filename="{filename}"'
         return resp
 
 
 class TopupRequestViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    query_budgets = {
+        "list": 2, "create": 7, "retrieve": 2, "update": 4, "partial_update": 4,
+        "destroy": 3, "approve": 15, "reject": 6,
+    }
 
     def get_queryset(self):
         qs = TopupRequest.objects.select_related("user").order_by("-created_at")
@@ -87,6 +169,11 @@ class TopupRequestViewSet(viewsets.ModelViewSet):
             return qs
         return qs.filter(user=self.request.user)
 
+    @method_decorator(idempotent("topup.create"))
+    def create(self, request, *args, **kwargs):
+        """Submit a top-up slip. Honours an Idempotency-Key header (ops.idempotency)."""
+        return super().create(request, *args, **kwargs)
+
     def get_serializer_class(self):
         if self.action == "create":
             return TopupRequestCreateSerializer
@@ -117,29 +204,11 @@ class TopupRequestViewSet(viewsets.ModelViewSet):
         topup.status = "approved"
         topup.save(update_fields=["status"])
 
-        # 2) Create ledger entry
-        ledger = CoinLedger.objects.create(
-            user=topup.user,
-            type="topup",
-            amount=topup.coins,
-            ref_booking=None
-        )
-
-        # 3) Sync Wallet.balance to match with ledger
-        from django.db.models import Sum
-        from .models import Wallet
-
-        ledger_sum = (
-                CoinLedger.objects.filter(user=topup.user)
-                .aggregate(s=Sum("amount"))
-                .get("s") or 0
-        )
-
-        wallet, _ = Wallet.objects.get_or_create(user=topup.user)
-        wallet.balance = ledger_sum
-        wallet.save(update_fields=["balance"])
+        # 2) Create ledger entry and move Wallet.balance with it
+        ledger = post_entry(lock_wallet(topup.user_id), "topup", topup.coins)
+        audit("topup.approve", topup, actor=request.user)
 
-        # 4) Return response
+        # 3) Return response
         data = TopupRequestListSerializer(topup, context={"request": request}).data
         data["ledger_id"] = ledger.id
         return Response(data, status=status.HTTP_200_OK)
@@ -155,5 +224,6 @@ class TopupRequestViewSet(viewsets.ModelViewSet):
 
         topup.status = "rejected"
         topup.save(update_fields=["status"])
+        audit("topup.reject", topup, actor=request.user)
         return Response(TopupRequestListSerializer(topup, context={"request": request}).data,
                         status=status.HTTP_200_OK)
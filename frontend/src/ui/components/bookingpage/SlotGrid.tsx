@@ -26,8 +26,8 @@ function normalizeForPlayer(statusRaw: string): PlayerGroup {
   const status = (statusRaw || "").toLowerCase();
   if (status === "available") return "available";
   if (status === "maintenance") return "maintenance";
-  if (["expired", "endgame", "no_show"].includes(status)) return "ended";
-  if (["booked", "walkin", "checkin"].includes(status)) return "bookedLike";
+  if (["expired", "endgame", "ended", "no_show", "noshow"].includes(status)) return "ended";
+  if (["booked", "walkin", "checkin", "playing"].includes(status)) return "bookedLike";
   return "ended";
 }
 
@@ -38,12 +38,9 @@ for i in range(1, 7):
 print(f'✅ All 6 courts are ready for {c.name}')
 "
 
-# 3. Calculate Dates (Today + 7 Days)
-START_DATE=$(date +%Y-%m-%d)
-END_DATE=$(docker compose exec -T backend python -c "import datetime; print((datetime.date.today() + datetime.timedelta(days=7)).strftime('%Y-%m-%d'))")
+# 3. Fill the slot horizon (insert-only, follows ops.BusinessHour / Closure / MaintenanceBlock)
+#    The scheduler service keeps running this, so this step only matters on a fresh setup.
+echo "⚙️  Generating slots for the next 7 days..."
+docker compose exec -T backend python manage.py maintain_slot_horizon --club 1 --days 7
 
-# 4. Generate Slots
-echo "⚙️  Generating slots from $START_DATE to $END_DATE..."
-docker compose exec -T backend python manage.py generate_slots --club 1 --start $START_DATE --end $END_DATE
-
-echo "✅ Success! System is ready with 6 Courts and Weekly Slots."
\ No newline at end of file
+echo "✅ Success! System is ready with 6 Courts and Weekly Slots."